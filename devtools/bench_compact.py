@@ -0,0 +1,48 @@
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from wm_engine import compact
+from bench_storage import make_layouts
+
+def timed(fn, repeat=5):
+    best = None
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        dt = time.perf_counter() - t0
+        best = dt if best is None else min(best, dt)
+    return best
+
+if __name__ == "__main__":
+    layouts = make_layouts()
+    scenarios = list(layouts.values())
+
+    encoded = {
+        "json (indent=4)": [json.dumps(s, indent=4).encode("utf-8") for s in scenarios],
+        "json (compact)": [json.dumps(s, separators=(",", ":")).encode("utf-8") for s in scenarios],
+        "wml": [compact.dumps(s) for s in scenarios],
+    }
+    loaders = {
+        "json (indent=4)": lambda raw: json.loads(raw.decode("utf-8")),
+        "json (compact)": lambda raw: json.loads(raw.decode("utf-8")),
+        "wml": compact.loads,
+    }
+
+    # Lossless: every scenario decodes back to the same V2 dict, and to the same V1 list
+    assert all(compact.loads(raw) == s for raw, s in zip(encoded["wml"], scenarios))
+    assert all(compact.loads(compact.dumps(s["windows"])) == s["windows"] for s in scenarios)
+
+    print(f"{len(scenarios)} scenarios x {len(scenarios[0]['windows'])} windows")
+    print(f"{'format':>16} {'total (KB)':>11} {'per scn (B)':>12} {'load all (ms)':>14} {'dump all (ms)':>14}")
+    for label, blobs in encoded.items():
+        total = sum(len(b) for b in blobs)
+        t_load = timed(lambda: [loaders[label](b) for b in blobs])
+        if label == "wml":
+            t_dump = timed(lambda: [compact.dumps(s) for s in scenarios])
+        else:
+            indent = 4 if "indent" in label else None
+            t_dump = timed(lambda: [json.dumps(s, indent=indent) for s in scenarios])
+        print(f"{label:>16} {total / 1024:>11.1f} {total / len(blobs):>12.0f} {t_load * 1000:>14.1f} {t_dump * 1000:>14.1f}")
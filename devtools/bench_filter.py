@@ -0,0 +1,95 @@
+import os
+import sys
+import time
+import tempfile
+import itertools
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from wm_engine.filters import WindowFilter
+from wm_engine.settings import SettingsManager
+
+def legacy_is_window_allowed(settings, title, class_name=None, exe=None, is_explorer=False, overrides=None):
+    """ WindowScanner._is_window_allowed before compilation (reference). """
+    def get_setting(key, default=None):
+        if overrides and key in overrides: return overrides[key]
+        return settings.get(key, default)
+
+    exclude_list = get_setting("exclude_titles", [])
+    for ex in exclude_list:
+        if ex == "Window Manager":
+            if title == "Window Manager": return False
+        elif ex.lower() in title.lower():
+            return False
+
+    if (":\\" in title and title.lower().endswith(".exe")) or title.lower().endswith(".exe"):
+        return False
+
+    if title == "Taskbar" or title == "Mise en veille": return False
+
+    if class_name:
+        if class_name in ["Windows.UI.Core.CoreWindow", "ApplicationFrameWindow", "Shell_TrayWnd"]:
+            if class_name == "Shell_TrayWnd": return False
+
+    is_chrome = "Google Chrome" in title or (exe and "chrome.exe" in exe)
+    is_firefox = "Mozilla Firefox" in title or (exe and "firefox.exe" in exe)
+
+    if get_setting("ignore_folders") and is_explorer: return False
+    if get_setting("ignore_chrome") and is_chrome: return False
+    if get_setting("ignore_firefox") and is_firefox: return False
+
+    if get_setting("ignore_others"):
+        if not is_explorer and not is_chrome and not is_firefox:
+            return False
+
+    return True
+
+TITLES = [
+    "Window Manager", "window manager - notes", "Inbox - Google Chrome", "GitHub — Mozilla Firefox",
+    "Projects", "Explorateur de fichiers", "C:\\Tools\\setup.EXE", "Taskbar", "Mise en veille", "Program Manager",
+    "PARAMÈTRES", "Settings - Visual Studio Code", "tk", "Desk tkinter demo", "Calculatrice", "Nvidia Share overlay",
+    "Expérience d’entrée Windows", "readme.txt - Notepad", "Task Host Window", "Survey results.xlsx - Excel", "",
+    "Spotify Premium", "New Tab - Google Chrome", "Private Browsing - Mozilla Firefox", "Discord",
+    # Browser names in non-browser titles, and bare browser titles
+    "Chromebook tips - Notepad", "Firefox bug 123 - Jira", "My Chrome extension - Visual Studio Code",
+    "Edge cases.docx - Word", "Mozilla Firefox", "Google Chrome", "Inbox — Mozilla Firefox Private Browsing",
+]
+CLASSES = [None, "CabinetWClass", "Shell_TrayWnd", "Chrome_WidgetWin_1", "ApplicationFrameWindow"]
+EXES = [None, "c:\\program files\\google\\chrome\\application\\chrome.exe", "firefox.exe", "notepad.exe"]
+OVERRIDES = [None, {}, {"ignore_chrome": True}, {"ignore_firefox": True, "ignore_folders": True},
+             {"ignore_others": True}, {"exclude_titles": ["Discord", "Window Manager"]}, {"exclude_titles": []}]
+
+def compiled(settings, overrides):
+    return WindowFilter.from_settings(lambda key, default=None: overrides[key] if overrides and key in overrides else settings.get(key, default))
+
+if __name__ == "__main__":
+    settings = SettingsManager(os.path.join(tempfile.mkdtemp(), "settings.json")) # Defaults, never written
+    cases = list(itertools.product(TITLES, CLASSES, EXES, (False, True)))
+
+    # Equivalence on the whole corpus, for every override set
+    mismatches = 0
+    for overrides in OVERRIDES:
+        window_filter = compiled(settings, overrides)
+        for title, class_name, exe, is_explorer in cases:
+            if legacy_is_window_allowed(settings, title, class_name, exe, is_explorer, overrides) != window_filter.allowed(title, class_name, exe, is_explorer):
+                mismatches += 1
+                print("MISMATCH", repr(title), class_name, exe, is_explorer, overrides)
+    print(f"{len(cases) * len(OVERRIDES)} cases, {mismatches} mismatches")
+
+    # Micro-benchmark: one scan = every case once (compilation counted once per scan)
+    repeat = 20
+    t0 = time.perf_counter()
+    for _ in range(repeat):
+        for title, class_name, exe, is_explorer in cases:
+            legacy_is_window_allowed(settings, title, class_name, exe, is_explorer, OVERRIDES[2])
+    t_legacy = (time.perf_counter() - t0) / (repeat * len(cases))
+
+    t0 = time.perf_counter()
+    for _ in range(repeat):
+        window_filter = compiled(settings, OVERRIDES[2])
+        for title, class_name, exe, is_explorer in cases:
+            window_filter.allowed(title, class_name, exe, is_explorer)
+    t_compiled = (time.perf_counter() - t0) / (repeat * len(cases))
+
+    print(f"legacy   {t_legacy * 1e6:6.2f} us/window")
+    print(f"compiled {t_compiled * 1e6:6.2f} us/window ({t_legacy / t_compiled:.1f}x)")
+    sys.exit(1 if mismatches else 0)
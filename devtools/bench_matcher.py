@@ -0,0 +1,157 @@
+import os
+import sys
+import time
+import random
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from wm_engine.matcher import WindowMatcher
+from wm_engine.candidates import CandidateIndex
+
+# Synthetic desktop: mostly Chrome / Explorer, like a busy workstation.
+CHROME = "C:\\Program Files\\Google\\Chrome\\Application\\chrome.exe"
+EXPLORER = "C:\\Windows\\explorer.exe"
+APPS = ["C:\\Windows\\notepad.exe", "C:\\Program Files\\Code\\Code.exe", "C:\\Python311\\python.exe"]
+SITES = ["github.com", "stackoverflow.com", "docs.python.org", "news.ycombinator.com", "youtube.com", "mail.google.com"]
+
+def make_desktop(count, seed=1):
+    rng = random.Random(seed)
+    windows = []
+    for hwnd in range(1, count + 1):
+        kind = rng.random()
+        if kind < 0.6:
+            site = rng.choice(SITES)
+            page = f"Page {hwnd} on {site}"
+            windows.append({"hwnd": hwnd, "title": f"{page} - Google Chrome", "cmdline": [CHROME],
+                            "url": f"https://{site}/item/{hwnd}/", "folder_path": None, "is_incognito": False, "is_minimized": False})
+        elif kind < 0.85:
+            folder = f"C:\\Users\\me\\Projects\\project_{hwnd}"
+            windows.append({"hwnd": hwnd, "title": f"project_{hwnd}", "cmdline": [EXPLORER],
+                            "url": None, "folder_path": folder, "is_incognito": False, "is_minimized": False})
+        else:
+            exe = rng.choice(APPS)
+            windows.append({"hwnd": hwnd, "title": f"document_{hwnd}.txt - {os.path.basename(exe)}", "cmdline": [exe, f"document_{hwnd}.txt"],
+                            "url": None, "folder_path": None, "is_incognito": False, "is_minimized": False})
+    return windows
+
+def to_saved(window):
+    return {"title_pattern": window["title"], "exact_title": window["title"], "cmdline": window["cmdline"],
+            "url": window["url"], "folder_path": window["folder_path"], "is_incognito": window["is_incognito"],
+            "show_cmd": 1, "rect": [0, 0, 800, 600]}
+
+def check_tabs(matcher):
+    """ Tab list cases (live tab list known from the session file): the same window must match, unrelated ones must not. """
+    tabs = [f"https://{site}/page/" for site in SITES[:5]]
+    saved = dict(to_saved({"title": "Saved - Google Chrome", "cmdline": [CHROME], "url": tabs[2], "folder_path": None,
+                           "is_incognito": False}), tabs=tabs, active_tab=2)
+    def live(url, live_tabs, title="Other - Google Chrome"):
+        return {"hwnd": 1, "title": title, "cmdline": [CHROME], "url": url, "tabs": live_tabs, "folder_path": None,
+                "is_incognito": False, "is_minimized": False}
+    other = [f"https://example.com/{i}" for i in range(4)]
+    cases = [
+        ("same tabs, first tab active (relaunched)", live(tabs[0], tabs), True),
+        ("same active tab, tabs added", live(tabs[2], tabs + other), True),
+        ("1 of 5 tabs shared, other active tab", live(tabs[0], tabs[:1] + other), False),
+        ("no tab shared", live(other[0], other), False),
+    ]
+    ok = True
+    for label, current, expected in cases:
+        score = matcher.score(saved, current)
+        good = (score >= matcher.MATCH_THRESHOLD) == expected
+        ok = ok and good
+        print(f"{label:<44} score {score:>5} {'OK' if good else 'WRONG'}")
+    return ok
+
+def window(hwnd, title, exe, url=None, folder=None):
+    return {"hwnd": hwnd, "title": title, "cmdline": [exe], "url": url, "folder_path": folder, "is_incognito": False, "is_minimized": False}
+
+NOTEPAD_PP = "C:\\Program Files\\Notepad++\\notepad++.exe"
+
+def index_edge_cases():
+    """ (saved, current) pairs the baseline matches although the index buckets keep them apart. """
+    return [
+        # Another executable, title more than 0.9 similar
+        (window(0, "report.txt - Notepad", APPS[0]), window(1001, "report.txt* - Notepad", NOTEPAD_PP)),
+        # Scheme-less live URL on the parent domain (URLs compare by substring)
+        (window(0, "Inbox - Gmail - Google Chrome", CHROME, url="https://mail.google.com/mail/u/0/"),
+         window(1002, "Gmail - Google Chrome", CHROME, url="google.com/mail/u/0/")),
+        (window(0, "3.12 Documentation - Google Chrome", CHROME, url="python.org/3/"),
+         window(1003, "Python docs - Google Chrome", CHROME, url="https://docs.python.org/3/")),
+    ]
+
+def greedy(matcher, saved_windows, current_windows):
+    """ Item-by-item matching (before match_all): each saved window takes its best free window. """
+    used = set()
+    results = []
+    for saved in saved_windows:
+        match = matcher.find_match(saved, current_windows, used)
+        if match: used.add(match["hwnd"])
+        results.append(match)
+    return results
+
+def check_assignment(matcher):
+    """ Contested windows: the first item's favourite is the second item's only match, match_all must place both. """
+    docs = "https://docs.python.org/3/"
+    saved = [to_saved(window(0, "Python docs - Google Chrome", CHROME, url=docs)),
+             to_saved(window(0, "Library - Google Chrome", CHROME, url=docs + "library/"))]
+    current = [window(1, "Python docs - Google Chrome", CHROME, url=docs + "library/"),
+               window(2, "Python docs tutorial - Google Chrome", CHROME, url=docs + "tutorial/")]
+    by_greedy = [m["hwnd"] if m else None for m in greedy(matcher, saved, current)]
+    by_assignment = [m["hwnd"] if m else None for m in matcher.match_all(saved, current)]
+    ok = by_greedy == [1, None] and by_assignment == [2, 1]
+    print(f"contested windows: greedy {by_greedy}, match_all {by_assignment} {'OK' if ok else 'WRONG'}")
+    return ok
+
+def check_index(matcher):
+    """ The index must keep every pair brute force accepts (edge cases + a synthetic desktop). """
+    current = make_desktop(120)
+    saved = [to_saved(w) for w in current]
+    for s, c in index_edge_cases():
+        saved.append(to_saved(s))
+        current.append(c)
+    def accepted(candidates):
+        return {(i, c["hwnd"]) for i, s in enumerate(saved) for c in candidates(s) if matcher.score(s, c) >= matcher.MATCH_THRESHOLD}
+    index = CandidateIndex(current)
+    brute = accepted(lambda s: current)
+    indexed = accepted(index.candidates)
+    edges = {hwnd for _, hwnd in brute if hwnd > 1000}
+    ok = brute == indexed and len(edges) == len(index_edge_cases())
+    print(f"index vs brute force: {len(brute)} accepted pairs, {len(brute - indexed)} missed by the index, "
+          f"{len(edges)}/{len(index_edge_cases())} edge cases {'OK' if ok else 'WRONG'}")
+    for i, hwnd in sorted(brute - indexed):
+        print(f"   missed: {saved[i]['exact_title']!r} -> {hwnd}")
+    return ok
+
+def brute_force(matcher, saved_windows, current_windows):
+    """ Reference: every saved item scored against every window (pre-index behaviour). """
+    for saved in saved_windows:
+        for current in current_windows:
+            matcher.score(saved, current)
+
+def timed(fn, repeat=3):
+    best = None
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        dt = time.perf_counter() - t0
+        best = dt if best is None else min(best, dt)
+    return best
+
+if __name__ == "__main__":
+    matcher = WindowMatcher()
+    tabs_ok = check_tabs(matcher)
+    tabs_ok &= check_index(matcher)
+    tabs_ok &= check_assignment(matcher)
+    print()
+    print(f"{'windows':>8} {'brute (s)':>10} {'indexed (s)':>12} {'speedup':>8}")
+    for count in (25, 50, 100, 150, 300):
+        current = make_desktop(count)
+        saved = [to_saved(w) for w in current]
+        random.Random(2).shuffle(current)
+
+        t_brute = timed(lambda: brute_force(matcher, saved, current))
+        t_index = timed(lambda: matcher.match_all(saved, current))
+
+        matches = matcher.match_all(saved, current)
+        wrong = sum(1 for s, m in zip(saved, matches) if not m or m["title"] != s["exact_title"])
+        print(f"{count:>8} {t_brute:>10.3f} {t_index:>12.3f} {t_brute / t_index:>7.1f}x" + (f"  ({wrong} mismatches)" if wrong else ""))
+    sys.exit(0 if tabs_ok else 1)
@@ -0,0 +1,237 @@
+"""
+Browser session files (wm_engine/sessions.py), offline (runs on Linux):
+
+1. Writes fixture files in both formats (Firefox mozLz4 JSON, Chromium SNSS),
+   reads them back and checks the windows / tabs / active tab found.
+2. Correlates the fixture windows with live window titles.
+3. Scans a synthetic desktop with and without session files and reports the
+   UI Automation calls and peeks (un-minimize / re-minimize) each one needs.
+
+    python devtools/bench_sessions.py [--keep FOLDER] [--windows N] [--latency typical]
+"""
+
+import argparse
+import json
+import os
+import struct
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from wm_engine import sessions
+from wm_engine.browsers import registry
+from wm_engine.settings import SettingsManager
+from wm_engine.scanner import WindowScanner
+from fake_desktop import generate, LATENCY_PROFILES
+
+# --- Writers (fixtures only) ---
+
+def lz4_compress(data):
+    """ Greedy LZ4 block compressor: enough to produce real back-references for the reader to decode. """
+    out = bytearray()
+
+    def length_bytes(n):
+        while n >= 255:
+            out.append(255)
+            n -= 255
+        out.append(n)
+
+    def sequence(literals, offset=None, match=0):
+        lit = len(literals)
+        out.append((min(lit, 15) << 4) | (min(match - 4, 15) if offset else 0))
+        if lit >= 15: length_bytes(lit - 15)
+        out.extend(literals)
+        if offset:
+            out.extend(struct.pack("<H", offset))
+            if match - 4 >= 15: length_bytes(match - 4 - 15)
+
+    table = {}
+    anchor = i = 0
+    end = len(data) - 5 # The last bytes are always literals
+    while i + 4 <= end:
+        key = data[i:i + 4]
+        candidate = table.get(key)
+        table[key] = i
+        if candidate is not None and i - candidate < 65536:
+            match = 4
+            while i + match < end and data[candidate + match] == data[i + match]:
+                match += 1
+            sequence(data[anchor:i], i - candidate, match)
+            i += match
+            anchor = i
+        else:
+            i += 1
+    sequence(data[anchor:])
+    return bytes(out)
+
+def write_mozlz4(path, session):
+    payload = json.dumps(session).encode("utf-8")
+    with open(path, "wb") as f:
+        f.write(sessions.MOZLZ4_MAGIC + struct.pack("<I", len(payload)) + lz4_compress(payload))
+
+def _pickle_string(data, length):
+    return struct.pack("<i", length) + data + b"\0" * (-len(data) % 4)
+
+def snss_navigation(tab_id, index, url, title):
+    body = struct.pack("<ii", tab_id, index) + _pickle_string(url.encode("utf-8"), len(url.encode("utf-8")))
+    body += _pickle_string(title.encode("utf-16-le"), len(title))
+    body += struct.pack("<ii", 0, 0) # Encoded page state etc. (ignored by the reader)
+    return sessions.CMD_UPDATE_TAB_NAVIGATION, struct.pack("<I", len(body)) + body
+
+def write_snss(path, commands, version=3):
+    with open(path, "wb") as f:
+        f.write(sessions.SNSS_MAGIC + struct.pack("<i", version))
+        for command, payload in commands:
+            f.write(struct.pack("<HB", len(payload) + 1, command) + payload)
+
+# --- Fixtures ---
+
+FIREFOX_SESSION = {"windows": [
+    {"selected": 2, "tabs": [
+        {"index": 1, "entries": [{"url": "https://developer.mozilla.org/", "title": "MDN Web Docs"}]},
+        {"index": 2, "entries": [{"url": "https://news.ycombinator.com/", "title": "Hacker News"},
+                                 {"url": "https://news.ycombinator.com/item?id=1", "title": "Show HN: Window Manager"}]},
+        {"index": 1, "hidden": True, "entries": [{"url": "https://hidden.example/", "title": "Hidden"}]}]},
+    {"selected": 1, "tabs": [{"index": 1, "entries": [{"url": "https://docs.python.org/3/", "title": "3.12 Documentation"}]}]},
+    # Two windows showing the same title, and one title shown by two live windows (see LIVE_TITLES)
+    {"selected": 1, "tabs": [{"index": 1, "entries": [{"url": "https://grafana.example/d/1", "title": "Dashboard"}]}]},
+    {"selected": 1, "tabs": [{"index": 1, "entries": [{"url": "https://grafana.example/d/2", "title": "Dashboard"}]}]},
+    {"selected": 1, "tabs": [{"index": 1, "entries": [{"url": "https://example.org/releases", "title": "Release notes"}]}]},
+]}
+FIREFOX_EXPECTED = [
+    (["https://developer.mozilla.org/", "https://news.ycombinator.com/item?id=1"], 1),
+    (["https://docs.python.org/3/"], 0),
+    (["https://grafana.example/d/1"], 0),
+    (["https://grafana.example/d/2"], 0),
+    (["https://example.org/releases"], 0),
+]
+
+def chromium_commands():
+    c = []
+    def cmd(command, fmt, *values): c.append((command, struct.pack(fmt, *values)))
+    # Window 1: three tabs, the second one active, with some history on tab 11
+    for tab, index in ((10, 0), (11, 1), (12, 2)):
+        cmd(sessions.CMD_SET_TAB_WINDOW, "<ii", 1, tab)
+        cmd(sessions.CMD_SET_TAB_INDEX_IN_WINDOW, "<ii", tab, index)
+    c.append(snss_navigation(10, 0, "https://github.com/", "GitHub"))
+    c.append(snss_navigation(11, 0, "https://www.google.com/", "Google"))
+    c.append(snss_navigation(11, 1, "https://stackoverflow.com/questions/1", "python - How do I? - Stack Overflow"))
+    c.append(snss_navigation(11, 2, "https://stackoverflow.com/questions/2", "Forward page"))
+    cmd(sessions.CMD_SET_SELECTED_NAVIGATION_INDEX, "<ii", 11, 1)
+    c.append(snss_navigation(12, 0, "chrome://newtab/", "New Tab"))
+    cmd(sessions.CMD_SET_SELECTED_TAB_IN_INDEX, "<ii", 1, 1)
+    # Window 2: one tab left after another was closed
+    for tab, index in ((20, 0), (21, 1)):
+        cmd(sessions.CMD_SET_TAB_WINDOW, "<ii", 2, tab)
+        cmd(sessions.CMD_SET_TAB_INDEX_IN_WINDOW, "<ii", tab, index)
+    c.append(snss_navigation(20, 0, "https://mail.google.com/", "Inbox (3) - me@example.com - Gmail"))
+    c.append(snss_navigation(21, 0, "https://closed.example/", "Closed"))
+    cmd(sessions.CMD_TAB_CLOSED, "<iiq", 21, 0, 0)
+    # Window 3: a popup (not restored as a browser window); window 4: closed
+    cmd(sessions.CMD_SET_TAB_WINDOW, "<ii", 3, 30)
+    cmd(sessions.CMD_SET_WINDOW_TYPE, "<ii", 3, 1)
+    c.append(snss_navigation(30, 0, "https://popup.example/", "Popup"))
+    cmd(sessions.CMD_SET_TAB_WINDOW, "<ii", 4, 40)
+    c.append(snss_navigation(40, 0, "https://gone.example/", "Gone"))
+    cmd(sessions.CMD_WINDOW_CLOSED, "<iiq", 4, 0, 0)
+    return c
+
+CHROMIUM_EXPECTED = [
+    (["https://github.com/", "https://stackoverflow.com/questions/1", "chrome://newtab/"], 1),
+    (["https://mail.google.com/"], 0),
+]
+
+LIVE_TITLES = [
+    (101, "Show HN: Window Manager — Mozilla Firefox"),
+    (102, "3.12 Documentation — Mozilla Firefox"),
+    (201, "python - How do I? - Stack Overflow - Google Chrome"),
+    (202, "Inbox (3) - me@example.com - Gmail - Google Chrome"),
+    (203, "Untitled - Google Chrome"),
+    (103, "Dashboard — Mozilla Firefox"), # Two session windows with this title: ambiguous
+    (104, "Release notes — Mozilla Firefox"), # Two live windows with this title: ambiguous
+    (105, "Release notes — Mozilla Firefox"),
+]
+DUPLICATE_TITLES = {103, 104, 105}
+
+def summary(windows):
+    return sorted(([t.url for t in w.tabs], w.active) for w in windows)
+
+def check_files(folder):
+    ok = True
+    firefox_path = os.path.join(folder, "recovery.jsonlz4")
+    chromium_path = os.path.join(folder, "Session_13350000000000000")
+    write_mozlz4(firefox_path, FIREFOX_SESSION)
+    write_snss(chromium_path, chromium_commands())
+
+    for label, path, reader, expected in (("mozLz4", firefox_path, sessions.read_firefox_session, FIREFOX_EXPECTED),
+                                          ("SNSS", chromium_path, sessions.read_snss, CHROMIUM_EXPECTED)):
+        t0 = time.perf_counter()
+        windows = reader(path)
+        dt = time.perf_counter() - t0
+        good = summary(windows) == sorted(expected)
+        ok = ok and good
+        print(f"{label:7} {os.path.getsize(path):6} bytes  {len(windows)} window(s)  {dt * 1000:.2f} ms  {'OK' if good else 'MISMATCH'}")
+        if not good: print("   got", summary(windows))
+
+    # Larger Firefox session: decompression speed of the pure-Python reader
+    big = {"windows": [{"selected": 1, "tabs": [{"index": 1, "entries": [
+        {"url": f"https://example.com/page/{w}/{t}", "title": f"Example page {w}-{t}"}]} for t in range(40)]} for w in range(25)]}
+    big_path = os.path.join(folder, "big.jsonlz4")
+    write_mozlz4(big_path, big)
+    t0 = time.perf_counter()
+    windows = sessions.read_firefox_session(big_path)
+    dt = time.perf_counter() - t0
+    ok = ok and sum(len(w.tabs) for w in windows) == 1000
+    print(f"mozLz4  {os.path.getsize(big_path):6} bytes  {len(windows)} window(s), 1000 tabs  {dt * 1000:.2f} ms")
+
+    session_windows = sessions.read_firefox_session(firefox_path) + sessions.read_snss(chromium_path)
+    matches = sessions.correlate(session_windows, [(hwnd, registry.clean_title(title)) for hwnd, title in LIVE_TITLES])
+    expected_matches = {101, 102, 201, 202}
+    good = set(matches) == expected_matches
+    ok = ok and good
+    print(f"correlate: {len(matches)}/{len(LIVE_TITLES)} live windows matched {'OK' if good else 'MISMATCH'}")
+    good = not DUPLICATE_TITLES & set(matches)
+    ok = ok and good
+    print(f"correlate: duplicate titles left unmatched {'OK' if good else 'MISMATCH'}")
+    for hwnd, title in LIVE_TITLES:
+        match = matches.get(hwnd)
+        print(f"   {title[:50]:50} -> {match.active_tab.url if match else '-'}")
+    return ok
+
+def scan_cost(count, latency, use_sessions, workdir):
+    settings = SettingsManager(os.path.join(workdir, f"settings_{use_sessions}.json"), write_behind=False)
+    settings.settings["session_files"] = use_sessions
+    settings.settings["detail_cache"] = False
+    desktop = generate(count, latency=LATENCY_PROFILES[latency])
+    minimized = {hwnd for hwnd in desktop.windows if desktop.is_iconic(hwnd)}
+    peeks = []
+    show_window = desktop.show_window
+    desktop.show_window = lambda hwnd, cmd: (peeks.append(hwnd) if hwnd in minimized else None, show_window(hwnd, cmd))
+    scanner = WindowScanner(settings, backend=desktop)
+    desktop.calls.clear()
+    t0 = time.perf_counter()
+    windows = scanner.get_target_windows(detailed_scan=True, allow_peeking=True)
+    dt = time.perf_counter() - t0
+    urls = sum(1 for w in windows if w["url"])
+    return dt, desktop.calls, len(set(peeks)), urls
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--keep", help="Write the fixture files to this folder (kept)")
+    parser.add_argument("--windows", type=int, default=60)
+    parser.add_argument("--latency", default="zero", choices=sorted(LATENCY_PROFILES))
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp()
+    folder = args.keep or workdir
+    os.makedirs(folder, exist_ok=True)
+    ok = check_files(folder)
+
+    print(f"\nscan of {args.windows} windows ({args.latency} latency)")
+    for use_sessions in (False, True):
+        dt, calls, peeks, urls = scan_cost(args.windows, args.latency, use_sessions, workdir)
+        label = "sessions" if use_sessions else "UIA only"
+        print(f"{label:9} {dt * 1000:8.1f} ms  uia_url={calls.get('uia_url', 0):3}  uia_incognito={calls.get('uia_incognito', 0):3}  "
+              f"session reads={calls.get('session', 0)}  peeks={peeks}  urls={urls}")
+    sys.exit(0 if ok else 1)
@@ -0,0 +1,107 @@
+import json
+import os
+import sys
+import shutil
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from wm_engine.storage import LayoutStorage
+
+SCENARIOS = 500
+WINDOWS_PER_SCENARIO = 15
+
+def make_layouts(count=SCENARIOS, windows=WINDOWS_PER_SCENARIO):
+    layouts = {}
+    for s in range(count):
+        items = []
+        for w in range(windows):
+            items.append({"title_pattern": f"Page {w} - Google Chrome", "exact_title": f"Page {w} of scenario {s} - Google Chrome",
+                          "rect": [10 * w, 10 * w, 900, 700], "show_cmd": 1, "url": f"https://example.com/{s}/{w}",
+                          "folder_path": None, "cmdline": ["C:\\Program Files\\Google\\Chrome\\Application\\chrome.exe"],
+                          "is_incognito": False, "cwd": "C:\\"})
+        layouts[f"Scenario {s}"] = {"windows": items, "settings": {"precise_urls": True}}
+    return layouts
+
+class LegacyStorage:
+    """ The single-file layouts.json behaviour: full parse on every get_layout, full rewrite on every set. """
+
+    def __init__(self, layout_file):
+        self.layout_file = layout_file
+        self.parse_count = 0
+        self.layouts = self.load_layouts()
+
+    def load_layouts(self):
+        with open(self.layout_file, "r") as f:
+            self.parse_count += 1
+            return json.load(f)
+
+    def save_layouts(self, layouts):
+        self.layouts = layouts
+        with open(self.layout_file, "w") as f:
+            json.dump(self.layouts, f, indent=4)
+
+    def get_layout(self, name):
+        self.layouts = self.load_layouts()
+        return self.layouts.get(name)
+
+    def get_layout_settings(self, name):
+        data = self.get_layout(name)
+        return data.get("settings", {}) if data else {}
+
+    def set_layout_settings(self, name, settings):
+        data = self.get_layout(name)
+        data["settings"] = settings
+        self.layouts[name] = data
+        self.save_layouts(self.layouts)
+
+    def set_layout(self, name, data):
+        self.layouts[name] = data
+        self.save_layouts(self.layouts)
+
+def save_sequence(storage, name, data):
+    """ What engine.save_layout does for one scenario. """
+    settings = storage.get_layout_settings(name)
+    storage.set_layout_settings(name, settings)
+    storage.set_layout(name, data)
+
+def run(storage_cls, layout_file, layouts):
+    t0 = time.perf_counter()
+    storage = storage_cls(layout_file)
+    t_open = time.perf_counter() - t0
+    parses_open = storage.parse_count
+
+    names = list(layouts)[:20]
+    t0 = time.perf_counter()
+    for name in names:
+        storage.get_layout(name) # restore_layout
+    t_restore = (time.perf_counter() - t0) / len(names)
+
+    t0 = time.perf_counter()
+    for name in names:
+        save_sequence(storage, name, layouts[name])
+    t_save = (time.perf_counter() - t0) / len(names)
+    parses = storage.parse_count - parses_open
+    return t_open, t_restore, t_save, parses_open, parses / len(names)
+
+if __name__ == "__main__":
+    layouts = make_layouts()
+    root = tempfile.mkdtemp(prefix="wm_bench_")
+    try:
+        results = {}
+        for label, cls in (("legacy", LegacyStorage), ("per-file", LayoutStorage)):
+            folder = os.path.join(root, label)
+            os.makedirs(folder)
+            layout_file = os.path.join(folder, "layouts.json")
+            with open(layout_file, "w") as f:
+                json.dump(layouts, f, indent=4)
+            if cls is LayoutStorage:
+                cls(layout_file) # One-off migration, not timed
+            results[label] = run(cls, layout_file, layouts)
+
+        print(f"{SCENARIOS} scenarios x {WINDOWS_PER_SCENARIO} windows")
+        print(f"{'storage':>9} {'open (ms)':>10} {'restore (ms)':>13} {'save (ms)':>10} {'open parses':>12} {'parses/scn':>10}")
+        for label, (t_open, t_restore, t_save, parses_open, parses) in results.items():
+            print(f"{label:>9} {t_open * 1000:>10.1f} {t_restore * 1000:>13.2f} {t_save * 1000:>10.2f} {parses_open:>12} {parses:>10.1f}")
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
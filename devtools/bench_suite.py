@@ -0,0 +1,160 @@
+"""
+Offline benchmark suite: matcher, storage, scan and restore on a simulated desktop.
+
+    python devtools/bench_suite.py --output bench.json
+    python devtools/bench_suite.py --latency typical --compare bench.json
+
+Results are written as JSON (one entry per benchmark: best / median seconds,
+plus call counts where relevant) so two commits can be compared with --compare.
+Runs anywhere: the engine runs against an in-memory desktop (MemoryBackend).
+"""
+
+import argparse
+import json
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from fake_desktop import generate, window_dicts, saved_layout, LATENCY_PROFILES
+from wm_engine.logger import Logger
+from wm_engine.matcher import WindowMatcher
+from wm_engine.storage import LayoutStorage
+from wm_engine.settings import SettingsManager
+from wm_engine.scanner import WindowScanner
+from wm_engine.restorer import WindowRestorer
+
+def timed(fn, repeat, setup=None):
+    """ Runs fn(setup()) 'repeat' times; setup time is not counted. """
+    runs = []
+    for _ in range(repeat):
+        arg = setup() if setup else None
+        t0 = time.perf_counter()
+        fn(arg)
+        runs.append(time.perf_counter() - t0)
+    return {"best": min(runs), "median": statistics.median(runs), "runs": repeat}
+
+def bench_matcher(results, sizes, repeat):
+    matcher = WindowMatcher()
+    for count in sizes:
+        desktop = generate(count)
+        current = window_dicts(desktop)
+        saved = saved_layout(desktop)
+        results[f"matcher.find_match[{count}]"] = timed(lambda _: [matcher.find_match(s, current, set()) for s in saved], repeat)
+        results[f"matcher.match_all[{count}]"] = timed(lambda _: matcher.match_all(saved, current), repeat)
+
+def bench_storage(results, sizes, repeat, workdir):
+    for compact in (False, True):
+        for count in sizes:
+            folder = tempfile.mkdtemp(dir=workdir)
+            storage = LayoutStorage(os.path.join(folder, "layouts.json"), use_compact=compact)
+            layout = saved_layout(generate(count))
+            name = f"storage.{'compact' if compact else 'json'}"
+
+            def round_trip(_):
+                storage.set_layout("Bench", layout)
+                storage.invalidate("Bench")
+                storage.get_layout("Bench")
+            results[f"{name}.round_trip[{count}]"] = timed(round_trip, repeat)
+
+def bench_scan(results, sizes, repeat, latency, workdir):
+    settings = SettingsManager(os.path.join(workdir, "settings.json"))
+    for count in sizes:
+        desktop = generate(count, latency=latency)
+        scanner = WindowScanner(settings, backend=desktop)
+
+        def cold(_):
+            scanner.clear_cache()
+            scanner.get_target_windows(detailed_scan=True, allow_peeking=False)
+        desktop.calls.clear()
+        results[f"scan.cold[{count}]"] = dict(timed(cold, repeat), calls=dict(desktop.calls))
+
+        # Warm: second scan of an unchanged desktop (snapshot + caches)
+        desktop.calls.clear()
+        results[f"scan.warm[{count}]"] = dict(timed(lambda _: scanner.get_target_windows(detailed_scan=True, allow_peeking=False), repeat),
+                                              calls=dict(desktop.calls))
+
+def bench_restore(results, sizes, repeat, latency, workdir, missing_share=0.3):
+    """ Full restore_layout: most windows are already open, 'missing_share' of them must be launched. """
+    settings = SettingsManager(os.path.join(workdir, "settings.json"))
+    for count in sizes:
+        def setup():
+            desktop = generate(count, latency=latency)
+            layout = saved_layout(desktop)
+            desktop.close(list(desktop.windows)[:int(count * missing_share)]) # Relaunched from the recorded windows
+
+            storage = LayoutStorage(os.path.join(tempfile.mkdtemp(dir=workdir), "layouts.json"))
+            storage.set_layout("Bench", layout)
+            return WindowRestorer(settings, WindowScanner(settings, backend=desktop), WindowMatcher(), storage, backend=desktop)
+
+        def restore(restorer):
+            restorer.restore_layout("Bench")
+        results[f"restore.plan[{count}]"] = timed(restore, repeat, setup)
+
+def git_revision():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True, text=True, timeout=10).stdout.strip() or None
+    except Exception:
+        return None
+
+def compare(results, baseline_path):
+    with open(baseline_path, "r", encoding="utf-8") as f:
+        baseline = json.load(f)["results"]
+    print(f"\n{'benchmark':<36} {'baseline (ms)':>14} {'now (ms)':>10} {'ratio':>7}")
+    for name, entry in results.items():
+        old = baseline.get(name)
+        if not old: continue
+        ratio = entry["best"] / old["best"] if old["best"] else float("inf")
+        print(f"{name:<36} {old['best'] * 1000:>14.2f} {entry['best'] * 1000:>10.2f} {ratio:>6.2f}x")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--latency", choices=sorted(LATENCY_PROFILES), default="zero", help="Simulated OS / UIA call latencies")
+    parser.add_argument("--sizes", default="25,100,300", help="Desktop sizes (windows), comma separated")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--only", default="matcher,storage,scan,restore", help="Benchmarks to run, comma separated")
+    parser.add_argument("--output", help="Write the results to this JSON file")
+    parser.add_argument("--compare", help="Previous --output file to compare against")
+    args = parser.parse_args()
+
+    sizes = [int(s) for s in args.sizes.split(",") if s]
+    latency = LATENCY_PROFILES[args.latency]
+    only = set(args.only.split(","))
+    Logger.ECHO = False # Keep the engine logs out of the timings and the report
+
+    results = {}
+    workdir = tempfile.mkdtemp(prefix="wm_bench_")
+    try:
+        if "matcher" in only: bench_matcher(results, sizes, args.repeat)
+        if "storage" in only: bench_storage(results, sizes, args.repeat, workdir)
+        if "scan" in only: bench_scan(results, sizes, args.repeat, latency, workdir)
+        if "restore" in only: bench_restore(results, sizes, args.repeat, latency, workdir)
+    finally:
+        Logger.drain()
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    print(f"{'benchmark':<36} {'best (ms)':>10} {'median (ms)':>12}")
+    for name, entry in results.items():
+        print(f"{name:<36} {entry['best'] * 1000:>10.2f} {entry['median'] * 1000:>12.2f}")
+
+    if args.output:
+        report = {
+            "meta": {"revision": git_revision(), "python": platform.python_version(), "platform": platform.platform(),
+                     "time": time.strftime("%Y-%m-%dT%H:%M:%S"), "latency": args.latency, "sizes": sizes, "repeat": args.repeat},
+            "results": results,
+        }
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        print(f"Results written to {args.output}")
+    if args.compare:
+        compare(results, args.compare)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,163 @@
+"""
+Cross-process UI Automation calls needed to read a browser window's URL and
+incognito status: the legacy sequence (named searches, regex search, walk, then
+a separate incognito walk) against one uia_scan traversal.
+
+Runs on a fake Chromium-like UIA tree (runs on Linux). Every property read and
+navigation step of the legacy code counts as one call (uiautomation's searches
+read ControlType, then Name on a type match, for each element visited); a search
+that finds nothing is counted once, although Exists() retries until its timeout.
+The new traversal costs one FindAllBuildCache call per expanded element.
+"""
+
+import os
+import re
+import sys
+import random
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from wm_engine.uia_scan import ADDRESS_BAR_NAMES, SCAN_CONTROL_TYPES, UiaNode, scan_browser_window
+
+class FakeElement:
+    def __init__(self, control_type, name="", value=None, children=None):
+        self.control_type = control_type
+        self.name = name
+        self.value = value # None: no ValuePattern
+        self.children = children or []
+
+def build_browser(tabs=12, page_nodes=1500, address_name=ADDRESS_BAR_NAMES[0], url="https://github.com/", private=False, seed=1):
+    """ Window > panes > (tab strip, toolbar > ... > address bar at depth 8), web content Document with 'page_nodes' elements. """
+    rng = random.Random(seed)
+    tab_strip = FakeElement("TabControl", "Tab strip", children=[
+        FakeElement("TabItemControl", f"Tab {i}", children=[FakeElement("ButtonControl", "Close")]) for i in range(tabs)])
+    address_bar = FakeElement("EditControl", address_name, value=url)
+    toolbar = FakeElement("ToolBarControl", "", children=[
+        FakeElement("ButtonControl", "Back"), FakeElement("ButtonControl", "Forward"), FakeElement("ButtonControl", "Reload"),
+        FakeElement("GroupControl", "", children=[FakeElement("GroupControl", "", children=[
+            FakeElement("PaneControl", "", children=[FakeElement("ButtonControl", "View site information"), address_bar]),
+            FakeElement("ButtonControl", "Bookmark this tab")])]),
+        FakeElement("ButtonControl", "Extensions"), FakeElement("MenuItemControl", "Chrome")])
+    top = [FakeElement("ButtonControl", "Incognito")] if private else []
+    top += [tab_strip, toolbar]
+
+    page = []
+    kinds = ["HyperlinkControl", "TextControl", "ImageControl", "GroupControl", "ListItemControl"]
+    for i in range(page_nodes):
+        kind = rng.choice(kinds)
+        node = FakeElement(kind, f"{kind[:-7].lower()} {i}")
+        if kind == "GroupControl" and page:
+            node.children = [page.pop() for _ in range(min(len(page), 3))]
+        page.append(node)
+    document = FakeElement("DocumentControl", "GitHub", value=url, children=page)
+
+    title_bar = FakeElement("TitleBarControl", "", children=[FakeElement("ButtonControl", n) for n in ("Minimize", "Maximize", "Close")])
+    return FakeElement("WindowControl", "GitHub - Google Chrome", children=[
+        title_bar,
+        FakeElement("PaneControl", "", children=[FakeElement("PaneControl", "", children=[
+            FakeElement("PaneControl", "", children=top),
+            FakeElement("PaneControl", "", children=[document])])])])
+
+class Calls:
+    def __init__(self):
+        self.count = 0
+
+def walk(root, max_depth):
+    """ Depth-first (element, depth) below root, as uiautomation.WalkControl / FindControl. """
+    stack = [(child, 1) for child in reversed(root.children)]
+    while stack:
+        element, depth = stack.pop()
+        yield element, depth
+        if depth < max_depth:
+            stack.extend((child, depth + 1) for child in reversed(element.children))
+
+def legacy_search(root, calls, match_name, max_depth=15):
+    """ window.EditControl(Name=... / RegexName=..., searchDepth=15).Exists() """
+    for element, depth in walk(root, max_depth):
+        calls.count += 2 # Navigation + ControlType
+        if element.control_type == "EditControl":
+            calls.count += 1 # Name
+            if match_name(element.name): return element
+    return None
+
+def legacy_find_address_bar(root, calls):
+    """ automation._find_address_bar before uia_scan (reference). Returns the value. """
+    for name in ADDRESS_BAR_NAMES:
+        edit = legacy_search(root, calls, lambda n: n == name)
+        if edit is not None:
+            calls.count += 2 # GetValuePattern + Value
+            if edit.value: return edit.value
+
+    regex = re.compile(".*(http|https|www|localhost|://).*")
+    edit = legacy_search(root, calls, lambda n: regex.match(n) is not None)
+    if edit is not None:
+        calls.count += 2
+        if edit.value: return edit.value
+
+    count = 0
+    for control, depth in walk(root, 12):
+        calls.count += 2 # Navigation + ControlTypeName
+        if control.control_type == "EditControl":
+            calls.count += 2 # Name + GetPattern
+            name = control.name
+            if "http" in name or "www." in name or "localhost" in name:
+                if control.value is not None:
+                    calls.count += 1
+                    return control.value
+            if control.value is not None:
+                calls.count += 2 # GetPattern + Value
+                val = control.value
+                if val and ("." in val or "http" in val or "localhost" in val):
+                    return val
+        if count > 200: break
+        count += 1
+    return None
+
+def legacy_is_incognito(root, calls):
+    """ UI part of automation.is_incognito before uia_scan (reference). """
+    keywords = ["Incognito", "Privée", "InPrivate", "Private"]
+    for control, depth in walk(root, 4):
+        calls.count += 2 # Navigation + Name
+        name = control.name
+        if not name: continue
+        for k in keywords:
+            if k.lower() in name.lower():
+                return True
+    return False
+
+def counting_find_children(calls):
+    """ find_children over the fake tree: one FindAllBuildCache call, SCAN_CONTROL_TYPES condition applied provider-side. """
+    def find_children(element):
+        calls.count += 1
+        return [UiaNode(child, child.name, child.control_type, child.value)
+                for child in element.children if child.control_type in SCAN_CONTROL_TYPES]
+    return find_children
+
+CASES = [
+    ("chrome, English", dict()),
+    ("chrome, English, incognito", dict(private=True)),
+    ("chrome, French", dict(address_name=ADDRESS_BAR_NAMES[1])),
+    ("chrome, French, incognito", dict(address_name=ADDRESS_BAR_NAMES[1], private=True)),
+    ("unknown address bar name", dict(address_name="Omnibox")),
+    ("50 tabs, 5000 page nodes", dict(tabs=50, page_nodes=5000)),
+]
+
+if __name__ == "__main__":
+    total_legacy = total_new = 0
+    mismatches = 0
+    print(f"{'case':32} {'legacy':>8} {'scan':>6} {'ratio':>7}")
+    for label, kwargs in CASES:
+        root = build_browser(**kwargs)
+        legacy_calls = Calls()
+        legacy = (legacy_find_address_bar(root, legacy_calls), legacy_is_incognito(root, legacy_calls))
+
+        new_calls = Calls()
+        scan = scan_browser_window(root, counting_find_children(new_calls))
+        new = (scan.url, scan.incognito_marker is not None)
+        if new != legacy:
+            mismatches += 1
+            print("MISMATCH", label, legacy, new)
+
+        total_legacy += legacy_calls.count
+        total_new += new_calls.count
+        print(f"{label:32} {legacy_calls.count:8} {new_calls.count:6} {legacy_calls.count / new_calls.count:6.1f}x")
+    print(f"{len(CASES)} cases, {mismatches} mismatches; {total_legacy} -> {total_new} cross-process calls ({total_legacy / total_new:.1f}x fewer)")
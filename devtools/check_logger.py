@@ -0,0 +1,33 @@
+"""
+Logger ring buffer with ECHO off: records lost to a full buffer are reported
+once, at the head of the next drain(), and nothing else is lost or repeated.
+
+    python devtools/check_logger.py
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from wm_engine.logger import Logger
+
+def check(label, good, detail=""):
+    print(f"{label:58} {'OK' if good else 'FAIL'} {detail}")
+    return good
+
+if __name__ == "__main__":
+    Logger.ECHO = False
+    Logger.drain()
+    size = Logger.BUFFER_SIZE
+    for n in range(size + 25):
+        Logger.info(f"message {n}")
+    records = Logger.drain()
+    ok = check("overflow: one warning, then the newest records",
+               records[0].level == "warn" and "25 message(s)" in records[0].message and len(records) == size + 1
+               and records[1].message == "message 25" and records[-1].message == f"message {size + 24}",
+               records[0].message)
+
+    Logger.info("after")
+    records = Logger.drain()
+    ok &= check("next drain: no repeated warning", [r.message for r in records] == ["after"])
+    sys.exit(0 if ok else 1)
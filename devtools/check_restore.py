@@ -0,0 +1,195 @@
+"""
+Restore Phase 2 on simulated time (runs on Linux, in milliseconds):
+
+1. Window poller (WindowRestorer._window_poller) fed by a ScriptedEventSource:
+   a window reported by an event is found on the next poll, a window that
+   appears without any event is found by the FULL_RESCAN_INTERVAL full scan,
+   and a window that never appears gives up at the launch scheduler timeout.
+2. Launch order and pacing (WindowRestorer._launch_jobs + LaunchScheduler):
+   Apps -> Browsers -> Private Chrome -> Private Firefox, the minimum delay
+   after each launch, one Firefox launch at a time, Private Firefox after
+   everything else, the 10s per-job timeout and the launch_concurrency cap.
+
+    python devtools/check_restore.py
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from wm_engine.events import ScriptedEventSource
+from wm_engine.logger import Logger
+from wm_engine.pipeline import LaunchJob, LaunchScheduler
+from wm_engine.restorer import WindowRestorer
+
+class FakeClock:
+    """ Simulated time: sleep() only moves the clock forward. """
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def time(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.now += max(0, seconds)
+
+class TimedScanner:
+    """ Desktop where each window exists from a given simulated time; records the scans asked for. """
+
+    def __init__(self, clock, appears_at):
+        self.clock = clock
+        self.appears_at = appears_at # hwnd -> seconds after start
+        self.start = clock.time()
+        self.scans = []
+
+    def _visible(self, hwnds):
+        elapsed = self.clock.time() - self.start
+        return [{"hwnd": hwnd, "title": f"Window {hwnd}"} for hwnd in hwnds if self.appears_at.get(hwnd, elapsed + 1) <= elapsed]
+
+    def get_target_windows(self, detailed_scan=False, overrides=None):
+        self.scans.append(("full", self.clock.time() - self.start))
+        return self._visible(self.appears_at)
+
+    def get_windows(self, hwnds, detailed_scan=False, overrides=None):
+        self.scans.append(("events", self.clock.time() - self.start))
+        return self._visible(hwnds)
+
+class TitleMatcher:
+    def match_all(self, items, windows, used_hwnds):
+        by_title = {w["title"]: w for w in windows if w["hwnd"] not in used_hwnds}
+        return [by_title.get(item["exact_title"]) for item in items]
+
+def restorer(clock, scanner):
+    return WindowRestorer(None, scanner, TitleMatcher(), None, backend=object(), clock=clock.time, sleep=clock.sleep)
+
+def run_poller(appears_at, script, timeout=10):
+    """ One job expecting window 1 through the real scheduler; returns (job, scans, elapsed). """
+    clock = FakeClock()
+    scanner = TimedScanner(clock, appears_at)
+    events = ScriptedEventSource(script, clock=clock.time, sleep=clock.sleep)
+    events.start()
+    r = restorer(clock, scanner)
+    job = LaunchJob([{"exact_title": "Window 1"}])
+    scheduler = LaunchScheduler(lambda job: None, r._window_poller(set(), None, events), lambda saved, match: None,
+                                timeout=timeout, clock=clock.time, sleep=clock.sleep)
+    scheduler.run([job])
+    return job, scanner.scans, clock.time() - scanner.start
+
+CHROME = "C:\\Program Files\\Google\\Chrome\\Application\\chrome.exe"
+FIREFOX = "C:\\Program Files\\Mozilla Firefox\\firefox.exe"
+NOTEPAD = "C:\\Windows\\notepad.exe"
+
+def saved(title, exe, private=False, url=None, tabs=None):
+    return {"exact_title": title, "cmdline": [exe], "is_incognito": private, "url": url, "tabs": tabs or []}
+
+# Saved windows in scan order; a browser window with several tabs gets a launch of its own
+ITEMS = [
+    saved("Private FF", FIREFOX, private=True, url="https://private.example/"),
+    saved("Firefox 1", FIREFOX, tabs=["https://a.example/", "https://b.example/"]),
+    saved("Notes", NOTEPAD),
+    saved("Private Chrome", CHROME, private=True, tabs=["https://c.example/", "https://d.example/"]),
+    saved("Chrome", CHROME, tabs=["https://e.example/", "https://f.example/"]),
+    saved("Firefox 2", FIREFOX, tabs=["https://g.example/", "https://h.example/"]),
+    saved("Todo", NOTEPAD),
+]
+KIND = {"Notes": 0, "Todo": 0, "Chrome": 1, "Firefox 1": 1, "Firefox 2": 1, "Private Chrome": 2, "Private FF": 3}
+
+def run_launches(items, appear_after, concurrency=4):
+    """
+    Runs the restorer's launch jobs for 'items' on simulated time; each window
+    appears 'appear_after[title]' seconds after its launch (never if missing).
+    Returns (jobs, launches): launches = (time, job, jobs still in flight) in order.
+    """
+    clock = FakeClock()
+    r = restorer(clock, None)
+    jobs = r._launch_jobs(items)
+    launches = []
+
+    def launch(job):
+        launches.append((clock.time(), job, [j for _, j, _ in launches if not j.settled]))
+
+    def poll(pending, wait):
+        clock.sleep(wait)
+        ready = []
+        for item in pending:
+            job = next(j for _, j, _ in launches if any(i is item for i in j.items))
+            delay = appear_after.get(item["exact_title"])
+            ready.append({"hwnd": id(item)} if delay is not None and clock.time() - job.launched_at >= delay else None)
+        return ready
+
+    LaunchScheduler(launch, poll, lambda saved, match: None, max_concurrency=concurrency, timeout=10,
+                    clock=clock.time, sleep=clock.sleep).run(jobs)
+    return jobs, launches
+
+def is_firefox(job):
+    return job.items[0]["cmdline"][0] == FIREFOX
+
+def check_launches():
+    ok = True
+    appear_after = {item["exact_title"]: 1.5 for item in ITEMS}
+    appear_after["Firefox 1"] = 3.0 # Still pending when Firefox 2 could launch
+    del appear_after["Chrome"] # Never appears: times out
+    jobs, launches = run_launches(ITEMS, appear_after)
+
+    kinds = [KIND[job.items[0]["exact_title"]] for _, job, _ in launches]
+    ok &= check("order: apps, browsers, private Chrome, private Firefox", kinds == sorted(kinds) and len(launches) == len(ITEMS),
+                str([job.items[0]["exact_title"] for _, job, _ in launches]))
+
+    gaps = [(t2 - t1, job.spacing) for (t1, job, _), (t2, _, _) in zip(launches, launches[1:])]
+    ok &= check("spacing: each launch waits for the previous job's delay", all(gap >= spacing - 1e-9 for gap, spacing in gaps),
+                str([round(gap, 2) for gap, _ in gaps]))
+
+    ok &= check("Firefox: never two launches in flight",
+                all(not (is_firefox(job) and any(is_firefox(j) for j in in_flight)) for _, job, in_flight in launches))
+
+    at, private_ff, in_flight = launches[-1]
+    others = [job for job in jobs if job is not private_ff]
+    ok &= check("private Firefox: launched once everything else settled", not in_flight and all(job.settled for job in others),
+                f"at {at - launches[0][0]:.2f}s")
+
+    chrome = next(job for job in jobs if job.items[0]["exact_title"] == "Chrome")
+    ok &= check("timeout: a window that never appears is given up after 10s",
+                chrome.settled and chrome.matches[0] is None and at - chrome.launched_at >= 10,
+                f"private Firefox launched {at - chrome.launched_at:.2f}s after it")
+
+    apps = [saved(f"App {n}", NOTEPAD) for n in range(6)]
+    jobs, launches = run_launches(apps, {item["exact_title"]: 3.0 for item in apps}, concurrency=2)
+    busiest = max(len(in_flight) + 1 for _, _, in_flight in launches)
+    ok &= check("launch_concurrency: at most 2 launches waiting at once",
+                busiest == 2 and all(job.matches[0] for job in jobs), f"max in flight {busiest}")
+    return ok
+
+def check(label, good, detail=""):
+    print(f"{label:58} {'OK' if good else 'FAIL'} {detail}")
+    return good
+
+def check_poller():
+    ok = True
+
+    # Reported by an event at 0.5s: found by the event scan, no second full scan
+    job, scans, _ = run_poller({1: 0.5}, [(0.5, 1)])
+    kinds = [kind for kind, _ in scans]
+    ok &= check("event: found by the scan of the reported window",
+                job.matches[0] is not None and kinds[-1] == "events" and kinds.count("full") == 1 and job.elapsed[0] <= 0.7,
+                f"elapsed={job.elapsed[0]} scans={kinds}")
+
+    # Appears at 0.5s without any event: the full rescan finds it, FULL_RESCAN_INTERVAL after the first one
+    job, scans, _ = run_poller({1: 0.5}, [])
+    full = [at for kind, at in scans if kind == "full"]
+    interval = WindowRestorer.FULL_RESCAN_INTERVAL
+    ok &= check("missed event: found by the full rescan fallback",
+                job.matches[0] is not None and len(full) == 2 and interval <= full[1] - full[0] <= interval + 0.25,
+                f"full scans at {[round(t, 2) for t in full]}")
+
+    # Never appears: settled unmatched at the scheduler timeout
+    job, scans, elapsed = run_poller({1: 60}, [(3.0, 2)])
+    ok &= check("never appears: gives up at the 10s timeout",
+                job.settled and job.matches[0] is None and 10 <= elapsed <= 10.25, f"gave up after {elapsed:.2f}s")
+    return ok
+
+if __name__ == "__main__":
+    Logger.ECHO = False
+    ok = check_poller()
+    ok &= check_launches()
+    sys.exit(0 if ok else 1)
@@ -0,0 +1,209 @@
+"""
+Scanner building blocks on an in-memory desktop (runs on Linux):
+
+1. ScanSnapshot: diff (added / removed / changed, volatile flags ignored),
+   JSON round trip, and the scanner's diff between two scans.
+2. ProcessInfoCache: one query per PID and generation, and fresh data for a
+   PID reused by another process (same PID, new create_time).
+3. ExtractionPool deadline: a window whose URL extraction is too slow is
+   reported details_unknown, and the abandoned job caches nothing when it
+   finally returns.
+4. DetailCache: what a detailed scan writes to disk (no folder path, nothing
+   about private windows).
+5. Chrome trace export of a scan: private window titles are redacted.
+
+    python devtools/check_scanner.py
+"""
+
+import json
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from wm_engine.logger import Logger
+from wm_engine.detail_cache import DetailCache
+from wm_engine.extraction import ExtractionPool
+from wm_engine.memory_backend import MemoryBackend, MemoryExtractor, MemoryWindow
+from wm_engine.processes import ProcessInfo, ProcessInfoCache
+from wm_engine.scanner import WindowScanner
+from wm_engine.settings import SettingsManager
+from wm_engine.snapshot import ScanSnapshot
+from wm_engine.tracing import tracer, to_chrome_trace, PRIVATE_TITLE
+
+CHROME = "C:\\Program Files\\Google\\Chrome\\Application\\chrome.exe"
+NOTEPAD = "C:\\Windows\\notepad.exe"
+
+def check(label, good, detail=""):
+    print(f"{label:58} {'OK' if good else 'FAIL'} {detail}")
+    return good
+
+def desktop():
+    return MemoryBackend([
+        MemoryWindow(1, "GitHub - Google Chrome", "Chrome_WidgetWin_1", exe=CHROME, cmdline=[CHROME], url="https://github.com/"),
+        MemoryWindow(2, "notes.txt - Notepad", "Notepad", exe=NOTEPAD, cmdline=[NOTEPAD, "notes.txt"]),
+        MemoryWindow(3, "todo.txt - Notepad", "Notepad", exe=NOTEPAD, cmdline=[NOTEPAD, "todo.txt"]),
+    ])
+
+def scanner(backend, **kwargs):
+    settings = SettingsManager(os.path.join(tempfile.mkdtemp(), "settings.json"), write_behind=False)
+    settings.settings["session_files"] = False # URLs through the extractor only
+    return WindowScanner(settings, backend=backend, **kwargs)
+
+def check_snapshot():
+    ok = True
+    a = {"hwnd": 1, "title": "A", "rect": [0, 0, 10, 10], "show_cmd": 1, "was_peaked": False}
+    b = {"hwnd": 2, "title": "B", "rect": [0, 0, 10, 10], "show_cmd": 1}
+    c = {"hwnd": 3, "title": "C", "rect": [0, 0, 10, 10], "show_cmd": 1}
+    old = ScanSnapshot([a, b])
+    new = ScanSnapshot([dict(a, was_peaked=True), dict(b, title="B2"), c])
+    diff = old.diff(new)
+    ok &= check("diff: added, removed and changed windows",
+                [w["hwnd"] for w in diff.added] == [3] and diff.removed == [] and [w["hwnd"] for w in diff.changed] == [2],
+                repr(diff))
+    ok &= check("diff: removed window, volatile flag ignored",
+                new.diff(ScanSnapshot([a])).removed == [2, 3] and not ScanSnapshot([a]).diff(ScanSnapshot([dict(a, was_peaked=True)])))
+    ok &= check("JSON round trip", ScanSnapshot.from_json(new.to_json()) == new and ScanSnapshot.from_json(new.to_json()).windows == new.windows)
+
+    backend = desktop()
+    s = scanner(backend)
+    first = s.get_target_windows(detailed_scan=True)
+    s.get_target_windows(detailed_scan=True)
+    unchanged = not s.last_diff
+    backend.windows[2].title = "notes.txt* - Notepad"
+    backend.close([3])
+    s.get_target_windows(detailed_scan=True)
+    diff = s.last_diff
+    ok &= check("scanner: no diff on an unchanged desktop, then the edits",
+                len(first) == 3 and unchanged and [w["hwnd"] for w in diff.changed] == [2] and diff.removed == [3] and not diff.added,
+                repr(diff))
+    return ok
+
+class TableProvider:
+    """ Process table: pid -> ProcessInfo; counts the queries. """
+
+    def __init__(self, table):
+        self.table = table
+        self.fetches = 0
+
+    def create_time(self, pid):
+        return self.table[pid].create_time
+
+    def fetch(self, pid):
+        self.fetches += 1
+        return self.table[pid]
+
+def check_processes():
+    ok = True
+    provider = TableProvider({100: ProcessInfo("notepad.exe", [NOTEPAD], "C:\\", 1.0)})
+    cache = ProcessInfoCache(provider)
+    cache.new_generation()
+    first = [cache.get(100), cache.get(100)]
+    cache.new_generation()
+    again = cache.get(100)
+    ok &= check("same process: fetched once across generations",
+                first[0].name == "notepad.exe" and first[0] is first[1] is again and provider.fetches == 1, str(cache.stats()))
+
+    provider.table[100] = ProcessInfo("python.exe", ["python.exe", "tool.py"], "C:\\tools", 2.0) # PID reused
+    cache.new_generation()
+    reused = cache.get(100)
+    ok &= check("reused PID: the new process's data", reused.name == "python.exe" and reused.create_time == 2.0 and provider.fetches == 2)
+
+    del provider.table[100]
+    cache.new_generation()
+    ok &= check("exited process: None", cache.get(100) is None)
+    return ok
+
+class SlowExtractor(MemoryExtractor):
+    """ URL extraction taking 'delays[hwnd]' seconds (real time). """
+
+    def __init__(self, backend, delays):
+        super().__init__(backend)
+        self.delays = delays
+        self.calls = []
+
+    def extract_url(self, hwnd):
+        self.calls.append(hwnd)
+        time.sleep(self.delays.get(hwnd, 0))
+        return super().extract_url(hwnd)
+
+class InlinePool:
+    """ Runs every job inline, no deadline. """
+    abandoned = 0
+    timeout = None
+
+    def run(self, jobs):
+        return {key: fn() for key, fn in jobs}
+
+def check_extraction():
+    ok = True
+    backend = desktop()
+    extractor = SlowExtractor(backend, {1: 0.6})
+    s = scanner(backend, extractor=extractor, extraction_pool=ExtractionPool(2, 0.2, None, None))
+    t0 = time.time()
+    chrome = next(w for w in s.get_target_windows(detailed_scan=True) if w["hwnd"] == 1)
+    elapsed = time.time() - t0
+    ok &= check("deadline: slow window reported details_unknown",
+                chrome["details_unknown"] and chrome["url"] is None and elapsed < 0.5 and s.extraction.abandoned == 1,
+                f"scan {elapsed:.2f}s")
+
+    time.sleep(0.8) # The abandoned job returns meanwhile
+    ok &= check("abandoned job: nothing cached", "url" not in s._cache.get(1, {}) and "is_incognito" not in s._cache.get(1, {}))
+
+    extractor.delays.clear()
+    chrome = next(w for w in s.get_target_windows(detailed_scan=True) if w["hwnd"] == 1)
+    ok &= check("next scan: extracted again", chrome["url"] == "https://github.com/" and not chrome["details_unknown"]
+                and extractor.calls.count(1) == 2)
+
+    # A pool written before job_abandoned() existed (run / abandoned / timeout only)
+    backend = desktop()
+    s = scanner(backend, extraction_pool=InlinePool())
+    chrome = next(w for w in s.get_target_windows(detailed_scan=True) if w["hwnd"] == 1)
+    ok &= check("injected pool without job_abandoned()", chrome["url"] == "https://github.com/" and "url" in s._cache[1])
+    return ok
+
+def check_detail_cache():
+    path = os.path.join(tempfile.mkdtemp(), "details.json")
+    backend = desktop()
+    backend.add(MemoryWindow(4, "Secret - Google Chrome", "Chrome_WidgetWin_1", exe=CHROME, cmdline=[CHROME, "--incognito"],
+                             url="https://secret.example/", is_incognito=True))
+    backend.add(MemoryWindow(5, "src", "CabinetWClass", exe="C:\\Windows\\explorer.exe", cmdline=["C:\\Windows\\explorer.exe"],
+                             folder_path="C:\\work\\app\\src"))
+    s = scanner(backend, detail_cache=DetailCache(path))
+    s.get_target_windows(detailed_scan=True)
+    with open(path, "r", encoding="utf-8") as f:
+        text = f.read()
+    entries = json.loads(text)["entries"]
+    ok = check("detail cache: URLs kept, no folder, no private window",
+               "https://github.com/" in text and "secret" not in text and all("folder_path" not in e for e in entries.values()),
+               f"{len(entries)} entries")
+
+    backend.windows[5].folder_path = "C:\\work\\lib\\src" # Same title, another folder
+    s = scanner(backend, detail_cache=DetailCache(path))
+    explorer = next(w for w in s.get_target_windows(detailed_scan=True) if w["hwnd"] == 5)
+    ok &= check("detail cache: Explorer navigation seen after a restart", explorer["folder_path"] == "C:\\work\\lib\\src",
+                explorer["folder_path"])
+    return ok
+
+def check_trace():
+    backend = desktop()
+    backend.add(MemoryWindow(4, "Secret plans - Google Chrome", "Chrome_WidgetWin_1", exe=CHROME, cmdline=[CHROME],
+                             url="https://secret.example/", is_incognito=True))
+    s = scanner(backend)
+    with tracer.operation("save"):
+        s.get_target_windows(detailed_scan=True)
+        with Logger.step("Placement: Secret plans", private=True):
+            pass
+    text = json.dumps(to_chrome_trace(tracer.last_operation), ensure_ascii=False)
+    return check("trace export: private titles redacted",
+                 "Secret" not in text and PRIVATE_TITLE in text and "GitHub - Google Chrome" in text)
+
+if __name__ == "__main__":
+    Logger.ECHO = False
+    ok = check_snapshot()
+    ok &= check_processes()
+    ok &= check_extraction()
+    ok &= check_detail_cache()
+    ok &= check_trace()
+    sys.exit(0 if ok else 1)
@@ -0,0 +1,82 @@
+"""
+Synthetic desktops for offline benchmarks (runs on Linux).
+
+generate() builds a MemoryBackend (wm_engine/memory_backend.py) with a mix of
+browser, Explorer and application windows; pass it as 'backend=' to the
+scanner / restorer / engine. LATENCY_PROFILES are per-call sleeps by call kind,
+so timings reflect the number of OS / UIA round trips the engine makes.
+"""
+
+import os
+import random
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from wm_engine import winconst
+from wm_engine.memory_backend import MemoryBackend, MemoryWindow
+
+CHROME = "C:\\Program Files\\Google\\Chrome\\Application\\chrome.exe"
+FIREFOX = "C:\\Program Files\\Mozilla Firefox\\firefox.exe"
+EXPLORER = "C:\\Windows\\explorer.exe"
+APPS = ["C:\\Windows\\notepad.exe", "C:\\Program Files\\Code\\Code.exe", "C:\\Python311\\python.exe"]
+SITES = ["github.com", "stackoverflow.com", "docs.python.org", "news.ycombinator.com", "youtube.com", "mail.google.com"]
+
+# Seconds per call, by kind
+LATENCY_PROFILES = {
+    "zero": {},
+    "typical": {"win32": 0.00002, "process": 0.0004, "uia_url": 0.03, "uia_incognito": 0.01, "shell": 0.05, "launch": 0.3},
+    "slow": {"win32": 0.0001, "process": 0.002, "uia_url": 0.15, "uia_incognito": 0.05, "shell": 0.3, "launch": 1.0},
+}
+
+def generate(count, browser_share=0.6, explorer_share=0.25, minimized_share=0.2, incognito_share=0.1, latency=None, seed=1,
+             max_tabs=1):
+    """ MemoryBackend with 'count' windows: browsers (Chrome / Firefox, 1 to 'max_tabs' tabs), Explorer folders and plain apps. """
+    rng = random.Random(seed)
+    windows = []
+    for hwnd in range(1, count + 1):
+        kind = rng.random()
+        x, y = rng.randrange(0, 1200), rng.randrange(0, 600)
+        rect = [x, y, x + rng.randrange(400, 1200), y + rng.randrange(300, 800)]
+        show_cmd = winconst.SW_SHOWMINIMIZED if rng.random() < minimized_share else winconst.SW_SHOWNORMAL
+        if kind < browser_share:
+            site = rng.choice(SITES)
+            firefox = rng.random() < 0.3
+            private = rng.random() < incognito_share
+            exe = FIREFOX if firefox else CHROME
+            suffix = "Mozilla Firefox" if firefox else "Google Chrome"
+            title = f"Page {hwnd} on {site} - {suffix}" + (" (Private Browsing)" if firefox and private else "")
+            url = f"https://{site}/item/{hwnd}/"
+            tabs = None
+            if max_tabs > 1:
+                tabs = [f"https://{rng.choice(SITES)}/item/{hwnd}/{t}" for t in range(rng.randrange(0, max_tabs))] + [url]
+            windows.append(MemoryWindow(hwnd, title, "MozillaWindowClass" if firefox else "Chrome_WidgetWin_1", rect, show_cmd,
+                                        exe=exe, cmdline=[exe], url=url, tabs=tabs, is_incognito=private))
+        elif kind < browser_share + explorer_share:
+            name = f"project_{hwnd}"
+            windows.append(MemoryWindow(hwnd, name, "CabinetWClass", rect, show_cmd, pid=4, exe=EXPLORER, cmdline=[EXPLORER],
+                                        folder_path=f"C:\\Users\\me\\Projects\\{name}"))
+        else:
+            exe = rng.choice(APPS)
+            name = exe.rsplit("\\", 1)[-1]
+            windows.append(MemoryWindow(hwnd, f"document_{hwnd}.txt - {name}", "Notepad", rect, show_cmd,
+                                        exe=exe, cmdline=[exe, f"document_{hwnd}.txt"]))
+    return MemoryBackend(windows, latency=latency)
+
+def window_dicts(backend):
+    """ The windows as WindowScanner.get_target_windows would report them (matcher input). """
+    return [{"hwnd": w.hwnd, "title": w.title, "target_key": "File Explorer" if w.folder_path else w.title,
+             "rect": list(w.rect), "show_cmd": w.show_cmd, "exe_name": w.exe.rsplit("\\", 1)[-1], "cmdline": list(w.cmdline),
+             "cwd": w.cwd, "url": w.url, "tabs": w.tabs, "active_tab": w.tabs.index(w.url) if w.tabs else 0,
+             "folder_path": w.folder_path, "is_incognito": w.is_incognito, "is_minimized": w.show_cmd == winconst.SW_SHOWMINIMIZED, "was_peaked": False, "details_unknown": False}
+            for w in backend.windows.values()]
+
+def saved_layout(backend):
+    """ The layout WindowManagerEngine.save_layout would store for the current windows. """
+    layout = []
+    for w in window_dicts(backend):
+        layout.append({"title_pattern": w["target_key"], "exact_title": w["title"], "rect": w["rect"], "show_cmd": w["show_cmd"],
+                       "cmdline": w["cmdline"], "cwd": w["cwd"], "url": w["url"], "folder_path": w["folder_path"],
+                       "is_incognito": w["is_incognito"]})
+        if w["tabs"]:
+            layout[-1].update(tabs=w["tabs"], active_tab=w["active_tab"])
+    return layout
@@ -0,0 +1,44 @@
+"""
+Records the current Windows desktop for replay with MemoryBackend (e.g. bench_suite, headless tests).
+
+    python devtools/record_desktop.py desktop.json
+
+Window titles, URLs and folder paths are recorded as is: check the file before sharing it.
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from wm_engine.backend import get_backend
+from wm_engine.memory_backend import MemoryBackend, MemoryWindow
+from wm_engine.scanner import WindowScanner
+from wm_engine.settings import SettingsManager
+
+if __name__ == "__main__":
+    if len(sys.argv) != 2:
+        print(__doc__)
+        sys.exit(1)
+
+    backend = get_backend()
+    settings = SettingsManager(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "settings.json"))
+    scanner = WindowScanner(settings, backend=backend)
+    windows = scanner.get_target_windows(detailed_scan=True, allow_peeking=False)
+
+    recorded = []
+    for w in windows:
+        hwnd = w["hwnd"]
+        try:
+            pid = backend.get_window_pid(hwnd)
+            class_name = backend.get_class_name(hwnd)
+        except Exception:
+            continue # Closed while recording
+        recorded.append(MemoryWindow(hwnd, w["title"], class_name, w["rect"], w["show_cmd"], pid=pid,
+                                     exe=(w["cmdline"] or [""])[0], cmdline=w["cmdline"], cwd=w["cwd"], url=w["url"],
+                                     tabs=w["tabs"], active_tab=w["active_tab"] if w["tabs"] else None,
+                                     folder_path=w["folder_path"], is_incognito=w["is_incognito"],
+                                     create_time=scanner._identities.get(hwnd, (None, None))[1]))
+
+    replay = MemoryBackend(recorded, monitors=backend.monitors())
+    replay.save(sys.argv[1])
+    print(f"{len(recorded)} windows recorded to {sys.argv[1]}")
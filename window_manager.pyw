@@ -9,8 +9,10 @@ import winreg
 import sys
 import webbrowser
 from wm_engine.engine import WindowManagerEngine
+from wm_engine.logger import Logger
 
 # Configuration
+LOG_REFRESH_MS = 100 # Log panel refresh cadence
 LAYOUT_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "layouts.json")
 
 class WindowLayoutManagerUI:
@@ -78,6 +80,13 @@ class WindowLayoutManagerUI:
         # Overlay for status
         self.create_overlay()
 
+        # Pending settings writes are batched: flush them before closing
+        self.root.protocol("WM_DELETE_WINDOW", self.on_close)
+
+    def on_close(self):
+        self.engine.flush_settings()
+        self.root.destroy()
+
     def center_window(self):
         self.root.update_idletasks()
         self.default_width = 500
@@ -218,6 +227,9 @@ class WindowLayoutManagerUI:
         
         sys.stdout = RedirectText(self) 
         sys.stderr = RedirectText(self)
+        # Logs are buffered by Logger and inserted in batches by _pump_log
+        Logger.ECHO = False
+        self._pump_log()
 
         print(">>> Système de logs initialisé.")
         print(">>> Prêt.")
@@ -593,8 +605,15 @@ class WindowLayoutManagerUI:
         self.engine.restore_layout(scenario_name)
 
     def write_to_log(self, message):
-        # Thread-safe log update using after()
-        self.root.after(0, self._append_log_text, message)
+        # Thread-safe: buffered with the Logger records, shown on the next _pump_log tick
+        Logger.raw(message)
+
+    def _pump_log(self):
+        """ Moves every pending log record to the log panel in one insert. """
+        records = Logger.drain()
+        if records:
+            self._append_log_text("".join(Logger.format(r) for r in records))
+        self.root.after(LOG_REFRESH_MS, self._pump_log)
 
     def _append_log_text(self, message):
         self.log_text.config(state=tk.NORMAL)
@@ -2,50 +2,112 @@ import uiautomation as auto
 import win32com.client
 import urllib.parse
 import os
+import threading
+import time
+from functools import lru_cache
 from .logger import Logger
+from .uia_paths import exe_version_key
+from .uia_scan import SCAN_CONTROL_TYPES, UiaNode, scan_browser_window, follow_path
+from .titles import is_private_title
+from .browsers import registry
 
-def extract_url_from_window(hwnd):
+TREE_SCOPE_CHILDREN = 2
+
+class _BrowserTreeReader:
+    """
+    find_children() for uia_scan: one FindAllBuildCache call per element (a single
+    cross-process round trip) returning the matching children with Name,
+    ControlType and Value already cached; reading them afterwards stays local.
+    COM objects are per thread: get one through _tree_reader().
+    """
+
+    def __init__(self):
+        uia = auto._AutomationClient.instance().IUIAutomation
+        self.uia = uia
+        self.request = uia.CreateCacheRequest()
+        for prop in (auto.PropertyId.NameProperty, auto.PropertyId.ControlTypeProperty,
+                     auto.PropertyId.IsValuePatternAvailableProperty, auto.PropertyId.ValueValueProperty):
+            self.request.AddProperty(prop)
+        condition = None
+        for name in SCAN_CONTROL_TYPES:
+            cond = uia.CreatePropertyCondition(auto.PropertyId.ControlTypeProperty, getattr(auto.ControlType, name))
+            condition = cond if condition is None else uia.CreateOrCondition(condition, cond)
+        self.condition = condition
+
+    def root(self, hwnd):
+        return self.uia.ElementFromHandle(hwnd)
+
+    def __call__(self, element):
+        found = element.FindAllBuildCache(TREE_SCOPE_CHILDREN, self.condition, self.request)
+        nodes = []
+        for i in range(found.Length if found else 0):
+            child = found.GetElement(i)
+            value = None
+            if child.GetCachedPropertyValue(auto.PropertyId.IsValuePatternAvailableProperty):
+                value = child.GetCachedPropertyValue(auto.PropertyId.ValueValueProperty)
+                if not isinstance(value, str): value = ""
+            nodes.append(UiaNode(child, child.CachedName, auto.ControlTypeNames.get(child.CachedControlType, ""), value))
+        return nodes
+
+_local = threading.local()
+
+def _tree_reader():
+    reader = getattr(_local, "reader", None)
+    if reader is None:
+        reader = _local.reader = _BrowserTreeReader()
+    return reader
+
+def _file_version(path):
+    import win32api
+    info = win32api.GetFileVersionInfo(path, "\\")
+    ms, ls = info["FileVersionMS"], info["FileVersionLS"]
+    return f"{ms >> 16}.{ms & 0xFFFF}.{ls >> 16}.{ls & 0xFFFF}"
+
+@lru_cache(maxsize=64)
+def _exe_key(exe_path):
+    return exe_version_key(exe_path, _file_version)
+
+def window_exe_key(hwnd):
+    """ (executable, file version) key of the process owning 'hwnd', or None. """
     try:
-        window = auto.ControlFromHandle(hwnd)
-        potential_names = [
-            "Address and search bar", "Barre d'adresse et de recherche",
-            "Address", "Adresse",
-            "Search with Google or enter address",
-            "Rechercher avec Google ou saisir une adresse"
-        ]
-        for name in potential_names:
-            edit = window.EditControl(Name=name, searchDepth=15) 
-            if edit.Exists(maxSearchSeconds=0.05):
-                val = edit.GetValuePattern().Value
-                if val: return val
+        import psutil
+        import win32process
+        _, pid = win32process.GetWindowThreadProcessId(hwnd)
+        return _exe_key(psutil.Process(pid).exe())
+    except Exception:
+        return None
 
-        try:
-            edit = window.EditControl(RegexName=".*(http|https|www|localhost|://).*", searchDepth=15)
-            if edit.Exists(maxSearchSeconds=0.05):
-                val = edit.GetValuePattern().Value
-                if val: return val
-        except:
-            pass
-
-        count = 0
-        for control, depth in auto.WalkControl(window, maxDepth=12):
-            if control.ControlTypeName == "EditControl":
-                try:
-                    name = control.Name
-                    if "http" in name or "www." in name or "localhost" in name:
-                            if control.GetPattern(auto.PatternId.ValuePattern):
-                                return control.GetValuePattern().Value
-                    if control.GetPattern(auto.PatternId.ValuePattern):
-                        val = control.GetValuePattern().Value
-                        if val and ("." in val or "http" in val or "localhost" in val):
-                            return val
-                except:
-                    pass
-            if count > 200: break
-            count += 1
+def scan_browser(hwnd, path_cache=None):
+    """
+    Address bar value and private-mode marker of a browser window, from one
+    traversal (uia_scan). Returns (url, ui_incognito); ui_incognito is None when
+    the address bar came from its cached position (AddressBarPathCache) and the
+    markers were not looked at.
+    """
+    try:
+        reader = _tree_reader()
+        root = reader.root(hwnd)
+        key = window_exe_key(hwnd) if path_cache is not None else None
+        if key:
+            path = path_cache.get(key)
+            if path is not None:
+                node = follow_path(root, path, reader)
+                if node is not None and node.control_type == "EditControl" and node.value is not None:
+                    return node.value or None, None
+                Logger.debug(f"EXTRACT: Cached address bar path no longer valid ({key})")
+                path_cache.forget(key)
+
+        scan = scan_browser_window(root, reader)
+        if scan.path is not None and key:
+            path_cache.put(key, scan.path)
+        return scan.url, scan.incognito_marker is not None
     except Exception:
         pass
-    return None
+    return None, None
+
+def extract_url_from_window(hwnd, path_cache=None):
+    """ Address bar value of a browser window (see scan_browser). """
+    return scan_browser(hwnd, path_cache)[0]
 
 def get_all_explorer_paths():
     """ Returns a dictionary {hwnd: path} for all open Explorer windows. """
@@ -68,6 +130,40 @@ def get_all_explorer_paths():
         pass
     return paths
 
+class ExplorerPathPrefetch:
+    """
+    Runs get_all_explorer_paths() on a COM-initialized worker thread.
+    result() waits at most until the deadline: a stuck Shell.Application query
+    (seen on some systems with minimized windows) is abandoned, never joined.
+    """
+
+    def __init__(self, timeout):
+        self.paths = None
+        self.timed_out = False
+        self._deadline = time.time() + timeout
+        self._thread = threading.Thread(target=self._run, name="ExplorerPrefetch", daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        import pythoncom
+        pythoncom.CoInitialize()
+        try:
+            self.paths = get_all_explorer_paths()
+        finally:
+            pythoncom.CoUninitialize()
+
+    def is_alive(self):
+        return self._thread.is_alive()
+
+    def result(self):
+        """ {hwnd: path}, or None if the pre-fetch did not complete in time. """
+        if self._thread.is_alive():
+            self._thread.join(max(0, self._deadline - time.time()))
+        if self._thread.is_alive():
+            self.timed_out = True
+            return None
+        return self.paths
+
 def extract_path_from_explorer(hwnd):
     # Backward compatibility wrapper, but inefficient for loops.
     
@@ -91,6 +187,10 @@ def extract_path_from_explorer(hwnd):
         pass
 
     # Method 2: UI Automation (Fallback) - Read Address Bar
+    return extract_path_from_explorer_uia(hwnd)
+
+def extract_path_from_explorer_uia(hwnd):
+    """ Reads the path from the Explorer address bar (no Shell.Application round trip). """
     Logger.debug("EXTRACT: Trying UIA Method...")
     try:
         window = auto.ControlFromHandle(hwnd)
@@ -133,49 +233,35 @@ def extract_path_from_explorer(hwnd):
 
     return None
 
-def is_incognito(hwnd=None, title=""):
+def is_incognito(hwnd=None, title="", ui_result=None):
     """
     Detects if a window is in Incognito/Private mode.
     If 'hwnd' is None, only strict title checks are performed.
-    If 'hwnd' is provided, performs title check then deep UI check.
+    If 'hwnd' is provided, performs title check then UI check (markers near the top
+    of the UI tree); 'ui_result' is that check's answer from an earlier scan_browser.
     """
-    title_lower = title.lower()
-    
     # Fast Title Checks
-    if "navigation privée de mozilla firefox" in title_lower or "(private browsing)" in title_lower:
-        return True
-    if "(navigation privée)" in title_lower:
-        return True
-    if title_lower.endswith("- incognito") or title_lower.endswith("- private"):
-        return True
-    if " - microsoft edge inprivate" in title_lower:
-        return True
-    # Edge fallback "InPrivate" in title is risky without strict checks
-    if "inprivate" in title_lower and "microsoft edge" in title_lower:
+    if is_private_title(title):
         return True
 
     # If simple check passed or HWND not provided, stop here.
     if hwnd is None:
         return False
 
-    # FIREFOX SPECIFIC: Trust Title Only.
+    # FIREFOX SPECIFIC (private_from_title_only): Trust Title Only.
     # Firefox is reliable with titles ("— Navigation privée"). 
     # Deep UI scan often finds false positives (e.g. "Open Private Window" in menu).
-    if "firefox" in title_lower:
+    profile = registry.profile_for_title(title)
+    if profile is not None and profile.private_from_title_only:
         return False
+
+    if ui_result is not None:
+        return ui_result
         
-    # Deep UI Check (Slower)
+    # UI Check (Slower): shallow traversal, URL not needed
     try:
-        window = auto.ControlFromHandle(hwnd)
-        keywords = ["Incognito", "Privée", "InPrivate", "Private"]
-        
-        # Shallow search first (Top level buttons often have the text)
-        for control, depth in auto.WalkControl(window, maxDepth=4):
-            name = control.Name
-            if not name: continue
-            for k in keywords:
-                if k.lower() in name.lower():
-                    return True
+        reader = _tree_reader()
+        return scan_browser_window(reader.root(hwnd), reader, want_url=False).incognito_marker is not None
     except:
         pass
         
@@ -0,0 +1,108 @@
+import threading
+
+class DesktopBackend:
+    """
+    Everything the engine asks of the operating system:
+
+    - windows   : enumeration, attributes and placement (win32gui semantics, snake_case names)
+    - processes : process_provider() for ProcessInfoCache
+    - UIA       : extractor() (URL / incognito), Explorer folder paths, COM thread setup
+    - sessions  : browser_sessions(profile), tabs read from browser session files
+    - launching : launch(args, cwd), open_folder(path), create_event_source()
+
+    Win32Backend (win32_backend.py) talks to Windows; MemoryBackend
+    (memory_backend.py) replays a recorded or generated desktop in memory.
+    """
+
+    def set_data_dir(self, folder, uia_path_cache=True):
+        """ Folder where the backend may persist its own caches (e.g. learned UIA paths). """
+        pass
+
+    # --- Windows ---
+    def enum_windows(self):
+        """ Top-level HWNDs, in Z-order (top first). """
+        raise NotImplementedError
+
+    def is_window(self, hwnd): raise NotImplementedError
+    def is_window_visible(self, hwnd): raise NotImplementedError
+    def get_window_text(self, hwnd): raise NotImplementedError
+    def get_class_name(self, hwnd): raise NotImplementedError
+    def get_window_long(self, hwnd, index): raise NotImplementedError
+    def get_window(self, hwnd, cmd): raise NotImplementedError
+    def is_cloaked(self, hwnd): raise NotImplementedError
+    def is_iconic(self, hwnd): raise NotImplementedError
+
+    def get_window_placement(self, hwnd):
+        """ (flags, show_cmd, min_position, max_position, normal_rect), as win32gui. """
+        raise NotImplementedError
+
+    def get_window_rect(self, hwnd): raise NotImplementedError
+    def set_window_placement(self, hwnd, placement): raise NotImplementedError
+    def set_window_pos(self, hwnd, x, y, width, height, flags): raise NotImplementedError
+    def show_window(self, hwnd, cmd): raise NotImplementedError
+    def update_window(self, hwnd): raise NotImplementedError
+    def redraw_window(self, hwnd, flags): raise NotImplementedError
+    def get_window_pid(self, hwnd): raise NotImplementedError
+
+    def monitors(self):
+        """ Monitor rects [left, top, right, bottom]. """
+        raise NotImplementedError
+
+    # --- Processes ---
+    def process_provider(self):
+        """ create_time(pid) / fetch(pid) -> ProcessInfo, see processes.py. """
+        raise NotImplementedError
+
+    # --- UI Automation ---
+    def extractor(self):
+        """ extract_url(hwnd) / is_incognito(hwnd, title), see extraction.py. """
+        raise NotImplementedError
+
+    def explorer_prefetch(self, timeout):
+        """ Bulk Explorer path query running in the background: result() -> {hwnd: path} or None, timed_out, is_alive(). """
+        raise NotImplementedError
+
+    def explorer_path(self, hwnd):
+        """ Folder of one Explorer window (COM, then address bar). """
+        raise NotImplementedError
+
+    def explorer_path_uia(self, hwnd):
+        """ Folder of one Explorer window, from its address bar only. """
+        raise NotImplementedError
+
+    def init_thread(self):
+        """ Per-thread setup for UI Automation (COM). """
+        pass
+
+    def uninit_thread(self):
+        pass
+
+    # --- Browser sessions ---
+    def browser_sessions(self, profile):
+        """ SessionWindows (sessions.py) from the session files of a browsers.BrowserProfile, or None if unavailable. """
+        return None
+
+    # --- Launching ---
+    def launch(self, args, cwd=None): raise NotImplementedError
+    def open_folder(self, path): raise NotImplementedError
+
+    def create_event_source(self):
+        """ A started WindowEventSource reporting new windows, or None (callers poll). """
+        return None
+
+_backend = None
+_backend_lock = threading.Lock()
+
+def get_backend():
+    """ The process-wide backend; Win32Backend unless set_backend() chose another. Loaded on first use. """
+    global _backend
+    with _backend_lock:
+        if _backend is None:
+            from .win32_backend import Win32Backend
+            _backend = Win32Backend()
+        return _backend
+
+def set_backend(backend):
+    global _backend
+    with _backend_lock:
+        _backend = backend
@@ -0,0 +1,202 @@
+import ntpath
+import re
+from collections import namedtuple
+from functools import lru_cache
+
+class BrowserProfile:
+    """
+    What the engine knows about one browser, as plain data (see BROWSERS).
+    Title strings are matched case-insensitively, except 'title_names' which
+    are case-sensitive substrings (e.g. "Chrome" in the title).
+    """
+    __slots__ = ("name", "exes", "title_names", "title_suffixes", "private_title_suffixes", "private_title_markers",
+                 "ui_private_markers", "address_bar_names", "new_tab_urls", "new_window_flag", "private_flags",
+                 "private_flag_opens_window", "private_from_title_only", "serial_launch", "stubborn_minimize",
+                 "session_format", "session_files", "repeatable_window_flag")
+
+    def __init__(self, name, exes, title_names=(), title_suffixes=(), private_title_suffixes=(), private_title_markers=(),
+                 ui_private_markers=(), address_bar_names=(), new_tab_urls=("about:newtab",), new_window_flag="--new-window",
+                 private_flags=("--incognito",), private_flag_opens_window=False, private_from_title_only=False,
+                 serial_launch=False, stubborn_minimize=False, session_format=None, session_files=(),
+                 repeatable_window_flag=False):
+        self.name = name
+        self.exes = tuple(exes) # Executable file names
+        self.title_names = tuple(title_names) # Substrings that mark a title as this browser's
+        self.title_suffixes = tuple(title_suffixes) # Stripped from titles before comparing them
+        self.private_title_suffixes = tuple(private_title_suffixes)
+        self.private_title_markers = tuple(private_title_markers) # Anywhere in the title
+        self.ui_private_markers = tuple(ui_private_markers) # UI Automation element names near the top of the window
+        self.address_bar_names = tuple(address_bar_names) # UI Automation name of the address bar, per locale
+        self.new_tab_urls = tuple(new_tab_urls) # A window showing one of these is blank; the first one is launched
+        self.new_window_flag = new_window_flag
+        self.private_flags = tuple(private_flags) # Command-line flags of a private window; the first one is launched
+        self.private_flag_opens_window = private_flag_opens_window # No new-window flag next to it
+        self.private_from_title_only = private_from_title_only # UI markers give false positives, processes are shared
+        self.serial_launch = serial_launch # One launch at a time; private windows wait for everything else (IPC locks)
+        self.stubborn_minimize = stubborn_minimize # A peeked window may need a second SW_MINIMIZE
+        self.session_format = session_format # Session file reader (sessions.READERS): "snss", "mozlz4" or None
+        self.session_files = tuple(session_files) # Glob patterns (environment variables expanded) of the session files
+        self.repeatable_window_flag = repeatable_window_flag # "<flag> url <flag> url" opens one window per URL
+
+    def launch_args(self, exe_path, urls, private=False):
+        """ Command line opening 'urls' in a new (private) window (the browser's start page if there are none). """
+        args = [exe_path]
+        if private and self.private_flags:
+            args.append(self.private_flags[0])
+            if not self.private_flag_opens_window:
+                args.append(self.new_window_flag)
+        else:
+            args.append(self.new_window_flag)
+        args.extend(urls)
+        return args
+
+    def can_share_launch(self, urls, private=False):
+        """ True if a window with these tabs can be opened by the same process launch as other such windows. """
+        return self.repeatable_window_flag and not private and len(urls) == 1
+
+    def batch_launch_args(self, exe_path, windows, private=False):
+        """ Command line opening every window of 'windows' (one URL list each); see can_share_launch. """
+        if len(windows) == 1:
+            return self.launch_args(exe_path, windows[0], private)
+        args = [exe_path]
+        for urls in windows:
+            args += [self.new_window_flag, urls[0]]
+        return args
+
+    def __repr__(self):
+        return f"BrowserProfile({self.name})"
+
+CHROMIUM_ADDRESS_BAR = ("Address and search bar", "Barre d'adresse et de recherche")
+
+def chromium_sessions(user_data):
+    """ Session files of every profile under a Chromium "User Data" folder. """
+    return (user_data + "\\*\\Sessions\\Session_*", user_data + "\\*\\Current Session")
+
+BROWSERS = [
+    BrowserProfile("Chrome", ("chrome.exe",), title_names=("Chrome",), title_suffixes=(" - Google Chrome",),
+                   private_title_suffixes=("- Incognito",), ui_private_markers=("Incognito", "Privée"),
+                   address_bar_names=CHROMIUM_ADDRESS_BAR,
+                   new_tab_urls=("about:newtab", "chrome://newtab", "chrome://new-tab-page"),
+                   session_format="snss", session_files=chromium_sessions("%LOCALAPPDATA%\\Google\\Chrome\\User Data")),
+    BrowserProfile("Edge", ("msedge.exe",), title_names=("Edge",),
+                   title_suffixes=(" - Microsoft Edge", " - Microsoft\u200b Edge"), # Recent versions: zero-width space
+                   private_title_markers=("Microsoft Edge InPrivate", "[InPrivate]", "InPrivate - Microsoft"),
+                   ui_private_markers=("InPrivate",),
+                   address_bar_names=CHROMIUM_ADDRESS_BAR + ("Address", "Adresse"),
+                   new_tab_urls=("about:newtab", "edge://newtab", "edge://new-tab-page"), private_flags=("-inprivate",),
+                   session_format="snss", session_files=chromium_sessions("%LOCALAPPDATA%\\Microsoft\\Edge\\User Data")),
+    BrowserProfile("Firefox", ("firefox.exe",), title_names=("Firefox",),
+                   title_suffixes=(" — Mozilla Firefox", " - Mozilla Firefox", " — Navigation privée de Mozilla Firefox",
+                                   " — Mozilla Firefox Private Browsing"),
+                   private_title_markers=("Navigation privée de Mozilla Firefox", "Mozilla Firefox Private Browsing",
+                                          "(Private Browsing)", "(Navigation privée)"),
+                   address_bar_names=("Search with Google or enter address", "Rechercher avec Google ou saisir une adresse"),
+                   new_tab_urls=("about:newtab", "about:blank", "about:home"), new_window_flag="-new-window",
+                   private_flags=("-private-window", "-private"), private_flag_opens_window=True,
+                   private_from_title_only=True, serial_launch=True, stubborn_minimize=True, repeatable_window_flag=True,
+                   session_format="mozlz4",
+                   session_files=("%APPDATA%\\Mozilla\\Firefox\\Profiles\\*\\sessionstore-backups\\recovery.jsonlz4",)),
+    BrowserProfile("Brave", ("brave.exe",), title_suffixes=(" - Brave",), private_title_suffixes=("- Private",),
+                   ui_private_markers=("Private",), address_bar_names=CHROMIUM_ADDRESS_BAR,
+                   new_tab_urls=("about:newtab", "brave://newtab"), session_format="snss",
+                   session_files=chromium_sessions("%LOCALAPPDATA%\\BraveSoftware\\Brave-Browser\\User Data")),
+    BrowserProfile("Vivaldi", ("vivaldi.exe",), title_suffixes=(" - Vivaldi",),
+                   new_tab_urls=("about:newtab", "vivaldi://startpage"), session_format="snss",
+                   session_files=chromium_sessions("%LOCALAPPDATA%\\Vivaldi\\User Data")),
+    BrowserProfile("Opera", ("opera.exe",), title_suffixes=(" - Opera",), private_flags=("--private",),
+                   new_tab_urls=("about:newtab", "opera://startpage"), session_format="snss",
+                   session_files=("%APPDATA%\\Opera Software\\Opera Stable\\Sessions\\Session_*",
+                                  "%APPDATA%\\Opera Software\\Opera Stable\\Current Session")),
+]
+
+# What the registry can say about one window
+BrowserWindow = namedtuple("BrowserWindow", ["profile", "private", "clean_title"])
+
+def _union(values):
+    return tuple(dict.fromkeys(values))
+
+def _alternation(strings, suffix=False):
+    """ One regex matching any of 'strings' (at the end if 'suffix'), longest first; None if there are none. """
+    strings = sorted(set(strings), key=len, reverse=True)
+    if not strings: return None
+    pattern = "|".join(re.escape(s) for s in strings)
+    return re.compile(f"(?:{pattern})$" if suffix else pattern)
+
+class BrowserRegistry:
+    """
+    BROWSERS compiled into lookup tables: a dict per executable name, and one
+    regex for each kind of title string across all profiles, so classifying a
+    window is a dict lookup and a few regex searches however many browsers
+    are known. Results are memoized per (title, executable).
+    """
+
+    def __init__(self, profiles):
+        self.profiles = list(profiles)
+        self._by_exe = {exe.lower(): p for p in self.profiles for exe in p.exes}
+        self._by_suffix = {s.lower(): p for p in self.profiles for s in p.title_suffixes}
+        self._by_name = {s: p for p in self.profiles for s in p.title_names}
+        self._suffix_re = _alternation(self._by_suffix, suffix=True)
+        # A title that is only the browser's name (blank Firefox window: "Mozilla Firefox")
+        self._by_bare_title = {s.lstrip(" -\u2014").lower(): p for p in self.profiles for s in p.title_suffixes}
+        self._name_re = _alternation(self._by_name)
+        self._private_suffix_re = _alternation((s.lower() for p in self.profiles for s in p.private_title_suffixes), suffix=True)
+        self._private_marker_re = _alternation(s.lower() for p in self.profiles for s in p.private_title_markers)
+        self._private_flag_re = _alternation(f.lower() for p in self.profiles for f in p.private_flags)
+        self._new_tab_re = _alternation(u.lower() for p in self.profiles for u in p.new_tab_urls)
+        self.address_bar_names = _union(n for p in self.profiles for n in p.address_bar_names)
+        self.ui_private_markers = _union(m for p in self.profiles for m in p.ui_private_markers)
+        self.classify = lru_cache(maxsize=4096)(self._classify)
+
+    def profile_for_exe(self, exe):
+        """ Profile of an executable (name or full path), or None. """
+        if not exe: return None
+        return self._by_exe.get(ntpath.basename(exe).lower())
+
+    def profile_for_title(self, title):
+        return self.classify(title).profile
+
+    def profile_for_title_suffix(self, title):
+        """ Profile whose title suffix ends 'title' (or that is the whole title), or None; no substring fallback. """
+        if not title: return None
+        lower = title.lower()
+        m = self._suffix_re.search(lower) if self._suffix_re else None
+        if m: return self._by_suffix[m.group(0)]
+        return self._by_bare_title.get(lower)
+
+    def _classify(self, title, exe=None):
+        """ BrowserWindow(profile or None, private title?, title without the browser suffix). """
+        title = title or ""
+        lower = title.lower()
+        profile = None
+        clean = title
+        m = self._suffix_re.search(lower) if self._suffix_re else None
+        if m:
+            profile = self._by_suffix[m.group(0)]
+            clean = title[:len(title) - len(m.group(0))].strip()
+        elif self._name_re:
+            n = self._name_re.search(title)
+            if n: profile = self._by_name[n.group(0)]
+        if exe: profile = self.profile_for_exe(exe)
+        private = bool((self._private_marker_re and self._private_marker_re.search(lower)) or
+                       (self._private_suffix_re and self._private_suffix_re.search(lower)))
+        return BrowserWindow(profile, private, clean)
+
+    def is_browser_title(self, title):
+        return self.classify(title).profile is not None
+
+    def clean_title(self, title):
+        return self.classify(title).clean_title
+
+    def is_private_title(self, title):
+        return self.classify(title).private
+
+    def is_new_tab_url(self, url):
+        """ True for a blank / new-tab page of any known browser. """
+        return bool(url) and self._new_tab_re is not None and self._new_tab_re.search(url.lower()) is not None
+
+    def has_private_flag(self, cmdline):
+        """ Whether a command line (list or string) carries any browser's private-window flag. """
+        text = " ".join(cmdline) if isinstance(cmdline, (list, tuple)) else (cmdline or "")
+        return self._private_flag_re is not None and self._private_flag_re.search(text.lower()) is not None
+
+registry = BrowserRegistry(BROWSERS)
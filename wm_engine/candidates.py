@@ -0,0 +1,137 @@
+import bisect
+import os
+import urllib.parse
+from .utils import normalize_url, layout_tabs
+from .titles import title_features
+
+def exe_key(cmdline, exe_name=None):
+    """ Lowercased executable basename, or "" when unknown. """
+    exe = cmdline[0] if cmdline else exe_name
+    return os.path.basename(exe).lower() if exe else ""
+
+def folder_key(folder):
+    return folder.lower() if folder else ""
+
+def url_host(url):
+    """ Host of a (possibly scheme-less) URL, without 'www.'. """
+    if not url: return ""
+    try:
+        host = urllib.parse.urlsplit(normalize_url(url)).hostname or ""
+    except ValueError:
+        return ""
+    return host[4:] if host.startswith("www.") else host
+
+def host_keys(host):
+    """ The host and its parent domains of two labels or more ("mail.google.com" -> itself, "google.com"). """
+    if not host: return [""]
+    labels = host.split(".")
+    return [".".join(labels[k:]) for k in range(max(1, len(labels) - 1))]
+
+def host_keys_of(hosts):
+    """ Non-empty host_keys of every host in 'hosts'. """
+    return {key for host in hosts if host for key in host_keys(host)}
+
+def tab_hosts(window):
+    """ Hosts of every tab of a browser window ({""} when it has no URL). """
+    return {url_host(url) for url in layout_tabs(window)} or {""}
+
+class CandidateIndex:
+    """
+    Buckets the current windows of one scan so a saved item is only scored
+    against windows that can plausibly reach the match threshold.
+
+    A window is plausible when it shares the executable (or either side's is
+    unknown) and its URL hosts / folder do not contradict the saved ones: the
+    matcher penalizes a URL or folder mismatch far below the threshold anyway.
+    Hosts compare by domain ("mail.google.com" and "google.com" are related, the
+    matcher compares URLs by substring). Windows sharing the folder, a related
+    tab host or the cleaned title are always added. A saved window without URL
+    or folder can also match a window of another executable on a title more
+    than FUZZY_TITLE similar (with a URL or folder, the title alone is never enough).
+    """
+    # WindowMatcher.score: a title this similar is worth the threshold whatever the executable
+    FUZZY_TITLE = 0.9
+
+    def __init__(self, current_windows):
+        self.windows = list(current_windows)
+        self.by_exe = {}
+        self.by_exe_host = {}
+        self.by_exe_folder = {}
+        self.by_folder = {}
+        self.by_host = {}
+        self.by_title = {}
+        self.by_length = [] # (title length, position), sorted: the fuzzy title search only looks at similar lengths
+
+        for pos, current in enumerate(self.windows):
+            cleaned = title_features(current['title']).clean_lower
+
+            exe = exe_key(current.get("cmdline"), current.get("exe_name"))
+            hosts = tab_hosts(current)
+            folder = folder_key(current.get("folder_path"))
+
+            self.by_exe.setdefault(exe, []).append(pos)
+            for key in {key for host in hosts for key in host_keys(host)}:
+                self.by_exe_host.setdefault((exe, key), []).append(pos)
+                if key:
+                    self.by_host.setdefault(key, []).append(pos)
+            self.by_exe_folder.setdefault((exe, folder), []).append(pos)
+            if folder:
+                self.by_folder.setdefault(folder, []).append(pos)
+            if cleaned:
+                self.by_title.setdefault(cleaned, []).append(pos)
+            self.by_length.append((len(title_features(current['title']).lower), pos))
+        self.by_length.sort()
+
+    def _same_exe(self, exe, hosts, folder):
+        """ Positions running 'exe' whose URL hosts / folder are compatible. """
+        host = any(hosts)
+        if host:
+            by_host = set(self.by_exe_host.get((exe, ""), ()))
+            for key in host_keys_of(hosts):
+                by_host.update(self.by_exe_host.get((exe, key), ()))
+        if folder:
+            by_folder = set(self.by_exe_folder.get((exe, folder), ()))
+            by_folder.update(self.by_exe_folder.get((exe, ""), ()))
+
+        if host and folder: return by_host & by_folder
+        if host: return by_host
+        if folder: return by_folder
+        return set(self.by_exe.get(exe, ()))
+
+    def _similar_titles(self, features):
+        """ Positions whose title is more than FUZZY_TITLE similar to 'features' (any executable). """
+        # Similarity above r needs 2 * min(len) / (sum of lengths) > r: lengths within r / (2 - r) of each other
+        length = len(features.lower)
+        ratio = self.FUZZY_TITLE / (2 - self.FUZZY_TITLE)
+        start = bisect.bisect_right(self.by_length, (length * ratio, len(self.windows)))
+        found = []
+        for other_length, pos in self.by_length[start:]:
+            if other_length * ratio >= length: break
+            if features.similarity(title_features(self.windows[pos]['title']), self.FUZZY_TITLE) > self.FUZZY_TITLE:
+                found.append(pos)
+        return found
+
+    def candidates(self, saved):
+        """ Current windows worth scoring for 'saved', in scan order. """
+        exe = exe_key(saved.get("cmdline"), saved.get("exe_name"))
+        if not exe:
+            # Without an executable, title similarity alone can match: score everything.
+            return self.windows
+
+        hosts = tab_hosts(saved)
+        folder = folder_key(saved.get("folder_path"))
+
+        positions = self._same_exe(exe, hosts, folder)
+        positions.update(self._same_exe("", hosts, folder)) # Unknown executable (access denied)
+        for key in host_keys_of(hosts):
+            positions.update(self.by_host.get(key, ()))
+        if folder:
+            positions.update(self.by_folder.get(folder, ()))
+
+        features = title_features(saved.get("exact_title", ""))
+        if features.clean_lower:
+            positions.update(self.by_title.get(features.clean_lower, ()))
+        if not any(hosts) and not folder:
+            positions.update(self._similar_titles(features))
+
+        return [self.windows[pos] for pos in sorted(positions)]
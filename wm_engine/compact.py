@@ -0,0 +1,270 @@
+"""
+Compact binary layout format (.wml).
+
+    header   : b"WMLC", format version (u8), shape (u8: 1 = V1 window list, 2 = V2 dict)
+    strings  : every string used below, stored once (interned) and referenced by index;
+               one NUL-separated UTF-8 blob (or length-prefixed strings if one contains NUL)
+    cmdlines : table of distinct cmdline arrays (lists of string refs)
+    shapes   : table of distinct dict key lists (string refs); a dict is stored as shape + values
+    top      : V2 only, everything but "windows" (settings...) as a generic value
+    windows  : count, then columns -
+               flags (u8 each: packed rect / packed show_cmd / cmdline from table / raw),
+               rects ('<i' x 4, flagged windows only), show_cmds ('<h'),
+               cmdline refs (varints), then the remaining keys of each window as a generic dict
+
+Anything that does not fit a packed column is kept as a generic value, so
+loads(dumps(x)) == x for any JSON layout (key order inside a window may differ).
+"""
+
+import json
+import struct
+
+MAGIC = b"WMLC"
+FORMAT_VERSION = 1
+SHAPE_V1 = 1 # Bare window list
+SHAPE_V2 = 2 # {"windows": [...], "settings": {...}}
+
+# Generic value tags
+T_NONE, T_FALSE, T_TRUE, T_INT, T_FLOAT, T_STR, T_LIST, T_DICT = range(8)
+
+# Per-window column flags
+F_RECT = 1
+F_SHOW_CMD = 2
+F_CMDLINE = 4
+F_RAW = 8 # Not a dict: the whole entry is a generic value
+
+def is_compact(data):
+    return isinstance(data, (bytes, bytearray)) and data[:4] == MAGIC
+
+def _is_int(value):
+    return isinstance(value, int) and not isinstance(value, bool)
+
+class _Writer:
+    def __init__(self):
+        self.strings = {}
+        self.cmdlines = {}
+        self.shapes = {}
+        self.body = bytearray()
+
+    def ref(self, text):
+        index = self.strings.get(text)
+        if index is None:
+            index = self.strings[text] = len(self.strings)
+        return index
+
+    @staticmethod
+    def varint(buf, n):
+        while n >= 0x80:
+            buf.append((n & 0x7F) | 0x80)
+            n >>= 7
+        buf.append(n)
+
+    def value(self, v):
+        buf = self.body
+        if v is None: buf.append(T_NONE)
+        elif v is False: buf.append(T_FALSE)
+        elif v is True: buf.append(T_TRUE)
+        elif _is_int(v):
+            buf.append(T_INT)
+            self.varint(buf, (v << 1) if v >= 0 else ((-v << 1) - 1)) # Zigzag
+        elif isinstance(v, float):
+            buf.append(T_FLOAT)
+            buf += struct.pack("<d", v)
+        elif isinstance(v, str):
+            buf.append(T_STR)
+            self.varint(buf, self.ref(v))
+        elif isinstance(v, (list, tuple)):
+            buf.append(T_LIST)
+            self.varint(buf, len(v))
+            for item in v: self.value(item)
+        elif isinstance(v, dict):
+            buf.append(T_DICT)
+            shape = tuple(self.ref(str(key)) for key in v)
+            self.varint(buf, self.shapes.setdefault(shape, len(self.shapes)))
+            for item in v.values():
+                self.value(item)
+        else:
+            raise TypeError(f"Not JSON serializable: {type(v).__name__}")
+
+    def windows(self, windows):
+        flags, rects, show_cmds, cmd_refs, rests = bytearray(), [], [], bytearray(), []
+        for window in windows:
+            if not isinstance(window, dict):
+                flags.append(F_RAW)
+                rests.append(window)
+                continue
+            f = 0
+            rest = dict(window)
+            rect = rest.get("rect")
+            if isinstance(rect, list) and len(rect) == 4 and all(_is_int(x) and -2**31 <= x < 2**31 for x in rect):
+                f |= F_RECT
+                rects.extend(rect)
+                del rest["rect"]
+            show_cmd = rest.get("show_cmd")
+            if _is_int(show_cmd) and -2**15 <= show_cmd < 2**15:
+                f |= F_SHOW_CMD
+                show_cmds.append(show_cmd)
+                del rest["show_cmd"]
+            cmdline = rest.get("cmdline")
+            if isinstance(cmdline, list) and all(isinstance(x, str) for x in cmdline):
+                f |= F_CMDLINE
+                key = tuple(self.ref(x) for x in cmdline)
+                index = self.cmdlines.setdefault(key, len(self.cmdlines))
+                self.varint(cmd_refs, index)
+                del rest["cmdline"]
+            flags.append(f)
+            rests.append(rest)
+
+        self.varint(self.body, len(windows))
+        self.body += flags
+        self.body += struct.pack(f"<{len(rects)}i", *rects)
+        self.body += struct.pack(f"<{len(show_cmds)}h", *show_cmds)
+        self.body += cmd_refs
+        for rest in rests:
+            self.value(rest)
+
+    def output(self, shape):
+        out = bytearray(MAGIC)
+        out += struct.pack("<BB", FORMAT_VERSION, shape)
+        self.varint(out, len(self.strings))
+        if not any("\0" in text for text in self.strings):
+            blob = "\0".join(self.strings).encode("utf-8") # Insertion order == index order
+            out.append(1)
+            self.varint(out, len(blob))
+            out += blob
+        else:
+            out.append(0)
+            for text in self.strings:
+                encoded = text.encode("utf-8")
+                self.varint(out, len(encoded))
+                out += encoded
+        for table in (self.cmdlines, self.shapes):
+            self.varint(out, len(table))
+            for refs in table:
+                self.varint(out, len(refs))
+                for r in refs: self.varint(out, r)
+        return bytes(out + self.body)
+
+class _Reader:
+    def __init__(self, data):
+        self.data = bytes(data)
+        self.pos = 0
+        self.strings = []
+        self.cmdlines = []
+        self.shapes = []
+
+    def varint(self):
+        data, pos = self.data, self.pos
+        b = data[pos]
+        if b < 0x80: # Fast path: most refs fit in one byte
+            self.pos = pos + 1
+            return b
+        n = shift = 0
+        while True:
+            b = data[pos]
+            pos += 1
+            n |= (b & 0x7F) << shift
+            if b < 0x80:
+                self.pos = pos
+                return n
+            shift += 7
+
+    def take(self, size):
+        chunk = self.data[self.pos:self.pos + size]
+        if len(chunk) != size: raise ValueError("Truncated compact layout")
+        self.pos += size
+        return chunk
+
+    def value(self):
+        tag = self.data[self.pos]
+        self.pos += 1
+        if tag == T_STR: return self.strings[self.varint()]
+        if tag == T_NONE: return None
+        if tag == T_FALSE: return False
+        if tag == T_TRUE: return True
+        if tag == T_INT:
+            z = self.varint()
+            return (z >> 1) if not z & 1 else -((z + 1) >> 1)
+        if tag == T_FLOAT: return struct.unpack("<d", self.take(8))[0]
+        if tag == T_LIST: return [self.value() for _ in range(self.varint())]
+        if tag == T_DICT:
+            return {key: self.value() for key in self.shapes[self.varint()]}
+        raise ValueError(f"Unknown value tag {tag}")
+
+    def windows(self):
+        count = self.varint()
+        flags = bytes(self.take(count))
+        n_rects = sum(1 for f in flags if f & F_RECT)
+        n_show = sum(1 for f in flags if f & F_SHOW_CMD)
+        rects = struct.unpack(f"<{4 * n_rects}i", self.take(16 * n_rects))
+        show_cmds = struct.unpack(f"<{n_show}h", self.take(2 * n_show))
+        cmd_refs = [self.varint() for f in flags if f & F_CMDLINE]
+
+        windows = []
+        r = s = c = 0
+        for f in flags:
+            window = {}
+            if f & F_CMDLINE:
+                window["cmdline"] = list(self.cmdlines[cmd_refs[c]])
+                c += 1
+            if f & F_RECT:
+                window["rect"] = list(rects[4 * r:4 * r + 4])
+                r += 1
+            if f & F_SHOW_CMD:
+                window["show_cmd"] = show_cmds[s]
+                s += 1
+            windows.append(window)
+        for i, f in enumerate(flags):
+            rest = self.value()
+            if f & F_RAW: windows[i] = rest
+            else: windows[i].update(rest)
+        return windows
+
+def dumps(layout):
+    """ V1 list or V2 dict -> compact bytes. """
+    writer = _Writer()
+    if isinstance(layout, list):
+        writer.windows(layout)
+        return writer.output(SHAPE_V1)
+    if isinstance(layout, dict) and isinstance(layout.get("windows", []), list):
+        writer.value({k: v for k, v in layout.items() if k != "windows"})
+        writer.windows(layout.get("windows", []))
+        if "windows" not in layout: writer.body.append(0) # Marker: no "windows" key at all
+        else: writer.body.append(1)
+        return writer.output(SHAPE_V2)
+    raise TypeError("Layout must be a window list (V1) or a {'windows', 'settings'} dict (V2)")
+
+def loads(data):
+    """ Compact bytes -> the V1 list / V2 dict that was dumped. """
+    if not is_compact(data): raise ValueError("Not a compact layout (bad magic)")
+    reader = _Reader(data)
+    reader.pos = len(MAGIC)
+    version, shape = struct.unpack("<BB", reader.take(2))
+    if version > FORMAT_VERSION: raise ValueError(f"Compact layout version {version} is newer than supported ({FORMAT_VERSION})")
+
+    count = reader.varint()
+    if reader.take(1)[0]:
+        blob = reader.take(reader.varint())
+        reader.strings = blob.decode("utf-8").split("\0") if count else []
+    else:
+        for _ in range(count):
+            reader.strings.append(reader.take(reader.varint()).decode("utf-8"))
+    for table in (reader.cmdlines, reader.shapes):
+        for _ in range(reader.varint()):
+            refs = [reader.varint() for _ in range(reader.varint())]
+            table.append(tuple(reader.strings[i] for i in refs))
+
+    if shape == SHAPE_V1:
+        return reader.windows()
+    if shape == SHAPE_V2:
+        layout = reader.value()
+        windows = reader.windows()
+        if reader.take(1)[0]: layout = dict(windows=windows, **layout)
+        return layout
+    raise ValueError(f"Unknown layout shape {shape}")
+
+def from_json(text):
+    return dumps(json.loads(text))
+
+def to_json(data, **dump_kwargs):
+    return json.dumps(loads(data), **dump_kwargs)
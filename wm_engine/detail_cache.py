@@ -0,0 +1,107 @@
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+
+from .utils import atomic_write_json
+
+class DetailCache:
+    """
+    On-disk cache of the expensive per-window results (url, is_incognito), kept
+    across save / restore operations and application restarts.
+
+    Entries are keyed by (hwnd, title, process create_time): a recycled HWND or a
+    restarted process never matches, and a title change (new page) forces a fresh
+    extraction. Folder paths are not cached: an Explorer window keeps its title
+    when it navigates to another folder of the same name. Entries expire after
+    'ttl' seconds and the least recently used ones are evicted beyond 'max_entries'.
+    """
+    FIELDS = ("url", "is_incognito")
+
+    def __init__(self, path, ttl=12 * 3600, max_entries=500, clock=time.time):
+        self.path = path
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.clock = clock
+        self._entries = OrderedDict() # key string -> {"t": last use, field: value...}, oldest first
+        self._lock = threading.Lock()
+        self._loaded = False
+        self._dirty = False
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def make_key(hwnd, title, create_time):
+        return f"{hwnd}|{create_time!r}|{title}"
+
+    def _load(self):
+        self._loaded = True
+        if not os.path.exists(self.path): return
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except Exception as e:
+            print(f"Error loading detail cache: {e}")
+            return
+        now = self.clock()
+        entries = sorted(data.get("entries", {}).items(), key=lambda item: item[1].get("t", 0))
+        for key, entry in entries:
+            if entry.get("is_incognito"):
+                self._dirty = True # Written by an older version: drop private windows from disk
+                continue
+            if now - entry.get("t", 0) <= self.ttl:
+                self._entries[key] = entry
+
+    def get(self, hwnd, title, create_time):
+        """ Cached fields for this window identity, or None. """
+        key = self.make_key(hwnd, title, create_time)
+        with self._lock:
+            if not self._loaded: self._load()
+            entry = self._entries.get(key)
+            if entry is None or self.clock() - entry["t"] > self.ttl:
+                if entry is not None:
+                    del self._entries[key]
+                    self._dirty = True
+                self.misses += 1
+                return None
+            entry["t"] = self.clock()
+            self._entries.move_to_end(key)
+            self._dirty = True
+            self.hits += 1
+            return {f: entry[f] for f in self.FIELDS if f in entry}
+
+    def put(self, hwnd, title, create_time, data):
+        """ Stores the known fields of 'data' (missing ones are simply not cached). """
+        fields = {f: data[f] for f in self.FIELDS if data.get(f) is not None}
+        if not fields: return
+        key = self.make_key(hwnd, title, create_time)
+        with self._lock:
+            if not self._loaded: self._load()
+            self._entries[key] = dict(fields, t=self.clock())
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+            self._dirty = True
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._loaded = True
+            self._dirty = True
+
+    def save(self):
+        """ Writes the cache if it changed (atomic replace). """
+        with self._lock:
+            if not self._dirty: return True
+            data = {"version": 1, "entries": dict(self._entries)}
+            self._dirty = False
+        try:
+            atomic_write_json(self.path, data)
+            return True
+        except Exception as e:
+            print(f"Error saving detail cache: {e}")
+            return False
+
+    def stats(self):
+        return {"hits": self.hits, "misses": self.misses, "entries": len(self._entries)}
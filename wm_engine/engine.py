@@ -1,23 +1,31 @@
 import os
+import time
 from .settings import SettingsManager
 from .storage import LayoutStorage
 from .scanner import WindowScanner
+from .detail_cache import DetailCache
 from .matcher import WindowMatcher
 from .restorer import WindowRestorer
-from .automation import is_incognito
+from .backend import get_backend
 from .logger import Logger
+from .tracing import tracer, report, save_chrome_trace
 
 class WindowManagerEngine:
-    def __init__(self, layout_file_path):
+    def __init__(self, layout_file_path, backend=None):
         self.layout_file = layout_file_path
+        self.backend = backend or get_backend() # Win32Backend, or e.g. a MemoryBackend to run headless
         self.settings_file = os.path.join(os.path.dirname(self.layout_file), "settings.json")
         
         # Initialize Subsystems
         self.settings_manager = SettingsManager(self.settings_file)
-        self.storage = LayoutStorage(self.layout_file)
-        self.scanner = WindowScanner(self.settings_manager)
+        self.storage = LayoutStorage(self.layout_file, use_compact=self.settings_manager.get("compact_layouts", False),
+                                     max_versions=self.settings_manager.get("history_max_versions", 50))
+        self.backend.set_data_dir(os.path.dirname(self.layout_file), uia_path_cache=self.settings_manager.get("uia_path_cache", True))
+        self.detail_cache = DetailCache(os.path.join(os.path.dirname(self.layout_file), "detail_cache.json"),
+                                        ttl=self.settings_manager.get("detail_cache_ttl_hours", 12) * 3600)
+        self.scanner = WindowScanner(self.settings_manager, detail_cache=self.detail_cache, backend=self.backend)
         self.matcher = WindowMatcher()
-        self.restorer = WindowRestorer(self.settings_manager, self.scanner, self.matcher, self.storage)
+        self.restorer = WindowRestorer(self.settings_manager, self.scanner, self.matcher, self.storage, backend=self.backend)
 
     # --- Property Proxies for Backward Compatibility with UI ---
     @property
@@ -43,10 +51,20 @@ class WindowManagerEngine:
     def save_settings(self, new_settings):
         self.settings_manager.save_settings(new_settings)
 
+    def flush_settings(self):
+        """ Writes pending write-behind settings changes (call before exiting). """
+        return self.settings_manager.flush()
+
     def load_layouts(self):
         return self.storage.load_layouts()
 
     def save_layout(self, scenario_name, overrides=None):
+        with tracer.operation("save", scenario=scenario_name):
+            success = self._save_layout(scenario_name, overrides)
+        self._report_operation()
+        return success
+
+    def _save_layout(self, scenario_name, overrides=None):
         self.scanner.clear_cache()
         Logger.title(f"Sauvegarde : {scenario_name}")
         
@@ -87,12 +105,18 @@ class WindowManagerEngine:
                     "folder_path": w["folder_path"],
                     "is_incognito": is_priv
                 })
+                if w["tabs"]:
+                    # Every tab of the browser window, relaunched together (restorer._launch_browser_group)
+                    layout_data[-1]["tabs"] = w["tabs"]
+                    layout_data[-1]["active_tab"] = w["active_tab"]
             
-            # Use overrides to persist settings with the layout if provided
-            if final_settings:
-                 self.storage.set_layout_settings(scenario_name, final_settings)
-
-            self.storage.set_layout(scenario_name, layout_data)
+            # Use overrides to persist settings with the layout if provided.
+            # Windows and settings go in one write: one history version per save.
+            with tracer.span("write", "storage"):
+                if final_settings:
+                    self.storage.set_layout(scenario_name, {"windows": layout_data, "settings": final_settings})
+                else:
+                    self.storage.set_layout(scenario_name, layout_data)
             Logger.success(f"Sauvegarde terminée ({len(layout_data)} fenêtres)")
             return True
         except Exception as e:
@@ -105,8 +129,54 @@ class WindowManagerEngine:
             Logger.success(f"Renommé : '{old_name}' -> '{new_name}'")
         return success
 
+    def list_layout_versions(self, name):
+        return self.storage.list_versions(name)
+
+    def restore_layout_version(self, name, version):
+        success = self.storage.restore_version(name, version)
+        if success:
+            Logger.success(f"Version {version} restaurée : '{name}'")
+        else:
+            Logger.error(f"Version {version} introuvable pour '{name}'")
+        return success
+
     def restore_layout(self, scenario_name):
-        return self.restorer.restore_layout(scenario_name)
+        with tracer.operation("restore", scenario=scenario_name):
+            success = self.restorer.restore_layout(scenario_name)
+        self._report_operation()
+        return success
+
+    # --- Performance Report ---
+    def _report_operation(self):
+        """ Logs where the last save / restore spent its time; exports a Chrome trace if 'trace_export' is on. """
+        root = tracer.last_operation
+        if root is None: return
+        summary = report(root)
+        Logger.info(f"Performance ({summary['operation']}) : {summary['total']:.2f}s au total")
+        categories = ", ".join(f"{name} {seconds:.2f}s" for name, seconds in summary["categories"] if seconds >= 0.005)
+        if categories:
+            Logger.info(f"Répartition : {categories}")
+        for title, seconds, private in summary["slowest_windows"]:
+            Logger.info(f"Lente ({seconds:.2f}s) : {title[:50]}", private=private)
+        if summary["counters"]:
+            Logger.info("Compteurs : " + ", ".join(f"{k}={v}" for k, v in sorted(summary["counters"].items())))
+        if self.settings_manager.get("trace_export", False):
+            name = f"{summary['operation']}-{time.strftime('%Y%m%d-%H%M%S')}.json"
+            self.export_trace(os.path.join(os.path.dirname(self.layout_file), "traces", name))
+
+    def export_trace(self, path):
+        """ Writes the last save / restore as a Chrome trace (chrome://tracing, Perfetto). """
+        root = tracer.last_operation
+        if root is None:
+            Logger.warn("Aucune opération à exporter.")
+            return False
+        try:
+            save_chrome_trace(root, path)
+            Logger.info(f"Trace exportée : {path}")
+            return True
+        except Exception as e:
+            Logger.error(f"Export de la trace impossible : {e}")
+            return False
 
     # --- Expose Helpers if needed ---
     def normalize_url(self, url):
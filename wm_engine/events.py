@@ -0,0 +1,172 @@
+import queue
+import threading
+import time
+
+from .logger import Logger
+
+# WinEvent constants (winuser.h)
+EVENT_OBJECT_CREATE = 0x8000
+EVENT_OBJECT_SHOW = 0x8002
+EVENT_OBJECT_NAMECHANGE = 0x800C
+OBJID_WINDOW = 0
+CHILDID_SELF = 0
+WINEVENT_OUTOFCONTEXT = 0x0000
+WINEVENT_SKIPOWNPROCESS = 0x0002
+GA_ROOT = 2
+WM_QUIT = 0x0012
+
+class WindowEventSource:
+    """
+    Reports top-level windows that appeared (or changed title) since start().
+    The restorer scans only those HWNDs instead of re-enumerating the desktop.
+    """
+
+    def start(self):
+        pass
+
+    def stop(self):
+        pass
+
+    def wait(self, timeout):
+        """ Returns the HWNDs reported since the last call, waiting up to 'timeout' seconds for one. """
+        raise NotImplementedError
+
+class QueueEventSource(WindowEventSource):
+    """ Event source fed from any thread through push(). """
+
+    def __init__(self):
+        self._queue = queue.Queue()
+
+    def push(self, hwnd):
+        self._queue.put(hwnd)
+
+    def wait(self, timeout):
+        try:
+            hwnds = [self._queue.get(timeout=timeout)]
+        except queue.Empty:
+            return []
+        while True:
+            try:
+                hwnds.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return list(dict.fromkeys(hwnds)) # Deduplicate, keep arrival order
+
+class WinEventHookSource(QueueEventSource):
+    """ SetWinEventHook (CREATE / SHOW / NAMECHANGE) on a dedicated message-loop thread. """
+
+    def __init__(self):
+        super().__init__()
+        self._thread = None
+        self._thread_id = None
+        self._ready = threading.Event()
+
+    def start(self):
+        import ctypes
+        if not hasattr(ctypes, "windll"):
+            raise RuntimeError("WinEvent hooks require Windows")
+        if self._thread and self._thread.is_alive(): return
+        self._ready.clear()
+        self._thread = threading.Thread(target=self._run, name="WinEventHook", daemon=True)
+        self._thread.start()
+        if not self._ready.wait(2.0):
+            raise RuntimeError("WinEvent hook thread did not start")
+        if self._thread_id is None:
+            raise RuntimeError("SetWinEventHook failed")
+
+    def stop(self):
+        if not self._thread: return
+        import ctypes
+        if self._thread_id:
+            ctypes.windll.user32.PostThreadMessageW(self._thread_id, WM_QUIT, 0, 0)
+        self._thread.join(2.0)
+        self._thread = None
+        self._thread_id = None
+
+    def _run(self):
+        import ctypes
+        from ctypes import wintypes
+        user32 = ctypes.windll.user32
+        kernel32 = ctypes.windll.kernel32
+
+        WinEventProc = ctypes.WINFUNCTYPE(None, wintypes.HANDLE, wintypes.DWORD, wintypes.HWND,
+                                          wintypes.LONG, wintypes.LONG, wintypes.DWORD, wintypes.DWORD)
+
+        def callback(hook, event, hwnd, id_object, id_child, thread_id, ms_time):
+            if event not in (EVENT_OBJECT_CREATE, EVENT_OBJECT_SHOW, EVENT_OBJECT_NAMECHANGE): return
+            if not hwnd or id_object != OBJID_WINDOW or id_child != CHILDID_SELF: return
+            # Top-level windows only: child controls are never layout targets.
+            if user32.GetAncestor(hwnd, GA_ROOT) != hwnd: return
+            self.push(hwnd)
+
+        proc = WinEventProc(callback) # Must stay referenced while hooks are alive
+        user32.SetWinEventHook.restype = wintypes.HANDLE
+        flags = WINEVENT_OUTOFCONTEXT | WINEVENT_SKIPOWNPROCESS
+        hooks = [
+            user32.SetWinEventHook(EVENT_OBJECT_CREATE, EVENT_OBJECT_SHOW, 0, proc, 0, 0, flags),
+            user32.SetWinEventHook(EVENT_OBJECT_NAMECHANGE, EVENT_OBJECT_NAMECHANGE, 0, proc, 0, 0, flags),
+        ]
+        if not all(hooks):
+            for h in hooks:
+                if h: user32.UnhookWinEvent(h)
+            self._ready.set()
+            return
+
+        self._thread_id = kernel32.GetCurrentThreadId()
+        self._ready.set()
+
+        # Out-of-context hooks are delivered through this thread's message queue.
+        msg = wintypes.MSG()
+        while user32.GetMessageW(ctypes.byref(msg), 0, 0, 0) > 0:
+            user32.TranslateMessage(ctypes.byref(msg))
+            user32.DispatchMessageW(ctypes.byref(msg))
+
+        for h in hooks:
+            user32.UnhookWinEvent(h)
+
+class ScriptedEventSource(WindowEventSource):
+    """
+    In-process fake: replays a script of (seconds_after_start, hwnd) events.
+    Clock and sleep are injectable so the wait loop can run on simulated time.
+    """
+
+    def __init__(self, script, clock=time.time, sleep=time.sleep):
+        self.script = sorted(script, key=lambda e: e[0])
+        self.clock = clock
+        self.sleep = sleep
+        self._start = None
+        self._next = 0
+
+    def start(self):
+        self._start = self.clock()
+        self._next = 0
+
+    def _due(self, now):
+        hwnds = []
+        while self._next < len(self.script) and self._start + self.script[self._next][0] <= now:
+            hwnds.append(self.script[self._next][1])
+            self._next += 1
+        return list(dict.fromkeys(hwnds))
+
+    def wait(self, timeout):
+        now = self.clock()
+        due = self._due(now)
+        if due: return due
+
+        if self._next < len(self.script):
+            next_at = self._start + self.script[self._next][0]
+            if next_at - now <= timeout:
+                self.sleep(max(0, next_at - now))
+                return self._due(self.clock())
+        self.sleep(timeout)
+        return []
+
+def create_event_source():
+    """ Returns a started native event source, or None (callers fall back to polling). """
+    try:
+        source = WinEventHookSource()
+        source.start()
+        return source
+    except Exception as e:
+        Logger.debug(f"WinEvent hook unavailable, polling instead: {e}")
+        return None
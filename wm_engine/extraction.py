@@ -0,0 +1,131 @@
+import queue
+import threading
+import time
+
+class AutomationExtractor:
+    """
+    Win32 extractor: UI Automation through the automation module (imported on first use).
+    extract_url() also looks for private-mode markers in the same traversal; the
+    scanner's is_incognito() call that follows for that window reuses the answer.
+    """
+
+    def __init__(self, path_cache=None):
+        self.path_cache = path_cache # AddressBarPathCache, optional
+        self._ui_incognito = {} # hwnd -> marker found by the last extract_url(), consumed by is_incognito()
+        self._lock = threading.Lock()
+
+    def extract_url(self, hwnd):
+        from . import automation
+        url, ui_incognito = automation.scan_browser(hwnd, self.path_cache)
+        with self._lock:
+            if ui_incognito is None: self._ui_incognito.pop(hwnd, None)
+            else: self._ui_incognito[hwnd] = ui_incognito
+        return url
+
+    def is_incognito(self, hwnd, title):
+        from . import automation
+        with self._lock:
+            ui_result = self._ui_incognito.pop(hwnd, None)
+        return automation.is_incognito(hwnd, title, ui_result)
+
+def init_com_thread():
+    """ UI Automation needs COM initialized on every thread that uses it. """
+    import pythoncom
+    pythoncom.CoInitialize()
+
+def uninit_com_thread():
+    import pythoncom
+    pythoncom.CoUninitialize()
+
+class ExtractionPool:
+    """
+    Runs slow per-window jobs (URL / incognito extraction) on a bounded set of
+    worker threads. Each job has its own deadline, counted from when it starts:
+    a job still running past it is abandoned, its late result is dropped (the
+    caller treats it as unknown) and a fresh worker takes its slot.
+
+    The abandoned thread itself cannot be stopped and runs its job to the end;
+    jobs call job_abandoned() before side effects (peeking at a window, caching
+    a result) and skip them once it returns True.
+    """
+
+    def __init__(self, max_workers=4, timeout=3.0, initializer=init_com_thread, finalizer=uninit_com_thread, clock=time.time):
+        self.max_workers = max(1, max_workers)
+        self.timeout = timeout
+        self.initializer = initializer
+        self.finalizer = finalizer
+        self.clock = clock
+        self.abandoned = 0 # Jobs that missed their deadline during the last run()
+        self._local = threading.local() # Per worker thread: is_abandoned()
+
+    def job_abandoned(self):
+        """ True when called from a job this pool has abandoned (past its deadline); False outside the pool. """
+        is_abandoned = getattr(self._local, "is_abandoned", None)
+        return bool(is_abandoned and is_abandoned())
+
+    def run(self, jobs):
+        """ jobs: list of (key, fn). Returns {key: result} for jobs that finished in time without raising. """
+        results = {}
+        if not jobs:
+            return results
+
+        todo = queue.Queue()
+        for job in jobs:
+            todo.put(job)
+
+        cond = threading.Condition()
+        running = {} # worker id -> (key, start time)
+        abandoned_workers = set()
+        state = {"settled": 0, "next_id": 0}
+
+        def worker(wid):
+            self._local.is_abandoned = lambda: wid in abandoned_workers
+            if self.initializer:
+                try: self.initializer()
+                except Exception: pass
+            try:
+                while True:
+                    try:
+                        key, fn = todo.get_nowait()
+                    except queue.Empty:
+                        return
+                    with cond:
+                        if wid in abandoned_workers: return
+                        running[wid] = (key, self.clock())
+                    try:
+                        value, ok = fn(), True
+                    except Exception:
+                        value, ok = None, False
+                    with cond:
+                        if wid in abandoned_workers:
+                            return # Too late: already reported as unknown
+                        running.pop(wid, None)
+                        if ok: results[key] = value
+                        state["settled"] += 1
+                        cond.notify_all()
+            finally:
+                if self.finalizer:
+                    try: self.finalizer()
+                    except Exception: pass
+
+        def spawn():
+            wid = state["next_id"]
+            state["next_id"] += 1
+            threading.Thread(target=worker, args=(wid,), name=f"UIA-{wid}", daemon=True).start()
+
+        self.abandoned = 0
+        with cond:
+            for _ in range(min(self.max_workers, len(jobs))):
+                spawn()
+            while state["settled"] < len(jobs):
+                cond.wait(0.05)
+                now = self.clock()
+                for wid, (key, start) in list(running.items()):
+                    if now - start > self.timeout:
+                        running.pop(wid)
+                        abandoned_workers.add(wid)
+                        self.abandoned += 1
+                        state["settled"] += 1
+                        if not todo.empty():
+                            spawn()
+            return dict(results)
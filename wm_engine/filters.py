@@ -0,0 +1,55 @@
+import re
+
+from .browsers import registry
+
+class WindowFilter:
+    """
+    The window exclusion rules, compiled once per settings / overrides version:
+    exclude_titles becomes one regex searched in the lowercased title, and the
+    ignore_* settings become plain booleans. allowed() gives the same answers as
+    evaluating the settings directly.
+    """
+    EXACT_TITLES = ("Window Manager",) # exclude_titles entries matched exactly, not as substrings
+
+    def __init__(self, exclude_titles=(), ignore_folders=False, ignore_chrome=False, ignore_firefox=False, ignore_others=False):
+        substrings = []
+        self.exact_titles = set()
+        for ex in exclude_titles:
+            if ex in self.EXACT_TITLES: self.exact_titles.add(ex)
+            else: substrings.append(ex.lower())
+        pattern = "|".join(re.escape(s) for s in dict.fromkeys(substrings))
+        self._excluded = re.compile(pattern).search if substrings else None
+        self.ignore_folders = bool(ignore_folders)
+        self.ignore_chrome = bool(ignore_chrome)
+        self.ignore_firefox = bool(ignore_firefox)
+        self.ignore_others = bool(ignore_others)
+
+    @classmethod
+    def from_settings(cls, get_setting):
+        """ get_setting(key, default) -> value, overrides already applied. """
+        return cls(get_setting("exclude_titles", []) or [],
+                   get_setting("ignore_folders"), get_setting("ignore_chrome"),
+                   get_setting("ignore_firefox"), get_setting("ignore_others"))
+
+    def allowed(self, title, class_name=None, exe=None, is_explorer=False):
+        # 1. Title Based Exclusions
+        if title in self.exact_titles: return False
+        lower = title.lower()
+        if self._excluded is not None and self._excluded(lower): return False
+        if lower.endswith(".exe"): return False
+        if title == "Taskbar" or title == "Mise en veille": return False
+
+        # 2. Class Based Exclusions
+        if class_name == "Shell_TrayWnd": return False
+
+        # 3. Settings Based Exclusions
+        if self.ignore_folders and is_explorer: return False
+        if not (self.ignore_chrome or self.ignore_firefox or self.ignore_others): return True
+        # Either the title suffix or the executable may tell (browsers.py); "Chrome" alone in a title does not
+        browsers = {b.name for b in (registry.profile_for_title_suffix(title), registry.profile_for_exe(exe)) if b is not None}
+        is_chrome = "Chrome" in browsers
+        is_firefox = "Firefox" in browsers
+        if self.ignore_chrome and is_chrome: return False
+        if self.ignore_firefox and is_firefox: return False
+        if self.ignore_others and not is_explorer and not is_chrome and not is_firefox: return False
+        return True
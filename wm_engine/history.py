@@ -0,0 +1,148 @@
+import hashlib
+import json
+import os
+import shutil
+import time
+from collections import Counter
+
+from .utils import atomic_write_bytes
+
+class LayoutHistory:
+    """
+    Versioned snapshots of each scenario, one folder per scenario:
+
+        objects.jsonl   {"h": hash, "e": window entry}  - each distinct entry once (content hash)
+        versions.jsonl  {"v": n, "t": time, "shape": 1|2, "top": {...}, "entries": [hash, ...]}
+
+    Both files are append-only, so recording a version writes only the entries
+    that changed plus one manifest line. A truncated last line (crash mid-append)
+    is ignored on load. Beyond 'max_versions' the oldest versions are dropped and
+    unreferenced entries are compacted away once they outnumber the live ones.
+    """
+
+    def __init__(self, root, max_versions=50, clock=time.time):
+        self.root = root
+        self.max_versions = max(1, max_versions)
+        self.clock = clock
+        self._loaded = {} # key -> {"objects": {hash: entry}, "versions": [record, ...]}
+
+    @staticmethod
+    def entry_hash(entry):
+        return hashlib.sha1(json.dumps(entry, sort_keys=True).encode("utf-8")).hexdigest()
+
+    def _paths(self, key):
+        folder = os.path.join(self.root, key)
+        return folder, os.path.join(folder, "objects.jsonl"), os.path.join(folder, "versions.jsonl")
+
+    @staticmethod
+    def _read_lines(path):
+        records = []
+        if not os.path.exists(path): return records
+        with open(path, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    records.append(json.loads(line))
+                except ValueError:
+                    pass # Partial line from an interrupted append
+        return records
+
+    def _state(self, key):
+        state = self._loaded.get(key)
+        if state is None:
+            _, objects_file, versions_file = self._paths(key)
+            try:
+                objects = {o["h"]: o["e"] for o in self._read_lines(objects_file)}
+                versions = [v for v in self._read_lines(versions_file) if all(h in objects for h in v.get("entries", []))]
+            except Exception as e:
+                print(f"Error loading history: {e}")
+                objects, versions = {}, []
+            state = self._loaded[key] = {"objects": objects, "versions": versions}
+        return state
+
+    @staticmethod
+    def _append(path, records):
+        if not records: return
+        with open(path, "a", encoding="utf-8") as f:
+            f.write("".join(json.dumps(r) + "\n" for r in records))
+            f.flush()
+            os.fsync(f.fileno())
+
+    def record(self, key, data):
+        """ Stores 'data' (V1 list or V2 dict) as a new version. Returns its number, or None if identical to the last one. """
+        state = self._state(key)
+        if isinstance(data, list):
+            shape, windows, top = 1, data, {}
+        else:
+            shape, windows, top = 2, data.get("windows", []), {k: v for k, v in data.items() if k != "windows"}
+
+        hashes = [self.entry_hash(entry) for entry in windows]
+        last = state["versions"][-1] if state["versions"] else None
+        if last and last["entries"] == hashes and last["top"] == top and last["shape"] == shape:
+            return None
+
+        new_objects = {}
+        for h, entry in zip(hashes, windows):
+            if h not in state["objects"] and h not in new_objects:
+                new_objects[h] = entry
+        record = {"v": last["v"] + 1 if last else 1, "t": self.clock(), "shape": shape, "top": top, "entries": hashes}
+
+        folder, objects_file, versions_file = self._paths(key)
+        os.makedirs(folder, exist_ok=True)
+        self._append(objects_file, [{"h": h, "e": e} for h, e in new_objects.items()]) # Objects first
+        self._append(versions_file, [record])
+        state["objects"].update(new_objects)
+        state["versions"].append(record)
+
+        if len(state["versions"]) > self.max_versions:
+            self._prune(key, state)
+        return record["v"]
+
+    def _prune(self, key, state):
+        _, objects_file, versions_file = self._paths(key)
+        state["versions"] = state["versions"][-self.max_versions:]
+        atomic_write_bytes(versions_file, "".join(json.dumps(r) + "\n" for r in state["versions"]).encode("utf-8"))
+
+        live = {h for r in state["versions"] for h in r["entries"]}
+        if len(state["objects"]) - len(live) > len(live):
+            state["objects"] = {h: e for h, e in state["objects"].items() if h in live}
+            lines = "".join(json.dumps({"h": h, "e": e}) + "\n" for h, e in state["objects"].items())
+            atomic_write_bytes(objects_file, lines.encode("utf-8"))
+
+    def versions(self, key):
+        """ [{"version", "time", "count"}], oldest first. """
+        return [{"version": r["v"], "time": r["t"], "count": len(r["entries"])} for r in self._state(key)["versions"]]
+
+    def _find(self, key, version):
+        for record in self._state(key)["versions"]:
+            if record["v"] == version: return record
+        raise KeyError(f"No version {version} for '{key}'")
+
+    def get(self, key, version):
+        """ The layout as it was saved in 'version' (same V1 / V2 shape). """
+        state = self._state(key)
+        record = self._find(key, version)
+        windows = [json.loads(json.dumps(state["objects"][h])) for h in record["entries"]] # Callers may mutate
+        if record["shape"] == 1: return windows
+        return dict(json.loads(json.dumps(record["top"])), windows=windows)
+
+    def diff(self, key, old_version, new_version):
+        """ What changed from 'old_version' to 'new_version': added / removed entries, unchanged count, top-level keys changed. """
+        state = self._state(key)
+        old, new = self._find(key, old_version), self._find(key, new_version)
+        old_counts, new_counts = Counter(old["entries"]), Counter(new["entries"])
+        added = new_counts - old_counts
+        removed = old_counts - new_counts
+        return {
+            "added": [state["objects"][h] for h in added.elements()],
+            "removed": [state["objects"][h] for h in removed.elements()],
+            "unchanged": sum((old_counts & new_counts).values()),
+            "changed_keys": sorted(k for k in set(old["top"]) | set(new["top"]) if old["top"].get(k) != new["top"].get(k)),
+        }
+
+    def rename(self, old_key, new_key):
+        old_folder, new_folder = self._paths(old_key)[0], self._paths(new_key)[0]
+        self._loaded.pop(old_key, None)
+        self._loaded.pop(new_key, None)
+        if not os.path.exists(old_folder) or old_folder == new_folder: return
+        if os.path.exists(new_folder): shutil.rmtree(new_folder, ignore_errors=True)
+        os.replace(old_folder, new_folder)
@@ -1,9 +1,32 @@
+import json
+import threading
 import time
 import sys
+from collections import deque, namedtuple
+
+from .tracing import tracer
+
+# One log event. 'delta' = time since the previous public log, 'duration' = step duration.
+Record = namedtuple("Record", ["time", "level", "message", "delta", "duration", "private"])
 
 class Logger:
+    """
+    Every log call produces a Record, appended to a bounded ring buffer.
+    - ECHO (default): records are also printed immediately, as before.
+    - UI: set ECHO = False and drain() the buffer on a timer, inserting one batch per tick.
+      Records pushed out of a full buffer before a drain are reported once, by a
+      warning at the head of the next drain().
+    - set_jsonl_sink(path): every record is also appended to 'path' as a JSON line.
+    """
     DEBUG_MODE = False # Can be toggled
+    ECHO = True
+    BUFFER_SIZE = 5000
     _last_log_time = time.time()
+    _buffer = deque(maxlen=BUFFER_SIZE)
+    _lock = threading.Lock()
+    _jsonl = None
+    dropped = 0 # Records pushed out of the ring buffer before being drained
+    _dropped_reported = 0 # Part of 'dropped' already announced by drain()
 
     @staticmethod
     def _get_time_delta():
@@ -12,81 +35,124 @@ class Logger:
         Logger._last_log_time = now
         return delta
 
+    @staticmethod
+    def _emit(level, msg, delta=None, duration=None, private=False, echo=True):
+        record = Record(time.time(), level, msg, delta, duration, private)
+        with Logger._lock:
+            if len(Logger._buffer) == Logger._buffer.maxlen:
+                Logger.dropped += 1
+            Logger._buffer.append(record)
+            if Logger._jsonl is not None:
+                try:
+                    Logger._jsonl.write(json.dumps(record._asdict(), ensure_ascii=False) + "\n")
+                except Exception:
+                    pass
+        if echo and Logger.ECHO:
+            print(Logger.format(record), end="", flush=True)
+
+    @staticmethod
+    def format(record):
+        """ The text of a record, as it appears in the console / log panel. """
+        level, msg = record.level, record.message
+        prefix = "[PRIVÉ] " if record.private else ""
+        if level == "info": return f"> {prefix}{msg} ({record.delta:.2f}s)\n"
+        if level == "title": return f"\n--- {msg} --- ({record.delta:.2f}s)\n"
+        if level == "success": return f"  [OK] {msg} ({record.delta:.2f}s)\n"
+        if level == "warn": return f"  [!] {msg} ({record.delta:.2f}s)\n"
+        if level == "error": return f"  [ERREUR] {msg} ({record.delta:.2f}s)\n"
+        if level == "debug": return f"  [DEBUG] {msg}\n"
+        if level == "step": return f"  > {prefix}{msg} (prev: {record.delta:.2f}s)..."
+        if level == "step_ok": return f" [OK] ({record.duration:.2f}s)\n"
+        if level == "step_failed": return f" [ECHEC] ({record.duration:.2f}s)\n"
+        return msg # "raw": stdout text, kept as is
+
+    @staticmethod
+    def drain(max_records=None):
+        """ Removes and returns the buffered records, oldest first (after a warning if some were lost). """
+        records = []
+        with Logger._lock:
+            lost = Logger.dropped - Logger._dropped_reported
+            if lost:
+                Logger._dropped_reported = Logger.dropped
+                records.append(Record(time.time(), "warn", f"{lost} message(s) du journal perdu(s) (tampon plein)", 0.0, None, False))
+            while Logger._buffer and (max_records is None or len(records) < max_records):
+                records.append(Logger._buffer.popleft())
+            if Logger._jsonl is not None:
+                Logger._jsonl.flush()
+        return records
+
+    @staticmethod
+    def set_jsonl_sink(path):
+        """ Appends every record to 'path' as JSON lines (None to stop). """
+        with Logger._lock:
+            if Logger._jsonl is not None:
+                Logger._jsonl.close()
+                Logger._jsonl = None
+            if path:
+                Logger._jsonl = open(path, "a", encoding="utf-8")
+
+    @staticmethod
+    def raw(text):
+        """ Unstructured text (e.g. redirected stdout); never echoed back to stdout. """
+        Logger._emit("raw", text, echo=False)
+
     @staticmethod
     def info(msg, private=False):
         """ Standard user-facing log """
-        delta = Logger._get_time_delta()
-        prefix = "[PRIVÉ] " if private else ""
-        print(f"> {prefix}{msg} ({delta:.2f}s)")
+        Logger._emit("info", msg, delta=Logger._get_time_delta(), private=private)
 
     @staticmethod
     def title(msg):
         """ Section header """
         # Reset timer so the title doesn't capture the previous gap, or maybe it should?
         # A title usually starts a new phase. Let's capture the gap to be honest.
-        delta = Logger._get_time_delta() 
-        print(f"\n--- {msg} --- ({delta:.2f}s)") 
+        Logger._emit("title", msg, delta=Logger._get_time_delta())
 
     @staticmethod
     def success(msg):
-        delta = Logger._get_time_delta()
-        print(f"  [OK] {msg} ({delta:.2f}s)")
+        Logger._emit("success", msg, delta=Logger._get_time_delta())
 
     @staticmethod
     def warn(msg):
-        delta = Logger._get_time_delta()
-        print(f"  [!] {msg} ({delta:.2f}s)")
+        Logger._emit("warn", msg, delta=Logger._get_time_delta())
 
     @staticmethod
     def error(msg):
-        delta = Logger._get_time_delta()
-        print(f"  [ERREUR] {msg} ({delta:.2f}s)")
+        Logger._emit("error", msg, delta=Logger._get_time_delta())
 
     @staticmethod
     def debug(msg):
-        """ Only prints if DEBUG_MODE is True """
+        """ Only logs if DEBUG_MODE is True """
         if Logger.DEBUG_MODE:
             # We don't update the public timer for debug logs to avoid confusing the user
             # who sees the public logs. "Gap time" should be between public logs.
             # But if we don't update, the next public log will include the time taken by debug ops.
             # That is actually CORRECT. Debug ops take time.
-            print(f"  [DEBUG] {msg}")
+            Logger._emit("debug", msg)
 
     class Scope:
-        """ Context Manager for timed steps """
+        """ Context Manager for timed steps (also recorded as a tracing span) """
         def __init__(self, msg, private=False):
             self.msg = msg
             self.private = private
             self.start_time = 0
+            self._span = None
 
         def __enter__(self):
-            # Capture latent time before this step started
-            delta = Logger._get_time_delta()
-            
-            prefix = "[PRIVÉ] " if self.private else ""
-            # We print the delta from the PREVIOUS action here, if it's significant.
-            # But usually lines look like: "> Action..." then "[OK] (Duration)"
-            # If we add (Pre-lag) it might crowd it.
-            # However, the user asked "entre chaque log".
-            # So: "> Action... (latence: 0.5s)" ?
-            # Or just "> Action... " and rely on the previous log's timestamp?
-            # No, the previous log is practically gone.
-            
+            # Capture latent time before this step started.
             # User request: "avoir le temps qu'a mis l'action précédente à s'effectuer".
-            # So yes, we should show it.
-            print(f"  > {prefix}{self.msg} (prev: {delta:.2f}s)...", end="", flush=True)
+            Logger._emit("step", self.msg, delta=Logger._get_time_delta(), private=self.private)
+            self._span = tracer.span(self.msg, "step", private=self.private)
+            self._span.__enter__()
             self.start_time = time.time()
             return self
 
         def __exit__(self, exc_type, exc_val, exc_tb):
             duration = time.time() - self.start_time
+            self._span.__exit__(exc_type, exc_val, exc_tb)
             # Update the global timer so the NEXT log counts from NOW.
             Logger._last_log_time = time.time()
-            
-            if exc_type:
-                print(f" [ECHEC] ({duration:.2f}s)")
-            else:
-                print(f" [OK] ({duration:.2f}s)")
+            Logger._emit("step_failed" if exc_type else "step_ok", self.msg, duration=duration, private=self.private)
 
     @staticmethod
     def step(msg, private=False):
@@ -0,0 +1,49 @@
+def _decompress_python(src, size=None):
+    """ LZ4 block format (no frame header): sequences of literals followed by a back-reference. """
+    dst = bytearray()
+    i = 0
+    n = len(src)
+    while i < n:
+        token = src[i]
+        i += 1
+        length = token >> 4
+        if length == 15:
+            while True:
+                b = src[i]
+                i += 1
+                length += b
+                if b != 255: break
+        dst += src[i:i + length]
+        i += length
+        if i >= n: break # The last sequence has literals only
+
+        offset = src[i] | (src[i + 1] << 8)
+        i += 2
+        length = token & 15
+        if length == 15:
+            while True:
+                b = src[i]
+                i += 1
+                length += b
+                if b != 255: break
+        length += 4 # Minimum match
+        start = len(dst) - offset
+        if offset == 0 or start < 0:
+            raise ValueError("Corrupt LZ4 block: bad offset")
+        if length <= offset:
+            dst += dst[start:start + length]
+        else:
+            # Overlapping copy: the match repeats the last 'offset' bytes
+            pattern = dst[start:]
+            dst += (pattern * (length // offset + 1))[:length]
+    if size is not None and len(dst) != size:
+        raise ValueError(f"Corrupt LZ4 block: {len(dst)} bytes instead of {size}")
+    return bytes(dst)
+
+def decompress(src, size):
+    """ Decompresses one LZ4 block of known decompressed 'size'. Uses the lz4 package when installed. """
+    try:
+        import lz4.block
+    except ImportError:
+        return _decompress_python(src, size)
+    return lz4.block.decompress(src, uncompressed_size=size)
@@ -1,6 +1,8 @@
 import os
-import psutil
-from .utils import calculate_similarity, clean_title
+from .titles import title_features
+from .browsers import registry
+from .utils import layout_tabs
+from .candidates import CandidateIndex
 from .logger import Logger
 
 class WindowMatcher:
@@ -9,201 +11,372 @@ class WindowMatcher:
         "node.exe", "cmd.exe", "powershell.exe", "wscript.exe", "cscript.exe"
     ]
 
-    def find_match(self, saved, current_windows, used_hwnds):
+    MATCH_THRESHOLD = 40
+    # URL evidence when only the live window's active tab is known and it is one
+    # of the saved background tabs (a relaunched window shows its first tab)
+    OTHER_TAB_MATCH = 0.7
+    # Every matched item saves a launch, so the assignment maximizes the number
+    # of matches first and the total score second.
+    ASSIGNMENT_BONUS = 1000
+
+    def find_match(self, saved, current_windows, used_hwnds, index=None):
+        if index is None:
+            index = CandidateIndex(current_windows)
+
+        candidates = []
+        for current in index.candidates(saved):
+            if current['hwnd'] in used_hwnds:
+                continue
+            score = self.score(saved, current)
+            if score >= self.MATCH_THRESHOLD:
+                candidates.append((score, current))
+
+        if not candidates:
+            return None
+        candidates.sort(key=lambda x: x[0], reverse=True)
+        return candidates[0][1]
+
+    def match_all(self, saved_windows, current_windows, used_hwnds=None):
+        """
+        Matches every saved item at once instead of greedily, item by item.
+        Returns a list aligned with saved_windows (matched window dict or None).
+        """
+        used_hwnds = used_hwnds or set()
+        available = [c for c in current_windows if c['hwnd'] not in used_hwnds]
+        index = CandidateIndex(available)
+        position = {id(c): j for j, c in enumerate(available)}
+
+        # Sparse candidate graph: only plausible pairs above the threshold are kept.
+        edges = {}
+        for i, saved in enumerate(saved_windows):
+            row = {}
+            for current in index.candidates(saved):
+                j = position[id(current)]
+                score = self.score(saved, current)
+                if score >= self.MATCH_THRESHOLD:
+                    row[j] = score
+            if row:
+                edges[i] = row
+
+        results = [None] * len(saved_windows)
+        for rows in self._connected_components(edges):
+            if len(rows) == 1:
+                # Fast path: nobody else wants these windows, best score wins.
+                i = rows[0]
+                j = max(edges[i], key=lambda col: (edges[i][col], -col))
+                results[i] = available[j]
+                continue
+
+            cols = sorted({j for i in rows for j in edges[i]})
+            weights = [[edges[i][j] + self.ASSIGNMENT_BONUS if j in edges[i] else None for j in cols] for i in rows]
+            for r, c in enumerate(self._solve_assignment(weights)):
+                if c is not None:
+                    results[rows[r]] = available[cols[c]]
+        return results
+
+    @staticmethod
+    def _connected_components(edges):
+        """ Groups saved rows that compete (directly or not) for the same windows. """
+        col_to_rows = {}
+        for i, row in edges.items():
+            for j in row:
+                col_to_rows.setdefault(j, []).append(i)
+
+        seen = set()
+        components = []
+        for start in edges:
+            if start in seen: continue
+            seen.add(start)
+            stack = [start]
+            component = []
+            while stack:
+                i = stack.pop()
+                component.append(i)
+                for j in edges[i]:
+                    for other in col_to_rows[j]:
+                        if other not in seen:
+                            seen.add(other)
+                            stack.append(other)
+            components.append(sorted(component))
+        return components
+
+    @staticmethod
+    def _solve_assignment(weights):
+        """
+        Maximum weight assignment (Hungarian algorithm, O(n^3)).
+        weights[r][c] is None when the pair is not allowed. Rows may stay unassigned.
+        Returns the chosen column per row (or None).
+        """
+        n_rows = len(weights)
+        n_cols = len(weights[0]) if weights else 0
+        # Pad with one "unassigned" column per row so every row can opt out at zero gain.
+        size = n_cols + n_rows
+        forbidden = 1 + sum(max((w for w in row if w is not None), default=0) for row in weights)
+
+        def cost(r, c):
+            if c >= n_cols: return 0
+            w = weights[r][c]
+            return forbidden if w is None else -w
+
+        INF = float("inf")
+        u = [0] * (n_rows + 1)
+        v = [0] * (size + 1)
+        p = [0] * (size + 1) # p[col] = row assigned to col (1-based, 0 = free)
+        way = [0] * (size + 1)
+        for r in range(1, n_rows + 1):
+            p[0] = r
+            j0 = 0
+            minv = [INF] * (size + 1)
+            used = [False] * (size + 1)
+            while True:
+                used[j0] = True
+                i0 = p[j0]
+                delta = INF
+                j1 = 0
+                for j in range(1, size + 1):
+                    if used[j]: continue
+                    cur = cost(i0 - 1, j - 1) - u[i0] - v[j]
+                    if cur < minv[j]:
+                        minv[j] = cur
+                        way[j] = j0
+                    if minv[j] < delta:
+                        delta = minv[j]
+                        j1 = j
+                for j in range(size + 1):
+                    if used[j]:
+                        u[p[j]] += delta
+                        v[j] -= delta
+                    else:
+                        minv[j] -= delta
+                j0 = j1
+                if p[j0] == 0: break
+            while j0:
+                j1 = way[j0]
+                p[j0] = p[j1]
+                j0 = j1
+
+        assignment = [None] * n_rows
+        for j in range(1, n_cols + 1):
+            r = p[j]
+            if r and weights[r - 1][j - 1] is not None:
+                assignment[r - 1] = j - 1
+        return assignment
+
+    @staticmethod
+    def _same_url(a, b):
+        a, b = a.lower(), b.lower()
+        return a in b or b in a
+
+    def tab_similarity(self, saved, current):
+        """
+        0.0 - 1.0: how well the live window's tabs match the saved window's.
+        With the live tab list (session files), the share of tabs both sides have:
+        at least OTHER_TAB_MATCH when the active tabs agree, 0.0 when they differ
+        and the share is below it (a few common tabs do not make the same window);
+        with only the live active tab, 1.0 for the saved active tab and
+        OTHER_TAB_MATCH for another one.
+        """
+        saved_tabs = layout_tabs(saved)
+        current_tabs = layout_tabs(current)
+        if not saved_tabs or not current_tabs: return 0.0
+        saved_url = saved.get("url")
+        current_url = current.get("url")
+        same_active = bool(saved_url and current_url and self._same_url(saved_url, current_url))
+        if current.get("tabs"):
+            remaining = list(saved_tabs)
+            common = 0
+            for url in current_tabs:
+                for k, other in enumerate(remaining):
+                    if self._same_url(url, other):
+                        common += 1
+                        del remaining[k]
+                        break
+            share = common / max(len(saved_tabs), len(current_tabs))
+            if same_active: return max(share, self.OTHER_TAB_MATCH)
+            return share if share >= self.OTHER_TAB_MATCH else 0.0
+        if same_active: return 1.0
+        return self.OTHER_TAB_MATCH if any(self._same_url(url, current_tabs[0]) for url in saved_tabs) else 0.0
+
+    def score(self, saved, current):
+        """ Scores how likely 'current' (live window) is the window described by 'saved'. """
         saved_title = saved.get("exact_title", "")
         saved_url = saved.get("url")
         saved_folder = saved.get("folder_path")
         saved_cmdline = saved.get("cmdline")
         saved_exe = saved.get("cmdline")[0] if saved.get("cmdline") else ""
         saved_inc = saved.get("is_incognito", False)
-        
-        candidates = []
 
-        clean_saved_title = clean_title(saved_title)
+        saved_features = title_features(saved_title)
 
-        for current in current_windows:
-            if current['hwnd'] in used_hwnds:
-                continue
+        score = 0
+        current_title = current['title']
+        current_features = title_features(current_title)
+        same_clean_title = bool(saved_features.clean_lower) and saved_features.clean_lower == current_features.clean_lower
+        
+        # --- 1. TITLE MATCH ---
+        if same_clean_title:
+            score += 50
+        elif saved_title == current_title:
+             score += 50
+        elif saved_title in current_title or current_title in saved_title:
+             score += 30
+        
+        if score < 30: 
+             sim = saved_features.similarity(current_features, 0.6)
+             if sim > 0.9: score += 50
+             elif sim > 0.6: score += 30
 
-            score = 0
-            current_title = current['title']
-            clean_current_title = clean_title(current_title)
-            
-            # --- 1. TITLE MATCH ---
-            if clean_saved_title and clean_current_title and clean_saved_title.lower() == clean_current_title.lower():
-                score += 50
-            elif saved_title == current_title:
-                 score += 50
-            elif saved_title in current_title or current_title in saved_title:
-                 score += 30
+        # --- 2. EXECUTABLE MATCH ---
+        current_cmdline = current.get("cmdline")
+        current_exe = current_cmdline[0] if current_cmdline and len(current_cmdline) > 0 else current.get("exe_name")
+        saved_exe_name = saved.get("exe_name") # If we saved it? We should have. But older saves might not have it.
+        # Fallback for saved_exe
+        if not saved_exe:
+             saved_exe = saved_exe_name
+
+        if saved_exe and current_exe:
+            saved_exe_base = os.path.basename(saved_exe).lower()
+            current_exe_base = os.path.basename(current_exe).lower()
             
-            if score < 30: 
-                 sim = calculate_similarity(saved_title.lower(), current_title.lower())
-                 if sim > 0.9: score += 50
-                 elif sim > 0.6: score += 30
-
-            # --- 2. EXECUTABLE MATCH ---
-            current_cmdline = current.get("cmdline")
-            current_exe = current_cmdline[0] if current_cmdline and len(current_cmdline) > 0 else current.get("exe_name")
-            saved_exe_name = saved.get("exe_name") # If we saved it? We should have. But older saves might not have it.
-            # Fallback for saved_exe
-            if not saved_exe:
-                 saved_exe = saved_exe_name
-
-            if saved_exe and current_exe:
-                saved_exe_base = os.path.basename(saved_exe).lower()
-                current_exe_base = os.path.basename(current_exe).lower()
+            if saved_exe_base == current_exe_base:
+                # BASE SCORE
+                # If Generic (Python, etc.), we trust it LESS initially.
+                # We require argument match to confirm.
+                if saved_exe_base in self.GENERIC_EXECUTABLES:
+                    score += 10 # Weak match for generic
+                else:
+                     score += 50
                 
-                if saved_exe_base == current_exe_base:
-                    # BASE SCORE
-                    # If Generic (Python, etc.), we trust it LESS initially.
-                    # We require argument match to confirm.
-                    if saved_exe_base in self.GENERIC_EXECUTABLES:
-                        score += 10 # Weak match for generic
-                    else:
-                         score += 50
-                    
-                    # Enhanced Script/Argument Matching
-                    s_args = saved_cmdline[1:] if saved_cmdline and len(saved_cmdline) > 1 else []
-                    c_args = current_cmdline[1:] if current_cmdline and len(current_cmdline) > 1 else []
+                # Enhanced Script/Argument Matching
+                s_args = saved_cmdline[1:] if saved_cmdline and len(saved_cmdline) > 1 else []
+                c_args = current_cmdline[1:] if current_cmdline and len(current_cmdline) > 1 else []
+                
+                if s_args and c_args:
+                    def find_payload(args):
+                        for a in args:
+                            # Heuristic: Has extension, not a flag
+                            if "." in a and not a.startswith("-") and len(a) > 2: 
+                                return os.path.basename(a).lower()
+                        return None
                     
-                    if s_args and c_args:
-                        def find_payload(args):
-                            for a in args:
-                                # Heuristic: Has extension, not a flag
-                                if "." in a and not a.startswith("-") and len(a) > 2: 
-                                    return os.path.basename(a).lower()
-                            return None
-                        
-                        s_payload = find_payload(s_args)
-                        c_payload = find_payload(c_args)
-                        
-                        if s_payload and c_payload:
-                            if s_payload == c_payload:
-                                 score += 60 # Boost significantly (10+60 = 70, or 50+60=110)
-                            else:
-                                 # Different scripts/files -> Different Apps
-                                 # CRITICAL: If generic, this is a DEFINITIVE MISMATCH.
-                                 if saved_exe_base in self.GENERIC_EXECUTABLES:
-                                     score -= 100
-                                 else:
-                                     score -= 80 
-                        elif s_args == c_args:
-                             # Exact arg match fallback
-                             score += 50
-                    elif len(s_args) != len(c_args):
-                         # Argument count mismatch on generic -> Likely mismatch
-                         if saved_exe_base in self.GENERIC_EXECUTABLES:
-                             score -= 20
-            
-            # --- 3. SPECIFIC CHECKS ---
-            current_url = current.get("url")
-            current_folder = current.get("folder_path")
-            current_inc = current.get("is_incognito", False)
-            is_minimized = current.get("is_minimized", False)
-            
-            # Incognito Check: Be lenient if minimized (detection is hard)
-            if saved_inc != current_inc:
-                 if is_minimized and not saved_inc: 
-                     # Case: Saved=Normal, Current=Detected as Private? Or vice versa?
-                     # Minimized windows often fail detection (return Normal), so we must be lenient.
-                     score -= 5 # Was -20. Allow Title(+50) - 5 = 45 (> 40 Threshold)
-                 elif is_minimized:
-                      # If Minimized and Saved=Incognito, but Current=Normal (likely default if blind detection failing)
-                      Logger.debug(f"[MATCH-REJECT] Minimized Incognito Mismatch: '{current_title}' (Penalty -100)")
-                      score -= 100 # Now that detection is reliable (Active Peek), we can reject mismatches.
-                 else:
-                      # HARD REJECTION for visible windows with wrong Mode
-                      Logger.debug(f"[MATCH-REJECT] '{current_title}' vs Saved Inc={saved_inc} / Curr Inc={current_inc} -> Penalty -120")
-                      score -= 120 
-
-            is_browser = any(b in saved_exe.lower() for b in ["chrome", "firefox", "msedge"]) if saved_exe else False
-            
-            if saved_folder and current_folder:
-                if saved_folder.lower() == current_folder.lower():
-                    score += 100
-                else:
-                    score -= 80
-            elif saved_folder and not current_folder:
-                # Critical: We expect a folder but scanner couldn't verify current path.
-                # Do NOT trust generic Exe match (explorer.exe).
-                # Require strict title match to avoid stealing unrelated Explorer windows.
-                if clean_saved_title and clean_current_title and clean_saved_title.lower() == clean_current_title.lower():
-                     # Title matches exactly (e.g. "Games" == "Games"). Acceptable risk.
-                     pass 
-                elif saved_title == current_title:
-                     pass
-                else:
-                     # No path verification AND no title match. Reject.
-                     # This prevents "Downloads" matching "Games" via Exe-only score (50).
-                     Logger.debug(f"[MATCH-REJECT] Folder Mismatch (Blind): '{current_title}' != '{saved_title}'")
-                     score -= 50 
-            
-            # --- Browser Strictness (NEW) ---
-            # If it's a browser, we MUST have a Title Match or a URL Match.
-            # Matching on Exe only ("firefox.exe" == "firefox.exe") is insufficient and dangerous.
-            title_match_score = score # Capture score derived from title (0, 30, 50)
-            
-            if has_url_match := (saved_url and current_url and (saved_url.lower() in current_url.lower() or current_url.lower() in saved_url.lower())):
-                 score += 100
-            elif saved_url and current_url:
-                 score -= 150 # URL mismatch
-            elif is_browser and not saved_url and current_url:
-                 # Saved is Blank, but Current has a URL.
-                 # Check if current is effectively blank
-                 normalized = current_url.lower()
-                 blank_indicators = [
-                     "about:newtab", "about:blank", 
-                     "chrome://newtab", "chrome://new-tab-page", 
-                     "edge://newtab", "edge://new-tab-page"
-                 ]
-                 is_effectively_blank = any(x in normalized for x in blank_indicators)
-                 
-                 if not is_effectively_blank:
-                      # Mismatch: User wants a blank page, found a content page.
-                      score -= 100
-            elif is_browser and saved_url and not current_url:
-                if not is_minimized:
-                    score -= 5 
-                    if score <= 45: # Requires title match if blind
-                        score -= 100
-                else:
-                    # Minimized: Trust Exe/Title more.
-                    # CRITICAL FIX: If minimized, we are blind to URL/Incognito in many cases.
-                    # ONLY force match if the executable actually matches (or we can't tell).
-                    exe_match = False
-                    if saved_exe and current_exe:
-                        if os.path.basename(saved_exe).lower() == os.path.basename(current_exe).lower():
-                            exe_match = True
+                    s_payload = find_payload(s_args)
+                    c_payload = find_payload(c_args)
                     
-                    if exe_match:
-                        # CRITICAL FIX CHECK: Ensure we don't override a Hard Reject from earlier (e.g. Incognito Mismatch)
-                        # The BUG was 'score < -50', but if penalty is exactly -100 or -120, we need to respect it.
-                        # Let's be safer: if score is negative, don't redeem it easily.
-                        if score <= -20: 
-                             Logger.debug(f"[MATCH-FORCE-SKIP] '{current_title}' Ignored (Score too low: {score})")
+                    if s_payload and c_payload:
+                        if s_payload == c_payload:
+                             score += 60 # Boost significantly (10+60 = 70, or 50+60=110)
                         else:
-                             # Redemption logic: It's minimized + Exe matches -> Likely the right one?
-                             # BUT WAIT. If it's a Browser, Exe match is weak (all Firefox tabs share Exe).
-                             # If we have NO Title match (score ~50 from Exe only), should we redeem?
-                             # No. If Title doesn't match, it's just "some firefox window".
-                             # We should only redeem if Title Match was present (Score > 50).
-                             
-                             if is_browser and title_match_score < 30:
-                                  # Exe Matches (50) but Title Mismatch (0). Total 50.
-                                  # If we force this, we match "Hotmail" to "YouTube". BAD.
-                                  Logger.debug(f"[MATCH-SKIP] Minimized Browser '{current_title}' has Executable match but Title mismatch.")
-                                  score -= 20 # Ensure it fails
+                             # Different scripts/files -> Different Apps
+                             # CRITICAL: If generic, this is a DEFINITIVE MISMATCH.
+                             if saved_exe_base in self.GENERIC_EXECUTABLES:
+                                 score -= 100
                              else:
-                                  score = 90 # almost perfect match
-                                  Logger.debug(f"[MATCH-FORCE] Minimized Window '{current_title}' assumed valid (Score -> 90)")
+                                 score -= 80 
+                    elif s_args == c_args:
+                         # Exact arg match fallback
+                         score += 50
+                elif len(s_args) != len(c_args):
+                     # Argument count mismatch on generic -> Likely mismatch
+                     if saved_exe_base in self.GENERIC_EXECUTABLES:
+                         score -= 20
+        
+        # --- 3. SPECIFIC CHECKS ---
+        current_url = current.get("url")
+        current_folder = current.get("folder_path")
+        current_inc = current.get("is_incognito", False)
+        is_minimized = current.get("is_minimized", False)
+        
+        # Incognito Check: Be lenient if minimized (detection is hard)
+        if saved_inc != current_inc:
+             if is_minimized and not saved_inc: 
+                 # Case: Saved=Normal, Current=Detected as Private? Or vice versa?
+                 # Minimized windows often fail detection (return Normal), so we must be lenient.
+                 score -= 5 # Was -20. Allow Title(+50) - 5 = 45 (> 40 Threshold)
+             elif is_minimized:
+                  # If Minimized and Saved=Incognito, but Current=Normal (likely default if blind detection failing)
+                  Logger.debug(f"[MATCH-REJECT] Minimized Incognito Mismatch: '{current_title}' (Penalty -100)")
+                  score -= 100 # Now that detection is reliable (Active Peek), we can reject mismatches.
+             else:
+                  # HARD REJECTION for visible windows with wrong Mode
+                  Logger.debug(f"[MATCH-REJECT] '{current_title}' vs Saved Inc={saved_inc} / Curr Inc={current_inc} -> Penalty -120")
+                  score -= 120 
+
+        is_browser = registry.profile_for_exe(saved_exe) is not None
+        
+        if saved_folder and current_folder:
+            if saved_folder.lower() == current_folder.lower():
+                score += 100
+            else:
+                score -= 80
+        elif saved_folder and not current_folder:
+            # Critical: We expect a folder but scanner couldn't verify current path.
+            # Do NOT trust generic Exe match (explorer.exe).
+            # Require strict title match to avoid stealing unrelated Explorer windows.
+            if same_clean_title:
+                 # Title matches exactly (e.g. "Games" == "Games"). Acceptable risk.
+                 pass 
+            elif saved_title == current_title:
+                 pass
+            else:
+                 # No path verification AND no title match. Reject.
+                 # This prevents "Downloads" matching "Games" via Exe-only score (50).
+                 Logger.debug(f"[MATCH-REJECT] Folder Mismatch (Blind): '{current_title}' != '{saved_title}'")
+                 score -= 50 
+        
+        # --- Browser Strictness (NEW) ---
+        # If it's a browser, we MUST have a Title Match or a URL Match.
+        # Matching on Exe only ("firefox.exe" == "firefox.exe") is insufficient and dangerous.
+        title_match_score = score # Capture score derived from title (0, 30, 50)
+        
+        # Tabs: the saved tab list against the live one (or the live active tab), 1 tab alike = +100
+        if tab_match := (saved_url and current_url and self.tab_similarity(saved, current)):
+             score += 50 + round(50 * tab_match)
+        elif saved_url and current_url:
+             score -= 150 # URL mismatch
+        elif is_browser and not saved_url and current_url:
+             # Saved is Blank, but Current has a URL.
+             # Check if current is effectively blank (any browser's new-tab page, see browsers.py)
+             is_effectively_blank = registry.is_new_tab_url(current_url)
+             
+             if not is_effectively_blank:
+                  # Mismatch: User wants a blank page, found a content page.
+                  score -= 100
+        elif is_browser and saved_url and not current_url:
+            if not is_minimized:
+                score -= 5 
+                if score <= 45: # Requires title match if blind
+                    score -= 100
+            else:
+                # Minimized: Trust Exe/Title more.
+                # CRITICAL FIX: If minimized, we are blind to URL/Incognito in many cases.
+                # ONLY force match if the executable actually matches (or we can't tell).
+                exe_match = False
+                if saved_exe and current_exe:
+                    if os.path.basename(saved_exe).lower() == os.path.basename(current_exe).lower():
+                        exe_match = True
+                
+                if exe_match:
+                    # CRITICAL FIX CHECK: Ensure we don't override a Hard Reject from earlier (e.g. Incognito Mismatch)
+                    # The BUG was 'score < -50', but if penalty is exactly -100 or -120, we need to respect it.
+                    # Let's be safer: if score is negative, don't redeem it easily.
+                    if score <= -20: 
+                         Logger.debug(f"[MATCH-FORCE-SKIP] '{current_title}' Ignored (Score too low: {score})")
                     else:
-                        score -= 50 # Executable mismatch on minimized window -> unlikely matches
+                         # Redemption logic: It's minimized + Exe matches -> Likely the right one?
+                         # BUT WAIT. If it's a Browser, Exe match is weak (all Firefox tabs share Exe).
+                         # If we have NO Title match (score ~50 from Exe only), should we redeem?
+                         # No. If Title doesn't match, it's just "some firefox window".
+                         # We should only redeem if Title Match was present (Score > 50).
+                         
+                         if is_browser and title_match_score < 30:
+                              # Exe Matches (50) but Title Mismatch (0). Total 50.
+                              # If we force this, we match "Hotmail" to "YouTube". BAD.
+                              Logger.debug(f"[MATCH-SKIP] Minimized Browser '{current_title}' has Executable match but Title mismatch.")
+                              score -= 20 # Ensure it fails
+                         else:
+                              score = 90 # almost perfect match
+                              Logger.debug(f"[MATCH-FORCE] Minimized Window '{current_title}' assumed valid (Score -> 90)")
+                else:
+                    score -= 50 # Executable mismatch on minimized window -> unlikely matches
 
-            if score >= 40:
-                candidates.append((score, current))
-    
-        if not candidates:
-            return None
-        candidates.sort(key=lambda x: x[0], reverse=True)
-        return candidates[0][1]
+        return score
@@ -0,0 +1,296 @@
+import json
+import threading
+import time
+
+from . import winconst
+from .backend import DesktopBackend
+from .events import QueueEventSource
+from .processes import ProcessInfo
+from .sessions import SessionTab, SessionWindow
+from .browsers import registry
+from .titles import is_private_title
+from .utils import normalize_url
+
+class MemoryWindow:
+    """ One window of an in-memory desktop (also the recording format, see to_dict). """
+    FIELDS = ("hwnd", "title", "class_name", "rect", "show_cmd", "pid", "exe", "cmdline", "cwd",
+              "url", "tabs", "active_tab", "folder_path", "is_incognito", "create_time", "style", "ex_style", "owner")
+
+    def __init__(self, hwnd, title, class_name="", rect=(0, 0, 800, 600), show_cmd=winconst.SW_SHOWNORMAL, pid=None,
+                 exe="", cmdline=None, cwd="", url=None, tabs=None, active_tab=None, folder_path=None, is_incognito=False,
+                 create_time=None, style=0, ex_style=0, owner=0):
+        self.hwnd = hwnd
+        self.title = title
+        self.class_name = class_name
+        self.rect = list(rect) # Normal (restored) position
+        self.show_cmd = show_cmd
+        self.pid = pid if pid is not None else 1000 + hwnd
+        self.exe = exe
+        self.cmdline = list(cmdline or [])
+        self.cwd = cwd
+        self.url = url # Active tab
+        self.tabs = list(tabs) if tabs else None # Every tab's URL (None: 'url' only)
+        self.active_tab = active_tab # Index in 'tabs' (None: the tab showing 'url')
+        self.folder_path = folder_path
+        self.is_incognito = is_incognito
+        self.create_time = create_time if create_time is not None else float(self.pid)
+        self.style = style
+        self.ex_style = ex_style
+        self.owner = owner
+
+    def to_dict(self):
+        return {field: getattr(self, field) for field in self.FIELDS}
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(**{field: data[field] for field in cls.FIELDS if field in data})
+
+class MemoryEventSource(QueueEventSource):
+    """ Reports the windows the backend opens while started. """
+
+    def __init__(self, backend):
+        super().__init__()
+        self.backend = backend
+
+    def start(self):
+        self.backend.listeners.append(self.push)
+
+    def stop(self):
+        if self.push in self.backend.listeners:
+            self.backend.listeners.remove(self.push)
+
+class MemoryExtractor:
+    """ URL / incognito answers from the window records (UIA latency). """
+
+    def __init__(self, backend):
+        self.backend = backend
+
+    def extract_url(self, hwnd):
+        window = self.backend._window(hwnd, "uia_url")
+        return window.url
+
+    def is_incognito(self, hwnd, title):
+        if is_private_title(title): return True
+        if hwnd is None: return False
+        profile = registry.profile_for_title(title)
+        if profile is not None and profile.private_from_title_only: return False # Same rules as automation.is_incognito
+        window = self.backend._window(hwnd, "uia_incognito")
+        return window.is_incognito
+
+class MemoryProcessProvider:
+    """ Process info from the window records (process query latency). """
+
+    def __init__(self, backend):
+        self.backend = backend
+
+    def _window_of(self, pid):
+        self.backend.count("process")
+        for window in list(self.backend.windows.values()):
+            if window.pid == pid: return window
+        raise LookupError(f"No process {pid}")
+
+    def create_time(self, pid):
+        return self._window_of(pid).create_time
+
+    def fetch(self, pid):
+        window = self._window_of(pid)
+        name = window.exe.replace("/", "\\").rsplit("\\", 1)[-1]
+        return ProcessInfo(name, list(window.cmdline), window.cwd, window.create_time)
+
+class MemoryExplorerPrefetch:
+    """ Same interface as automation.ExplorerPathPrefetch, answered synchronously. """
+
+    def __init__(self, paths):
+        self.paths = paths
+        self.timed_out = False
+
+    def is_alive(self):
+        return False
+
+    def result(self):
+        return self.paths
+
+class MemoryBackend(DesktopBackend):
+    """
+    A desktop held in memory: replays a recording (load / save) or a generated one.
+
+    'latency' maps a call kind (win32, process, uia_url, uia_incognito, shell, session,
+    launch) to seconds slept per call; 'calls' counts calls per kind. launch() / open_folder()
+    open a copy of the matching recorded window ('templates', by executable and
+    URL or folder) after the "launch" latency, and report it to event sources.
+    """
+
+    def __init__(self, windows=(), latency=None, monitors=None):
+        self.windows = {} # hwnd -> MemoryWindow, Z-order = insertion order
+        self.templates = [] # Every window ever added: what launches can reopen
+        self.latency = dict(latency or {})
+        self.calls = {}
+        self.launches = [] # (args, cwd) of every launch, for inspection
+        self.listeners = [] # fn(hwnd), called when a window opens
+        self._monitors = monitors or [[0, 0, 1920, 1080]]
+        self._lock = threading.Lock()
+        self._next_hwnd = 1
+        for window in windows:
+            self.add(window)
+
+    # --- Desktop model ---
+    def add(self, window):
+        with self._lock:
+            self.windows[window.hwnd] = window
+            self.templates.append(window)
+            self._next_hwnd = max(self._next_hwnd, window.hwnd + 1)
+        for listener in list(self.listeners): listener(window.hwnd)
+        return window
+
+    def close(self, hwnds):
+        with self._lock:
+            for hwnd in hwnds:
+                self.windows.pop(hwnd, None)
+
+    def count(self, kind):
+        with self._lock:
+            self.calls[kind] = self.calls.get(kind, 0) + 1
+        seconds = self.latency.get(kind)
+        if seconds: time.sleep(seconds)
+
+    def _window(self, hwnd, kind="win32"):
+        self.count(kind)
+        window = self.windows.get(hwnd)
+        if window is None: raise OSError(1400, f"Invalid window handle {hwnd}")
+        return window
+
+    @classmethod
+    def load(cls, path, **kwargs):
+        """ Backend replaying a desktop written by save() (or devtools/record_desktop.py). """
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        return cls([MemoryWindow.from_dict(w) for w in data.get("windows", [])], monitors=data.get("monitors"), **kwargs)
+
+    def save(self, path):
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({"windows": [w.to_dict() for w in self.windows.values()], "monitors": self._monitors}, f, indent=2)
+
+    # --- Windows ---
+    def enum_windows(self):
+        self.count("win32")
+        return list(self.windows)
+
+    def is_window(self, hwnd): return hwnd in self.windows
+    def is_window_visible(self, hwnd): return hwnd in self.windows
+    def get_window_text(self, hwnd): return self._window(hwnd).title
+    def get_class_name(self, hwnd): return self._window(hwnd).class_name
+
+    def get_window_long(self, hwnd, index):
+        window = self._window(hwnd)
+        return window.ex_style if index == winconst.GWL_EXSTYLE else window.style
+
+    def get_window(self, hwnd, cmd):
+        return self._window(hwnd).owner if cmd == winconst.GW_OWNER else 0
+
+    def is_cloaked(self, hwnd): return False
+    def is_iconic(self, hwnd): return self._window(hwnd).show_cmd == winconst.SW_SHOWMINIMIZED
+
+    def get_window_placement(self, hwnd):
+        window = self._window(hwnd)
+        return (0, window.show_cmd, (-1, -1), (-1, -1), tuple(window.rect))
+
+    def get_window_rect(self, hwnd): return tuple(self._window(hwnd).rect)
+
+    def set_window_placement(self, hwnd, placement):
+        window = self._window(hwnd)
+        window.show_cmd = placement[1]
+        window.rect = list(placement[4])
+
+    def set_window_pos(self, hwnd, x, y, width, height, flags):
+        window = self._window(hwnd)
+        if not flags & winconst.SWP_NOMOVE:
+            window.rect = [x, y, x + window.rect[2] - window.rect[0], y + window.rect[3] - window.rect[1]]
+        if not flags & winconst.SWP_NOSIZE:
+            window.rect = [window.rect[0], window.rect[1], window.rect[0] + width, window.rect[1] + height]
+
+    def show_window(self, hwnd, cmd):
+        window = self._window(hwnd)
+        if cmd in (winconst.SW_MINIMIZE, winconst.SW_SHOWMINIMIZED): window.show_cmd = winconst.SW_SHOWMINIMIZED
+        elif cmd == winconst.SW_SHOWMAXIMIZED: window.show_cmd = winconst.SW_SHOWMAXIMIZED
+        elif cmd in (winconst.SW_SHOWNORMAL, winconst.SW_SHOWNOACTIVATE, winconst.SW_RESTORE): window.show_cmd = winconst.SW_SHOWNORMAL
+
+    def update_window(self, hwnd): self._window(hwnd)
+    def redraw_window(self, hwnd, flags): self._window(hwnd)
+    def get_window_pid(self, hwnd): return self._window(hwnd).pid
+    def monitors(self): return [list(m) for m in self._monitors]
+
+    # --- Processes / UI Automation ---
+    def process_provider(self):
+        return MemoryProcessProvider(self)
+
+    def extractor(self):
+        return MemoryExtractor(self)
+
+    def explorer_prefetch(self, timeout):
+        self.count("shell")
+        return MemoryExplorerPrefetch({w.hwnd: w.folder_path for w in list(self.windows.values()) if w.folder_path})
+
+    def explorer_path(self, hwnd):
+        return self._window(hwnd, "shell").folder_path
+
+    def explorer_path_uia(self, hwnd):
+        return self._window(hwnd, "uia_url").folder_path
+
+    # --- Browser sessions ---
+    def browser_sessions(self, profile):
+        """ What the browser would have written: its non-private windows and their tabs (one read per call). """
+        if profile.session_format is None: return None
+        self.count("session")
+        sessions = []
+        for w in list(self.windows.values()):
+            if w.is_incognito or registry.profile_for_exe(w.exe) is not profile: continue
+            urls = w.tabs or [w.url or ""]
+            active = w.active_tab if w.tabs and w.active_tab is not None else (urls.index(w.url) if w.url in urls else 0)
+            # Only the active tab's title is known: it is the window's
+            tabs = [SessionTab(url, registry.clean_title(w.title) if i == active else "") for i, url in enumerate(urls)]
+            sessions.append(SessionWindow(tabs, active))
+        return sessions
+
+    # --- Launching ---
+    def _open_copy(self, template):
+        with self._lock:
+            hwnd = self._next_hwnd
+            self._next_hwnd += 1
+        data = template.to_dict()
+        data.update(hwnd=hwnd, pid=None, create_time=None, show_cmd=winconst.SW_SHOWNORMAL)
+        window = MemoryWindow.from_dict(data)
+
+        delay = self.latency.get("launch", 0.0)
+        if delay > 0:
+            timer = threading.Timer(delay, self.add, (window,))
+            timer.daemon = True
+            timer.start()
+        else:
+            self.add(window)
+
+    def launch(self, args, cwd=None):
+        """ Opens the recorded windows of this executable whose URL is in 'args' (or one of them, without URLs). """
+        self.launches.append((list(args), cwd))
+        exe = args[0].lower() if args else ""
+        candidates = [t for t in self.templates if t.cmdline and t.cmdline[0].lower() == exe]
+        wanted = [t for t in candidates if t.url and normalize_url(t.url) in args]
+        if not wanted:
+            open_titles = {w.title for w in self.windows.values()}
+            wanted = [t for t in candidates if t.title not in open_titles][:1] or candidates[:1]
+        seen = set()
+        for template in wanted:
+            if template.url in seen: continue
+            seen.add(template.url)
+            self._open_copy(template)
+
+    def open_folder(self, path):
+        self.launches.append((["explorer.exe", path], None))
+        for template in self.templates:
+            if template.folder_path == path:
+                self._open_copy(template)
+                return
+
+    def create_event_source(self):
+        source = MemoryEventSource(self)
+        source.start()
+        return source
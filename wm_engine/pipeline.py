@@ -0,0 +1,91 @@
+import time
+
+class LaunchJob:
+    """ One process launch and the saved windows it is expected to open. """
+
+    def __init__(self, items, spacing=0.2, exclusive=None, depends_on=None):
+        self.items = items
+        self.spacing = spacing # Minimum delay before the NEXT launch
+        self.exclusive = exclusive # Jobs sharing this key never run concurrently (e.g. "Firefox", a browser name)
+        self.depends_on = depends_on or [] # Jobs that must be settled before this one launches
+        self.launched_at = None
+        self.matches = [None] * len(items)
+        self.elapsed = [None] * len(items) # Launch -> placement, per item
+        self.settled = False
+
+    def pending(self):
+        return [i for i, m in enumerate(self.matches) if m is None]
+
+class LaunchScheduler:
+    """
+    Pipelined Phase 2: launches jobs in order (up to 'max_concurrency' waiting at once),
+    matches and places windows as they appear, and gives up on a job 'timeout'
+    seconds after its launch.
+
+    launch(job)          -> starts the process(es)
+    poll(items, wait)    -> blocks at most 'wait' seconds, returns a match (or None) per item
+    place(saved, match)  -> positions a matched window
+    """
+
+    def __init__(self, launch, poll, place, max_concurrency=4, timeout=10, poll_interval=0.2,
+                 clock=time.time, sleep=time.sleep):
+        self.launch = launch
+        self.poll = poll
+        self.place = place
+        self.max_concurrency = max(1, max_concurrency)
+        self.timeout = timeout
+        self.poll_interval = poll_interval
+        self.clock = clock
+        self.sleep = sleep
+
+    def _can_launch(self, job, in_flight, now, next_launch_at):
+        if len(in_flight) >= self.max_concurrency: return False
+        if now < next_launch_at: return False
+        if any(not dep.settled for dep in job.depends_on): return False
+        if job.exclusive and any(other.exclusive == job.exclusive for other in in_flight): return False
+        return True
+
+    def run(self, jobs):
+        """ Runs every job to completion or timeout. Returns the jobs (matches / elapsed filled in). """
+        queue = list(jobs)
+        in_flight = []
+        next_launch_at = self.clock()
+
+        while queue or in_flight:
+            # 1. LAUNCH (strictly in order: a blocked job holds back the ones after it)
+            now = self.clock()
+            while queue and self._can_launch(queue[0], in_flight, now, next_launch_at):
+                job = queue.pop(0)
+                job.launched_at = now
+                self.launch(job)
+                in_flight.append(job)
+                now = self.clock()
+                next_launch_at = now + job.spacing
+
+            if not in_flight:
+                # Waiting on launch spacing only
+                self.sleep(max(0, next_launch_at - now))
+                continue
+
+            # 2. MATCH (one poll for every window still expected)
+            wait = self.poll_interval
+            if queue and next_launch_at > now:
+                wait = min(wait, next_launch_at - now)
+            pending = [(job, i) for job in in_flight for i in job.pending()]
+            matches = self.poll([job.items[i] for job, i in pending], wait)
+
+            # 3. PLACE
+            for (job, i), match in zip(pending, matches):
+                if match is None: continue
+                job.matches[i] = match
+                job.elapsed[i] = self.clock() - job.launched_at
+                self.place(job.items[i], match)
+
+            # 4. SETTLE (complete or timed out)
+            now = self.clock()
+            for job in list(in_flight):
+                if not job.pending() or now - job.launched_at >= self.timeout:
+                    job.settled = True
+                    in_flight.remove(job)
+
+        return jobs
@@ -0,0 +1,77 @@
+from collections import namedtuple
+
+ProcessInfo = namedtuple("ProcessInfo", ["name", "cmdline", "cwd", "create_time"])
+
+class PsutilProcessProvider:
+    """ Real process queries (one psutil round trip per call). """
+
+    def create_time(self, pid):
+        import psutil
+        return psutil.Process(pid).create_time()
+
+    def fetch(self, pid):
+        import psutil
+        proc = psutil.Process(pid)
+        name = proc.name()
+        cmdline = []
+        cwd = ""
+        try:
+            cmdline = proc.cmdline()
+            cwd = proc.cwd()
+        except (psutil.AccessDenied, psutil.NoSuchProcess):
+            pass
+        return ProcessInfo(name, cmdline, cwd, proc.create_time())
+
+class ProcessInfoCache:
+    """
+    name / cmdline / cwd per process, keyed by (pid, create_time) so a reused PID
+    never returns another process's data.
+
+    Call new_generation() once per full scan (it forgets the processes the last
+    generation did not see, so never after a scan of a few HWNDs): within a
+    generation a PID is resolved once; in the next one it is re-validated with a
+    single create_time query and the full fetch only happens for processes not
+    seen before. Note that cwd is therefore the one observed when the process
+    was first seen.
+    """
+
+    def __init__(self, provider=None):
+        self.provider = provider or PsutilProcessProvider()
+        self._entries = {} # (pid, create_time) -> ProcessInfo (or None if unreadable)
+        self._current = {} # pid -> key, validated during this generation
+        self.generation = 0
+        self.hits = 0
+        self.misses = 0
+
+    def new_generation(self):
+        self.generation += 1
+        # Keep only processes still seen during the last generation
+        alive = set(self._current.values())
+        self._entries = {key: info for key, info in self._entries.items() if key in alive}
+        self._current = {}
+
+    def get(self, pid):
+        """ ProcessInfo for 'pid', or None if the process is gone / unreadable. """
+        key = self._current.get(pid)
+        if key is None:
+            try:
+                key = (pid, self.provider.create_time(pid))
+            except Exception:
+                self.misses += 1
+                return None
+            self._current[pid] = key
+
+        if key in self._entries:
+            self.hits += 1
+            return self._entries[key]
+
+        self.misses += 1
+        try:
+            info = self.provider.fetch(pid)
+        except Exception:
+            info = None
+        self._entries[key] = info
+        return info
+
+    def stats(self):
+        return {"hits": self.hits, "misses": self.misses, "processes": len(self._entries)}
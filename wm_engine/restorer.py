@@ -1,60 +1,65 @@
 import time
 import os
-import subprocess
-import win32gui
-import win32con
-from .utils import normalize_url, ensure_rect_on_screen
-from .automation import is_incognito
+from . import winconst
+from .backend import get_backend
+from .utils import normalize_url, ensure_rect_on_screen, layout_tabs
+from .browsers import registry
+from .pipeline import LaunchJob, LaunchScheduler
 from .logger import Logger
+from .tracing import tracer
 
 class WindowRestorer:
-    def __init__(self, settings_manager, scanner, matcher, storage):
+    # Safety net for missed events: full rescan at most this often while waiting.
+    FULL_RESCAN_INTERVAL = 2.0
+    # Browser windows opened by one process launch at most (when the browser allows several)
+    WINDOWS_PER_LAUNCH = 8
+    # Tabs beyond this command line length are not reopened (Windows limit: 32767 characters)
+    MAX_COMMAND_LINE = 32000
+
+    def __init__(self, settings_manager, scanner, matcher, storage, event_source=None, backend=None,
+                 clock=time.time, sleep=time.sleep):
         self.settings = settings_manager
         self.scanner = scanner
         self.matcher = matcher
         self.storage = storage
+        self.backend = backend or getattr(scanner, "backend", None) or get_backend()
+        # Injected source (tests / benchmarks) or native hook created per restore.
+        self.event_source = event_source
+        # Phase 2 time source (launch scheduler and window poller), simulated in devtools/check_restore.py
+        self.clock = clock
+        self.sleep = sleep
+
+    def _window_urls(self, saved, browser):
+        """ URLs to reopen a saved browser window with: every saved tab, in order, within the command line limit. """
+        urls = [normalize_url(url) for url in layout_tabs(saved)] or [browser.new_tab_urls[0] if browser else "about:newtab"]
+        length = 0
+        for count, url in enumerate(urls):
+            length += len(url) + 3 # Separator and quotes
+            if length > self.MAX_COMMAND_LINE:
+                Logger.warn(f"{len(urls) - count} onglet(s) non rouverts (ligne de commande trop longue): {saved.get('exact_title', '???')[:40]}")
+                return urls[:max(count, 1)]
+        return urls
 
     def _launch_browser_group(self, exe_path, is_incognito, items):
+        """ Opens the saved browser windows 'items' (each with all its tabs) with one process launch. """
         if not items: return
         try:
             cwd = items[0].get("cwd")
-            urls = []
-            for item in items:
-                u = normalize_url(item.get("url"))
-                if not u: u = "about:newtab"
-                urls.append(u)
+            browser = registry.profile_for_exe(exe_path)
+            windows = [self._window_urls(item, browser) for item in items]
             
             exe_name = os.path.basename(exe_path).lower()
-            is_firefox = "firefox" in exe_name
-            is_chrome = "chrome" in exe_name
-            is_edge = "msedge" in exe_name
-
-            args = [exe_path]
-            
-            if is_firefox:
-                if is_incognito:
-                    # Firefox Private: Specific flags
-                    args.append("-private-window")
-                    # Note: We rely on the URL being appended next.
-                    # Firefox handling: "firefox -private-window URL" opens that URL in private.
-                else:
-                    # Firefox Normal: Force new window
-                    args.append("-new-window")
-                args.extend(urls)
-            elif is_chrome or is_edge:
-                if is_incognito:
-                    if is_chrome: args.append("--incognito")
-                    if is_edge: args.append("-inprivate")
-                args.append("--new-window")
-                args.extend(urls)
+            if browser:
+                args = browser.batch_launch_args(exe_path, windows, is_incognito)
             else:
-                args.extend(urls)
+                args = [exe_path] + [url for urls in windows for url in urls]
 
-            msg = f"Lancement Groupe ({len(urls)} onglets)"
+            tabs = sum(len(urls) for urls in windows)
+            msg = f"Lancement Groupe ({tabs} onglets)" if len(windows) == 1 else f"Lancement Groupe ({len(windows)} fenêtres, {tabs} onglets)"
             if is_incognito: msg += " [MODE PRIVÉ]"
             
             with Logger.step(f"{msg}: {exe_name}", private=is_incognito):
-                subprocess.Popen(args, cwd=cwd)
+                self.backend.launch(args, cwd=cwd)
 
         except Exception as e:
             Logger.error(f"Group Launch failed: {e}")
@@ -62,15 +67,14 @@ class WindowRestorer:
     def _launch_app(self, saved):
         cmdline = saved.get("cmdline")
         cwd = saved.get("cwd")
-        url = saved.get("url")
         folder = saved.get("folder_path")
         key = saved["title_pattern"]
         
         try:
             if folder:
                 Logger.info(f"Ouverture dossier: {folder}")
-                os.startfile(folder)
-            elif ("Chrome" in key or "Firefox" in key or "Edge" in key):
+                self.backend.open_folder(folder)
+            elif registry.is_browser_title(key):
                 browser_exe = None
                 if cmdline:
                     for arg in cmdline:
@@ -78,58 +82,46 @@ class WindowRestorer:
                             browser_exe = arg
                             break
                 if browser_exe:
-                    if url: url = normalize_url(url)
-                    args = [browser_exe]
-                    
-                    is_firefox = "firefox" in browser_exe.lower()
+                    urls = [normalize_url(u) for u in layout_tabs(saved)]
                     is_incognito = saved.get("is_incognito", False)
-
-                    if is_incognito:
-                        if "chrome" in browser_exe.lower():
-                            args.append("--incognito")
-                        elif "msedge" in browser_exe.lower():
-                            args.append("-inprivate")
-                        elif is_firefox:
-                            args.append("-private-window")
-                            if url:
-                                args.append(url)
-                                url = None # Consumed
-
-                    if url:
-                        if is_firefox: args.append("-new-window")
-                        else: args.append("--new-window")
-                        args.append(url)
-                    elif not is_incognito:
-                         if is_firefox: args.append("-new-window")
-                         else: args.append("--new-window")
+                    # New (private) window flags come from the browser's profile (browsers.py)
+                    browser = registry.profile_for_exe(browser_exe)
+                    args = browser.launch_args(browser_exe, urls, is_incognito) if browser else [browser_exe] + urls
 
                     Logger.debug(f"Args: {args}")
                     with Logger.step(f"Lancement Browser: {os.path.basename(browser_exe)}", private=is_incognito):
-                        subprocess.Popen(args, cwd=cwd)
+                        self.backend.launch(args, cwd=cwd)
             elif cmdline:
                 with Logger.step(f"Lancement Cmd: {cmdline[0]}"):
-                    subprocess.Popen(cmdline, cwd=cwd)
+                    self.backend.launch(cmdline, cwd=cwd)
         except Exception as e:
             Logger.error(f"Launch failed: {e}")
 
+    def _monitors(self):
+        try:
+            return self.backend.monitors()
+        except Exception as e:
+            Logger.debug(f"Monitor list unavailable: {e}")
+            return None
+
     def _apply_window_placement(self, saved, current):
         hwnd = current["hwnd"]
         saved_rect = saved["rect"]
-        saved_rect = ensure_rect_on_screen(saved_rect)
-        show_cmd = saved.get("show_cmd", win32con.SW_SHOWNORMAL)
+        saved_rect = ensure_rect_on_screen(saved_rect, self._monitors())
+        show_cmd = saved.get("show_cmd", winconst.SW_SHOWNORMAL)
         
         try:
-            was_minimized = win32gui.IsIconic(hwnd)
+            was_minimized = self.backend.is_iconic(hwnd)
             was_peaked = current.get("was_peaked", False)
             restore_minimized_setting = self.settings.get("restore_minimized", True)
 
             # --- 1. HANDLING MINIMIZED STATE ---
             # If it should be minimized (saved as such OR setting override), just ensure it is.
-            if (show_cmd in [win32con.SW_SHOWMINIMIZED, win32con.SW_MINIMIZE]) or \
+            if (show_cmd in [winconst.SW_SHOWMINIMIZED, winconst.SW_MINIMIZE]) or \
                (was_minimized and not restore_minimized_setting):
                 
                 if not was_minimized:
-                    win32gui.ShowWindow(hwnd, win32con.SW_MINIMIZE)
+                    self.backend.show_window(hwnd, winconst.SW_MINIMIZE)
                 else:
                     Logger.debug("Reste minimisée (Config).")
                 return # Done
@@ -138,9 +130,9 @@ class WindowRestorer:
             # If we are here, the window needs to be Visible (Normal or Maximized).
             
             # Step A: Pre-seat the "Restore" position internally.
-            placement = (0, win32con.SW_SHOWNORMAL, (-1, -1), (-1, -1), tuple(saved_rect))
+            placement = (0, winconst.SW_SHOWNORMAL, (-1, -1), (-1, -1), tuple(saved_rect))
             try:
-                win32gui.SetWindowPlacement(hwnd, placement)
+                self.backend.set_window_placement(hwnd, placement)
             except: pass
 
             # Step B: Wake up (Un-Minimize)
@@ -148,20 +140,20 @@ class WindowRestorer:
             # we should give it a 'Restore' kick to ensure it's responsive to moves.
             if was_minimized or was_peaked:
                 # Logger.debug("Réveil de la fenêtre...")
-                win32gui.ShowWindow(hwnd, win32con.SW_RESTORE)
+                self.backend.show_window(hwnd, winconst.SW_RESTORE)
                 time.sleep(0.2) 
 
             # Step C: Unlock from Maximized state
-            current_show = win32gui.GetWindowPlacement(hwnd)[1]
-            if current_show == win32con.SW_SHOWMAXIMIZED and show_cmd != win32con.SW_SHOWMAXIMIZED:
-                 win32gui.ShowWindow(hwnd, win32con.SW_RESTORE)
+            current_show = self.backend.get_window_placement(hwnd)[1]
+            if current_show == winconst.SW_SHOWMAXIMIZED and show_cmd != winconst.SW_SHOWMAXIMIZED:
+                 self.backend.show_window(hwnd, winconst.SW_RESTORE)
                  time.sleep(0.1)
 
             # --- 3. APPLYING POSITION (ESCALATING RETRY) ---
             # Firefox Private is stubborn. We iterate 5 times.
             # If it fails twice, we force SW_RESTORE again to wake it up.
             
-            if show_cmd != win32con.SW_SHOWMAXIMIZED:
+            if show_cmd != winconst.SW_SHOWMAXIMIZED:
                 x, y, r, b = saved_rect
                 w = r - x
                 h = b - y
@@ -169,14 +161,14 @@ class WindowRestorer:
                 success = False
                 for attempt in range(5):
                     # flags: SWP_SHOWWINDOW is important to force visibility update
-                    flags = win32con.SWP_NOZORDER | win32con.SWP_NOACTIVATE | win32con.SWP_SHOWWINDOW
-                    win32gui.SetWindowPos(hwnd, 0, x, y, w, h, flags)
+                    flags = winconst.SWP_NOZORDER | winconst.SWP_NOACTIVATE | winconst.SWP_SHOWWINDOW
+                    self.backend.set_window_pos(hwnd, x, y, w, h, flags)
                     
                     time.sleep(0.1)
                     
                     # Verification
                     try:
-                        curr = win32gui.GetWindowRect(hwnd)
+                        curr = self.backend.get_window_rect(hwnd)
                         if all(abs(curr[i] - saved_rect[i]) < 20 for i in range(4)):
                             if attempt > 0: Logger.debug(f"[RETRY] Correction réussie (Essai {attempt+1})")
                             success = True
@@ -187,7 +179,7 @@ class WindowRestorer:
                                   # If checking failed twice, maybe window is stuck in a weird state?
                                   # Force Restore + Frame Changed
                                   Logger.debug(f"[ESCALATE] Windows resiste. Force Restore...")
-                                  win32gui.ShowWindow(hwnd, win32con.SW_RESTORE)
+                                  self.backend.show_window(hwnd, winconst.SW_RESTORE)
                                   time.sleep(0.2)
                     except:
                         pass
@@ -197,46 +189,140 @@ class WindowRestorer:
                     Logger.warn(f"Échec positionnement: {saved.get('exact_title', '???')}")
 
             # --- 4. FINAL STATE ---
-            if show_cmd == win32con.SW_SHOWMAXIMIZED:
-                 if current_show != win32con.SW_SHOWMAXIMIZED:
-                     win32gui.ShowWindow(hwnd, win32con.SW_SHOWMAXIMIZED)
+            if show_cmd == winconst.SW_SHOWMAXIMIZED:
+                 if current_show != winconst.SW_SHOWMAXIMIZED:
+                     self.backend.show_window(hwnd, winconst.SW_SHOWMAXIMIZED)
             else:
-                 win32gui.UpdateWindow(hwnd)
+                 self.backend.update_window(hwnd)
             
             # --- 5. FORCE REPAINT (Fix for Blank Windows) ---
             # Some apps (Tkinter, defaults) fail to repaint contents if un-minimized programmatically.
             # Force a full invalidation and repaint.
-            win32gui.RedrawWindow(hwnd, None, None, win32con.RDW_ERASE | win32con.RDW_INVALIDATE | win32con.RDW_UPDATENOW | win32con.RDW_ALLCHILDREN)
+            self.backend.redraw_window(hwnd, winconst.RDW_ERASE | winconst.RDW_INVALIDATE | winconst.RDW_UPDATENOW | winconst.RDW_ALLCHILDREN)
 
             # --- 6. ATOMIC RESIZE JIGGLE (Ultimate Fix) ---
             # If Redraw is not enough, we change the size by 1px then revert.
             # This forces the internal Layout Manager of the target app to re-run.
-            if show_cmd != win32con.SW_SHOWMAXIMIZED: 
+            if show_cmd != winconst.SW_SHOWMAXIMIZED: 
                 x, y, r, b = saved_rect
                 w = r - x
                 h = b - y
                 
                 # Jiggle
-                win32gui.SetWindowPos(hwnd, 0, x, y, w+1, h, win32con.SWP_NOZORDER | win32con.SWP_NOACTIVATE)
+                self.backend.set_window_pos(hwnd, x, y, w+1, h, winconst.SWP_NOZORDER | winconst.SWP_NOACTIVATE)
                 time.sleep(0.02)
-                win32gui.SetWindowPos(hwnd, 0, x, y, w, h, win32con.SWP_NOZORDER | win32con.SWP_NOACTIVATE)
+                self.backend.set_window_pos(hwnd, x, y, w, h, winconst.SWP_NOZORDER | winconst.SWP_NOACTIVATE)
 
         except Exception as e:
             Logger.error(f"Erreur placement {hwnd}: {e}")
 
-    def _wait_for_window(self, saved, used_hwnds, timeout=5, overrides=None):
-        start_time = time.time()
-        is_browser = any(b in saved.get('title_pattern', '').lower() for b in ["chrome", "firefox", "edge"])
+    def _window_poller(self, used_hwnds, overrides=None, events=None):
+        """
+        Returns poll(items, wait) -> one match (or None) per saved item.
+        Full detailed scan on the first call (and every FULL_RESCAN_INTERVAL as a
+        safety net); in between, only the windows reported by 'events' are scanned.
+        Without an event source, every call sleeps 'wait' then rescans everything.
+        """
+        state = {"last_full_scan": None}
+
+        def poll(items, wait):
+            now = self.clock()
+            if events is None or state["last_full_scan"] is None or now - state["last_full_scan"] >= self.FULL_RESCAN_INTERVAL:
+                if events is None and state["last_full_scan"] is not None:
+                    with tracer.span("wait", "wait"):
+                        self.sleep(wait) # Optimized polling (was 1.0s)
+                # Always detailed_scan to ensure we capture Explorer paths and Browser URLs for accurate matching
+                current_windows = self.scanner.get_target_windows(detailed_scan=True, overrides=overrides)
+                state["last_full_scan"] = self.clock()
+                tracer.count("full_scans")
+            else:
+                with tracer.span("wait", "wait"):
+                    hwnds = events.wait(wait)
+                tracer.count("poll_iterations")
+                if not hwnds:
+                    return [None] * len(items)
+                current_windows = self.scanner.get_windows(hwnds, detailed_scan=True, overrides=overrides)
+                tracer.count("event_scans")
+            with tracer.span("match", "match", items=len(items)):
+                return self.matcher.match_all(items, current_windows, used_hwnds)
+
+        return poll
+
+    def _launch_groups(self, items):
+        """
+        Splits browser items into launches, in order: windows the browser can open
+        together (same executable and mode, see BrowserProfile.can_share_launch)
+        share one, up to WINDOWS_PER_LAUNCH; every other window gets its own.
+        """
+        groups = []
+        open_groups = {}
+        for item in items:
+            exe = item["cmdline"][0]
+            private = item.get("is_incognito", False)
+            browser = registry.profile_for_exe(exe)
+            if not browser.can_share_launch(layout_tabs(item), private):
+                groups.append([item])
+                continue
+            key = (exe.lower(), private)
+            group = open_groups.get(key)
+            if group is None or len(group) >= self.WINDOWS_PER_LAUNCH:
+                group = open_groups[key] = []
+                groups.append(group)
+            group.append(item)
+        return groups
+
+    def _launch_jobs(self, items):
+        """ Phase 2 launch jobs for the missing saved windows 'items', in launch order. """
+        # 1. SORTING STRATEGY
+        # Order: Apps -> Normal Browsers -> Private Chrome -> Private Firefox (LAST)
+        # This avoids Firefox IPC locks and ensures stable Z-Order.
+        # ("Firefox" = any browser whose profile asks for serial_launch, see browsers.py)
         
-        while time.time() - start_time < timeout:
-            # Always detailed_scan to ensure we capture Explorer paths and Browser URLs for accurate matching
-            current_windows = self.scanner.get_target_windows(detailed_scan=True, overrides=overrides)
-            # Re-find match logic uses the matcher
-            match = self.matcher.find_match(saved, current_windows, used_hwnds)
-            if match:
-                return match
-            time.sleep(0.2) # Optimized polling (was 1.0s)
-        return None
+        normal_browsers = []
+        private_chrome = []
+        private_firefox = []
+        apps = []
+
+        for item in items:
+            cmdline = item.get("cmdline", [])
+            browser = registry.profile_for_exe(cmdline[0] if cmdline else None)
+            is_priv = item.get("is_incognito", False)
+
+            if browser is not None:
+                if is_priv:
+                    if browser.serial_launch: private_firefox.append(item)
+                    else: private_chrome.append(item)
+                else:
+                    normal_browsers.append(item)
+            else:
+                apps.append(item)
+
+        # 2. DEPENDENCIES
+        # Launches keep the order Apps -> Normal Browsers -> Private Chrome -> Private Firefox
+        # (stable Z-Order), Firefox is never launched while another Firefox launch is pending,
+        # and Private Firefox still waits for everything else to settle (IPC locks).
+        # Each browser job opens one window with all its tabs, or several windows at once (_launch_groups).
+        jobs = [LaunchJob([item], spacing=0.2) for item in apps]
+        for group in self._launch_groups(normal_browsers + private_chrome):
+            browser = registry.profile_for_exe(group[0]["cmdline"][0])
+            serial = browser.name if browser.serial_launch else None
+            jobs.append(LaunchJob(group, spacing=1.0 if serial else 0.5, exclusive=serial))
+        earlier_jobs = list(jobs)
+        for group in self._launch_groups(private_firefox):
+            browser = registry.profile_for_exe(group[0]["cmdline"][0])
+            jobs.append(LaunchJob(group, spacing=1.0, exclusive=browser.name, depends_on=earlier_jobs))
+        return jobs
+
+    def _launch_job(self, job):
+        first = job.items[0]
+        cmdline = first.get("cmdline")
+        exe = cmdline[0].lower() if cmdline else ""
+        tracer.count("launches")
+        with tracer.span("launch", "launch", window=first.get("exact_title"), private=first.get("is_incognito", False)):
+            if registry.profile_for_exe(exe) is not None:
+                self._launch_browser_group(exe, first.get("is_incognito", False), job.items)
+            else:
+                self._launch_app(first)
 
     def restore_layout(self, scenario_name):
         self.scanner.clear_cache()
@@ -270,8 +356,8 @@ class WindowRestorer:
             # If list is Top->Bottom, we should restore Bottom->Top (Reverse).
             # Let's keep existing logic as user said "working perfectly".
             
-            non_minimized_items = [w for w in saved_windows if w['show_cmd'] != win32con.SW_SHOWMINIMIZED]
-            minimized_items = [w for w in saved_windows if w['show_cmd'] == win32con.SW_SHOWMINIMIZED]
+            non_minimized_items = [w for w in saved_windows if w['show_cmd'] != winconst.SW_SHOWMINIMIZED]
+            minimized_items = [w for w in saved_windows if w['show_cmd'] == winconst.SW_SHOWMINIMIZED]
             
             # Restore Minimized Last? Or First?
             # Existing logic separates them.
@@ -283,89 +369,68 @@ class WindowRestorer:
             # --- PHASE 1: IMMEDIATE PLACEMENT (EXISTING WINDOWS) ---
             Logger.info("PHASE 1: Scan & Placement (Fenêtres existantes)...")
             
-            # Detailed Scan with Peeking enabled
-            current_windows = self.scanner.get_target_windows(detailed_scan=True, allow_peeking=True, overrides=local_settings)
-            used_hwnds = set()
+            with tracer.span("phase 1", "phase", items=len(pending_items)):
+                # Detailed Scan with Peeking enabled
+                current_windows = self.scanner.get_target_windows(detailed_scan=True, allow_peeking=True, overrides=local_settings)
+                used_hwnds = set()
             
-            still_missing = []
+                still_missing = []
             
-            for saved in pending_items:
-                match = self.matcher.find_match(saved, current_windows, used_hwnds)
-                if match:
-                    used_hwnds.add(match["hwnd"])
-                    label = f"Placement immédiat: {saved['exact_title'][:40]}..."
-                    with Logger.step(label, private=saved.get('is_incognito')):
-                        self._apply_window_placement(saved, match)
-                else:
-                    still_missing.append(saved)
+                # Global assignment: an early item can no longer steal the window a later item needed.
+                with tracer.span("match", "match", items=len(pending_items)):
+                    matches = self.matcher.match_all(pending_items, current_windows, used_hwnds)
+            
+                for saved, match in zip(pending_items, matches):
+                    if match:
+                        used_hwnds.add(match["hwnd"])
+                        label = f"Placement immédiat: {saved['exact_title'][:40]}..."
+                        with Logger.step(label, private=saved.get('is_incognito')), \
+                                tracer.span("place", "placement", window=saved.get("exact_title"), private=saved.get("is_incognito", False)):
+                            self._apply_window_placement(saved, match)
+                    else:
+                        still_missing.append(saved)
             
             if not still_missing:
                 Logger.success("Toutes les fenêtres sont déjà là !")
                 self._cleanup_peaked_windows(current_windows, used_hwnds)
                 return True
 
-            # --- PHASE 2: SEQUENTIAL CONSTRUCTION (MISSING WINDOWS) ---
-            Logger.info(f"PHASE 2: Lancement Séquentiel ({len(still_missing)} manquants)...")
+            # --- PHASE 2: PIPELINED CONSTRUCTION (MISSING WINDOWS) ---
+            concurrency = local_settings.get("launch_concurrency", self.settings.get("launch_concurrency", 4))
+            Logger.info(f"PHASE 2: Lancement Parallèle ({len(still_missing)} manquants, {concurrency} simultanés)...")
 
-            # 1. SORTING STRATEGY
-            # Order: Apps -> Normal Browsers -> Private Chrome -> Private Firefox (LAST)
-            # This avoids Firefox IPC locks and ensures stable Z-Order.
-            
-            normal_browsers = []
-            private_chrome = []
-            private_firefox = []
-            apps = []
-
-            for item in still_missing:
-                cmdline = item.get("cmdline", [])
-                exe = cmdline[0].lower() if cmdline else ""
-                is_browser = any(b in exe for b in ["chrome", "firefox", "msedge"])
-                is_priv = item.get("is_incognito", False)
-
-                if is_browser:
-                    if is_priv:
-                        if "firefox" in exe: private_firefox.append(item)
-                        else: private_chrome.append(item)
-                    else:
-                        normal_browsers.append(item)
-                else:
-                    apps.append(item)
+            jobs = self._launch_jobs(still_missing)
 
-            # Execution Order
-            sequence = apps + normal_browsers + private_chrome + private_firefox
-            
-            for i, saved in enumerate(sequence):
-                title = saved.get('exact_title', 'Inconnu')
-                
-                # A. LAUNCH
-                cmdline = saved.get("cmdline")
-                exe = cmdline[0].lower() if cmdline else ""
-                is_browser = any(b in exe for b in ["chrome", "firefox", "msedge"])
-                is_priv = saved.get("is_incognito", False)
-
-                if is_browser:
-                    # Launch single browser window
-                    self._launch_browser_group(exe, is_priv, [saved])
-                else:
-                    self._launch_app(saved)
-                
-                # B. WAIT & PLACE (Immédiately)
-                # Give it a moment to appear
-                match = self._wait_for_window(saved, used_hwnds, timeout=10, overrides=local_settings)
-                
-                if match:
-                    used_hwnds.add(match["hwnd"])
-                    # Immediate Placement
-                    with Logger.step(f"Placement: {title[:30]}...", private=is_priv):
-                        self._apply_window_placement(saved, match)
-                else:
-                    Logger.warn(f"Échec lancement/détection: {title}")
+            def place(saved, match):
+                used_hwnds.add(match["hwnd"])
+                with Logger.step(f"Placement: {saved.get('exact_title', 'Inconnu')[:30]}...", private=saved.get("is_incognito", False)), \
+                        tracer.span("place", "placement", window=saved.get("exact_title"), private=saved.get("is_incognito", False)):
+                    self._apply_window_placement(saved, match)
 
-                # Intelligent Delay between launches
-                if is_browser:
-                    time.sleep(1.0 if "firefox" in exe else 0.5)
-                else:
-                    time.sleep(0.2)
+            # Listen for new windows BEFORE the first launch so no creation is missed.
+            events = self.event_source
+            if events is None:
+                events = self.backend.create_event_source()
+            else:
+                events.start()
+            
+            try:
+                scheduler = LaunchScheduler(self._launch_job, self._window_poller(used_hwnds, local_settings, events), place,
+                                            max_concurrency=concurrency, timeout=10, clock=self.clock, sleep=self.sleep)
+                with tracer.span("phase 2", "phase", missing=len(still_missing)):
+                    scheduler.run(jobs)
+            finally:
+                if events:
+                    events.stop()
+
+            # 3. REPORT (time from launch to placement, per window)
+            for job in jobs:
+                for saved, match, elapsed in zip(job.items, job.matches, job.elapsed):
+                    title = saved.get('exact_title', 'Inconnu')
+                    if match:
+                        Logger.info(f"Prête en {elapsed:.2f}s : {title[:40]}", private=saved.get("is_incognito", False))
+                    else:
+                        Logger.warn(f"Échec lancement/détection: {title}")
 
             # --- FINAL CLEANUP ---
             # Re-minimize windows that were peaked but not used
@@ -1,338 +1,556 @@
-import win32gui
-import win32con
-import win32process
-import psutil
+import copy
 import time
-from ctypes import windll, byref, c_int, sizeof
+import threading
+from functools import partial
 
-from . import automation
+from . import winconst
+from .backend import get_backend
 from .logger import Logger
+from .snapshot import ScanSnapshot, SnapshotDiff
+from .processes import ProcessInfoCache
+from .extraction import ExtractionPool
+from .filters import WindowFilter
+from .browsers import registry
+from .sessions import correlate
+from .tracing import tracer
 
 class WindowScanner:
-    def __init__(self, settings_manager):
+    EXPLORER_PREFETCH_TIMEOUT = 2.0 # Seconds before the bulk Shell.Application query is abandoned
+    EXTRACTION_WORKERS = 4
+    EXTRACTION_TIMEOUT = 3.0 # Per window: URL / incognito results later than this are reported unknown
+
+    def __init__(self, settings_manager, extractor=None, extraction_pool=None, detail_cache=None, backend=None):
         self.settings = settings_manager
+        self.backend = backend or get_backend()
         self._cache = {} # Cache for expensive operations (URL, Incognito)
+        self._cache_lock = threading.Lock() # Extraction workers write their results here
+        self.extractor = extractor or self.backend.extractor() # extract_url(hwnd) / is_incognito(hwnd, title)
+        self.extraction = extraction_pool or ExtractionPool(self.EXTRACTION_WORKERS, self.EXTRACTION_TIMEOUT,
+                                                            self.backend.init_thread, self.backend.uninit_thread)
+        self.detail_cache = detail_cache # Optional DetailCache: results that survive clear_cache()
+        self._identities = {} # hwnd -> (title, process create_time), as seen by the last inspection
+        self._filter_cache = None # (settings version, overrides, WindowFilter)
+        self.snapshot = None # Last full scan, reused for windows that did not change
+        self.snapshot_level = None
+        self.last_diff = SnapshotDiff()
+        self.processes = ProcessInfoCache(self.backend.process_provider()) # name/cmdline/cwd per process, shared by its windows
+        self._explorer_prefetch = None
+        self.explorer_stats = {}
 
     def clear_cache(self):
         """ Clears the internal cache. Call this before a new global operation. """
-        self._cache = {}
+        with self._cache_lock:
+            self._cache = {}
+        self._identities = {}
+        self.snapshot = None
+        self.snapshot_level = None
+        self.last_diff = SnapshotDiff()
+
+    def _get_setting(self, key, default=None, overrides=None):
+        if overrides and key in overrides: return overrides[key]
+        return self.settings.get(key, default)
 
     def _is_window_allowed(self, title, class_name=None, exe=None, is_explorer=False, overrides=None):
         """ Centralized Logic for Filtering Windows """
+        return self._window_filter(overrides).allowed(title, class_name, exe, is_explorer)
+
+    def _window_filter(self, overrides=None):
+        """ Filter rules compiled for the current settings version and these overrides (reused until either changes). """
+        version = getattr(self.settings, "version", None)
+        cached = self._filter_cache
+        if cached and cached[0] == version and cached[1] == (overrides or {}):
+            return cached[2]
+        window_filter = WindowFilter.from_settings(lambda key, default=None: self._get_setting(key, default, overrides))
+        self._filter_cache = (version, copy.deepcopy(overrides or {}), window_filter)
+        return window_filter
+
+    def get_target_windows(self, detailed_scan=False, allow_peeking=True, overrides=None):
+        with tracer.span("scan", "scan", detailed=detailed_scan):
+            windows = []
         
-        # Use overrides if provided, else fall back to global settings
-        def get_setting(key, default=None):
-            if overrides and key in overrides: return overrides[key]
-            return self.settings.get(key, default)
-
-        # 1. Title Based Exclusions
-        exclude_list = get_setting("exclude_titles", [])
-        for ex in exclude_list:
-            if ex == "Window Manager":
-                if title == "Window Manager": return False
-            elif ex.lower() in title.lower():
-                return False
-
-        if (":\\" in title and title.lower().endswith(".exe")) or title.lower().endswith(".exe"):
-            return False
-
-        if title == "Taskbar" or title == "Mise en veille": return False
-
-        # 2. Class Based Exclusions
-        if class_name:
-            if class_name in ["Windows.UI.Core.CoreWindow", "ApplicationFrameWindow", "Shell_TrayWnd"]: 
-                if class_name == "Shell_TrayWnd": return False
+            # A snapshot only stands in for a scan made with the same options.
+            level = (detailed_scan, allow_peeking, self._get_setting("precise_urls", True, overrides))
+            previous = self.snapshot if self.snapshot is not None and self.snapshot_level == level else None
+            self.processes.new_generation()
         
-        # 3. Settings Based Exclusions
-        is_chrome = "Google Chrome" in title or (exe and "chrome.exe" in exe)
-        is_firefox = "Mozilla Firefox" in title or (exe and "firefox.exe" in exe)
+            # Batch Pre-fetch Explorer Paths to avoid O(N*M) COM overhead.
+            # Runs in the background while we enumerate; misses fall back to UIA per window.
+            explorer_prefetch = None
+            if detailed_scan:
+                self.explorer_stats = {"cache": 0, "prefetch": 0, "com": 0, "uia": 0, "unresolved": 0}
+                explorer_prefetch = self._start_explorer_prefetch()
+
+            # Stage 1: enumeration and cheap attributes only
+            pending = []
+            for hwnd in self.backend.enum_windows():
+                window = self._inspect_window(hwnd, detailed_scan, allow_peeking, overrides, explorer_prefetch, previous, pending)
+                if window:
+                    windows.append(window)
+
+            # Stage 2: URL / incognito, concurrently
+            self._complete_details(pending, allow_peeking, overrides)
+            if detailed_scan and self._detail_cache_enabled(overrides):
+                self._store_details(windows)
+            Logger.debug(f"SCAN: Process cache {self.processes.stats()}")
+            if detailed_scan:
+                if explorer_prefetch and explorer_prefetch.timed_out:
+                    Logger.warn(f"Pré-chargement Explorer abandonné (> {self.EXPLORER_PREFETCH_TIMEOUT}s)")
+                Logger.debug(f"SCAN: Explorer paths {self.explorer_stats}")
+
+            snapshot = ScanSnapshot(windows)
+            self.last_diff = (previous or ScanSnapshot()).diff(snapshot)
+            self.snapshot = snapshot
+            self.snapshot_level = level
+            return windows
+
+    def get_windows(self, hwnds, detailed_scan=False, allow_peeking=True, overrides=None):
+        """ Same as get_target_windows, restricted to the given HWNDs (e.g. freshly created windows). """
+        with tracer.span("scan", "scan", detailed=detailed_scan):
+            windows = []
+            level = (detailed_scan, allow_peeking, self._get_setting("precise_urls", True, overrides))
+            previous = self.snapshot if self.snapshot is not None and self.snapshot_level == level else None
+            # No new process generation: pruning is only right after a full enumeration,
+            # a partial scan adds the new windows' processes to the current one.
+            pending = []
+            for hwnd in hwnds:
+                try:
+                    window = self._inspect_window(hwnd, detailed_scan, allow_peeking, overrides, None, previous, pending)
+                except Exception:
+                    continue # Window destroyed while we were looking at it
+                if window:
+                    windows.append(window)
+            self._complete_details(pending, allow_peeking, overrides)
+            return windows
+
+    def _complete_details(self, windows, allow_peeking, overrides=None):
+        """
+        Slow stage: URL / incognito for the windows collected by _inspect_window.
+        Cached windows and browser windows found in their session file are completed
+        inline, the others go through the extraction pool; a window whose extraction
+        misses its deadline keeps url=None, gets a title-only incognito check and is
+        flagged 'details_unknown'.
+        """
+        use_precise = self._get_setting("precise_urls", True, overrides)
+        from_sessions = self._session_details(windows, use_precise, overrides)
+        jobs = []
+        for window in windows:
+            if window["hwnd"] in from_sessions:
+                self._apply_details(window, from_sessions[window["hwnd"]])
+                continue
+            job = partial(self._extract_details, window["hwnd"], window["title"], window["cmdline"], allow_peeking, use_precise)
+            if self._needs_extraction(window["hwnd"], window["title"], use_precise):
+                jobs.append((window["hwnd"], job))
+            else:
+                self._apply_details(window, job())
+
+        if not jobs: return
+        t0 = time.time()
+        with tracer.span("extraction", "extraction", windows=len(jobs)) as span:
+            # Workers record their spans under this one
+            results = self.extraction.run([(hwnd, partial(tracer.run_in, span, job)) for hwnd, job in jobs])
+        tracer.count("extraction_jobs", len(jobs))
+        tracer.count("extraction_timeouts", len(jobs) - len(results))
+        submitted = {hwnd for hwnd, _ in jobs}
+        for window in windows:
+            hwnd = window["hwnd"]
+            if hwnd in results:
+                self._apply_details(window, results[hwnd])
+            elif hwnd in submitted:
+                window["url"] = None
+                window["is_incognito"] = self.extractor.is_incognito(None, window["title"])
+                window["details_unknown"] = True
+        if self.extraction.abandoned:
+            Logger.warn(f"Analyse URL/Incognito : {self.extraction.abandoned} fenêtre(s) sans réponse (> {self.extraction.timeout}s)")
+        Logger.debug(f"SCAN: Extraction of {len(jobs)} window(s) in {time.time() - t0:.2f}s")
+
+    def _session_details(self, windows, use_precise, overrides=None):
+        """
+        URL, tabs and incognito of the browser windows their browser's session file
+        describes, matched by title (sessions.correlate): no UI Automation and no
+        peeking at minimized windows. Returns {hwnd: (url, is_incognito, was_peaked)}
+        for the windows that still needed extraction or their tab list; results are
+        cached like extracted ones.
+        """
+        if not use_precise or not self._get_setting("session_files", True, overrides): return {}
+        by_browser = {}
+        for window in windows:
+            browser = registry.profile_for_exe(window["cmdline"][0] if window["cmdline"] else window.get("exe_name"))
+            if browser is not None and browser.session_format:
+                by_browser.setdefault(browser, []).append(window)
+        wanted = [w for group in by_browser.values() for w in group
+                  if (self._needs_extraction(w["hwnd"], w["title"], use_precise) or "tabs" not in self._cache.get(w["hwnd"], {}))
+                  and not registry.is_private_title(w["title"])]
+        if not wanted: return {}
+
+        details = {}
+        with tracer.span("sessions", "extraction", browsers=len(by_browser)):
+            wanted_hwnds = {w["hwnd"] for w in wanted}
+            for browser, group in by_browser.items():
+                try:
+                    session_windows = self.backend.browser_sessions(browser)
+                except Exception as e:
+                    Logger.debug(f"SCAN: {browser.name} session unreadable: {e}")
+                    continue
+                # Every window of the browser takes part, so duplicate titles are seen as ambiguous
+                matches = correlate(session_windows, [(w["hwnd"], registry.clean_title(w["title"])) for w in group])
+                for hwnd, session in matches.items():
+                    if hwnd not in wanted_hwnds: continue
+                    url = session.active_tab.url or None
+                    with self._cache_lock:
+                        entry = self._cache.setdefault(hwnd, {})
+                        entry["url"] = url
+                        entry["is_incognito"] = session.private
+                        kept = [i for i, tab in enumerate(session.tabs) if tab.url]
+                        entry["tabs"] = [session.tabs[i].url for i in kept]
+                        entry["active_tab"] = kept.index(session.active) if session.active in kept else 0
+                    details[hwnd] = (url, session.private, False)
+            with self._cache_lock:
+                for hwnd in wanted_hwnds.difference(details):
+                    self._cache.setdefault(hwnd, {})["tabs"] = None # Not in the session file: not looked up again
+        tracer.count("session_hits", len(details))
+        Logger.debug(f"SCAN: Session files answered {len(details)}/{len(wanted)} browser window(s)")
+        return details
+
+    def _apply_details(self, window, details):
+        url, is_incognito, was_peaked = details
+        window["url"] = url
+        window["is_incognito"] = is_incognito
+        cached_data = self._cache.get(window["hwnd"]) or {}
+        window["tabs"] = cached_data.get("tabs")
+        window["active_tab"] = cached_data.get("active_tab", 0)
+        window["was_peaked"] = window["was_peaked"] or was_peaked
+        window["is_minimized"] = self.backend.is_iconic(window["hwnd"])
+
+    @staticmethod
+    def _is_browser_title(title):
+        return registry.is_browser_title(title)
+
+    def _needs_extraction(self, hwnd, title, use_precise):
+        """ False when the cache already answers everything _extract_details would compute. """
+        cached_data = self._cache.get(hwnd) or {}
+        if "is_incognito" not in cached_data: return True
+        return use_precise and self._is_browser_title(title) and "url" not in cached_data
+
+    def _detail_cache_enabled(self, overrides=None):
+        return self.detail_cache is not None and self._get_setting("detail_cache", True, overrides)
+
+    def _store_details(self, windows):
+        """ Copies this scan's completed URL / incognito results to the on-disk cache (never a private window's). """
+        for window in windows:
+            if window["details_unknown"] or window["is_incognito"]: continue
+            title, create_time = self._identities.get(window["hwnd"], (None, None))
+            if create_time is None or title != window["title"]: continue
+            self.detail_cache.put(window["hwnd"], title, create_time, self._cache.get(window["hwnd"], {}))
+        self.detail_cache.save()
+        Logger.debug(f"SCAN: Detail cache {self.detail_cache.stats()}")
+
+    def _start_explorer_prefetch(self):
+        """ Starts the bulk Explorer path query, unless a previous one is still stuck. """
+        if self._explorer_prefetch and self._explorer_prefetch.is_alive():
+            Logger.debug("SCAN: Previous Explorer pre-fetch still running, UIA only.")
+            return None
+        self._explorer_prefetch = self.backend.explorer_prefetch(self.EXPLORER_PREFETCH_TIMEOUT)
+        return self._explorer_prefetch
+
+    def _count_explorer(self, method):
+        if method in self.explorer_stats:
+            self.explorer_stats[method] += 1
+
+    def _inspect_window(self, hwnd, detailed_scan, allow_peeking, overrides, explorer_prefetch, previous=None, pending=None):
+        """
+        Fast stage: builds the window dict for one HWND, or None if it is not a target window.
+        Windows that still need URL / incognito extraction are appended to 'pending'.
+        """
+        if not self.backend.is_window(hwnd): return None
+        if not self.backend.is_window_visible(hwnd): return None
+        
+        was_peaked = False
+        
+        title = self.backend.get_window_text(hwnd)
+        if not title: return None
+        
+        # Logger.info(f"SCAN: Checking window '{title}'")
+        # We add logs later in the loop to include class info
         
-        if get_setting("ignore_folders") and is_explorer: return False
-        if get_setting("ignore_chrome") and is_chrome: return False
-        if get_setting("ignore_firefox") and is_firefox: return False
+        # Style Checks
+        style = self.backend.get_window_long(hwnd, winconst.GWL_STYLE)
+        ex_style = self.backend.get_window_long(hwnd, winconst.GWL_EXSTYLE)
+        owner = self.backend.get_window(hwnd, winconst.GW_OWNER)
         
-        if get_setting("ignore_others"):
-            if not is_explorer and not is_chrome and not is_firefox:
-                return False
+        if ex_style & winconst.WS_EX_TOOLWINDOW: return None
+        if owner != 0 and not (ex_style & winconst.WS_EX_APPWINDOW): return None
+        
+        # Cloaked Check
+        if self.backend.is_cloaked(hwnd): return None
 
-        return True
+        class_name = self.backend.get_class_name(hwnd)
+        # Broaden check: Class OR Title (files folders usually have this in title if not hidden extensions)
+        is_explorer = (class_name == "CabinetWClass" or "Explorateur de fichiers" in title or "File Explorer" in title)
 
-    def get_target_windows(self, detailed_scan=False, allow_peeking=True, overrides=None):
-        windows = []
-        
-        # Batch Pre-fetch Explorer Paths to avoid O(N*M) COM overhead
-        explorer_paths_map = {}
-        if detailed_scan:
-             # Logger.info("SCAN: Pre-fetching Explorer paths...")
-             # explorer_paths_map = automation.get_all_explorer_paths()
-             # Logger.info("SCAN: Explorer paths fetched.")
-             pass
+        if not self._is_window_allowed(title, class_name=class_name, is_explorer=is_explorer, overrides=overrides):
+            return None
 
 
-        def enum_handler(hwnd, ctx):
-            if not win32gui.IsWindow(hwnd): return
-            if not win32gui.IsWindowVisible(hwnd): return
-            
-            was_peaked = False
-            
-            title = win32gui.GetWindowText(hwnd)
-            if not title: return
-            
-            # Logger.info(f"SCAN: Checking window '{title}'")
-            # We add logs later in the loop to include class info
-            
-            # Style Checks
-            style = win32gui.GetWindowLong(hwnd, win32con.GWL_STYLE)
-            ex_style = win32gui.GetWindowLong(hwnd, win32con.GWL_EXSTYLE)
-            owner = win32gui.GetWindow(hwnd, win32con.GW_OWNER)
-            
-            if ex_style & win32con.WS_EX_TOOLWINDOW: return
-            if owner != 0 and not (ex_style & win32con.WS_EX_APPWINDOW): return
-            
-            # Cloaked Check
-            try:
-                DWMWA_CLOAKED = 14
-                cloaked = c_int(0)
-                windll.dwmapi.DwmGetWindowAttribute(hwnd, DWMWA_CLOAKED, byref(cloaked), sizeof(cloaked))
-                if cloaked.value != 0: return
-            except:
-                pass
-
-            class_name = win32gui.GetClassName(hwnd)
-            # Broaden check: Class OR Title (files folders usually have this in title if not hidden extensions)
-            is_explorer = (class_name == "CabinetWClass" or "Explorateur de fichiers" in title or "File Explorer" in title)
-
-            if not self._is_window_allowed(title, class_name=class_name, is_explorer=is_explorer, overrides=overrides):
-                return
-
-
-            try:
-                placement = win32gui.GetWindowPlacement(hwnd)
-                show_cmd = placement[1]
-                if win32gui.IsIconic(hwnd):
-                    rect = list(placement[4])
-                else:
-                    rect = list(win32gui.GetWindowRect(hwnd))
-            except:
-                rect = [0,0,0,0]
-                show_cmd = win32con.SW_SHOWNORMAL
-
-            w = rect[2] - rect[0]
-            h = rect[3] - rect[1]
-            if w < 20 or h < 20: return 
-
-            cmdline = []
-            cwd = ""
-            url = None
-            folder_path = None
-            
-            exe_name = None
-            try:
-                _, pid = win32process.GetWindowThreadProcessId(hwnd)
-                proc = psutil.Process(pid)
-                exe_name = proc.name()
+        try:
+            placement = self.backend.get_window_placement(hwnd)
+            show_cmd = placement[1]
+            if self.backend.is_iconic(hwnd):
+                rect = list(placement[4])
+            else:
+                rect = list(self.backend.get_window_rect(hwnd))
+        except:
+            rect = [0,0,0,0]
+            show_cmd = winconst.SW_SHOWNORMAL
+
+        w = rect[2] - rect[0]
+        h = rect[3] - rect[1]
+        if w < 20 or h < 20: return None
+
+        # Same title and placement as in the previous scan: skip process and UI lookups.
+        if previous is not None and previous.is_unchanged(hwnd, title, rect, show_cmd):
+            return dict(previous.get(hwnd), was_peaked=False)
+
+        cmdline = []
+        cwd = ""
+        folder_path = None
+        
+        exe_name = None
+        create_time = None
+        try:
+            pid = self.backend.get_window_pid(hwnd)
+            proc = self.processes.get(pid)
+            if proc:
+                exe_name = proc.name
+                cmdline = list(proc.cmdline)
+                cwd = proc.cwd
+                create_time = proc.create_time
+        except:
+            pass
+        self._identities[hwnd] = (title, create_time)
+
+        # Same window, process and title as in an earlier session: reuse its results (no peeking)
+        if detailed_scan and create_time is not None and hwnd not in self._cache and self._detail_cache_enabled(overrides):
+            known = self.detail_cache.get(hwnd, title, create_time)
+            if known:
+                with self._cache_lock:
+                    self._cache[hwnd] = known
+        
+        if detailed_scan:
+            if is_explorer:
+                is_minimized = self.backend.is_iconic(hwnd)
                 try:
-                    cmdline = proc.cmdline()
-                    cwd = proc.cwd()
-                except (psutil.AccessDenied, psutil.NoSuchProcess):
+                    # DEBUG: Check real placement
+                    wp = self.backend.get_window_placement(hwnd)
+                    # Logger.info(f"SCAN: Explorer identified. Class='{class_name}', Minimized={is_minimized}, WP={wp}")
+                except:
                     pass
-            except:
-                pass
-            
-            # Retrieve from Cache if available
-            cached_data = self._cache.get(hwnd)
-            
-            if detailed_scan:
-                if is_explorer:
-                    is_minimized = win32gui.IsIconic(hwnd)
-                    try:
-                        # DEBUG: Check real placement
-                        wp = win32gui.GetWindowPlacement(hwnd)
-                        # Logger.info(f"SCAN: Explorer identified. Class='{class_name}', Minimized={is_minimized}, WP={wp}")
-                    except:
-                        pass
-                        # Logger.info(f"SCAN: Explorer identified. Class='{class_name}', Minimized={is_minimized}")
+                    # Logger.info(f"SCAN: Explorer identified. Class='{class_name}', Minimized={is_minimized}")
+                
+                # 1. CHECK CACHE FIRST (Avoid Peeking Loop)
+                cached_path = self._cache.get(hwnd, {}).get("folder_path")
+                if cached_path:
+                    folder_path = cached_path
+                    self._count_explorer("cache")
+                    # Logger.debug(f"SCAN: Cache Hit for '{title}' -> {folder_path}")
+                
+                # 2. CHECK PRE-FETCH MAP
+                if not folder_path and explorer_prefetch:
+                    folder_path = (explorer_prefetch.result() or {}).get(hwnd)
+                    if folder_path: self._count_explorer("prefetch")
+
+                # 3. PEEK & EXTRACT (Only if missing)
+                if not folder_path:
+                    # FORCE PEEK for Explorer: UI Automation fails on minimized windows, causing freeze.
+                    if is_minimized:
+                        try:
+                            Logger.info(f"SCAN: Force un-minimizing '{title}'...")
+                            self.backend.show_window(hwnd, winconst.SW_SHOWNOACTIVATE)
+                            time.sleep(0.05)
+                            was_peaked = True
+                        except: pass
+
+                    # Extract (COM per window only when no bulk pre-fetch was attempted)
+                    with tracer.span("explorer", "extraction", window=title):
+                        if explorer_prefetch:
+                            folder_path = self.backend.explorer_path_uia(hwnd)
+                        else:
+                            folder_path = self.backend.explorer_path(hwnd)
+                    if not folder_path: self._count_explorer("unresolved")
+                    else: self._count_explorer("uia" if explorer_prefetch else "com")
                     
-                    # 1. CHECK CACHE FIRST (Avoid Peeking Loop)
-                    cached_path = self._cache.get(hwnd, {}).get("folder_path")
-                    if cached_path:
-                        folder_path = cached_path
-                        # Logger.debug(f"SCAN: Cache Hit for '{title}' -> {folder_path}")
+                    if folder_path:
+                         Logger.debug(f"SCAN: Explorer HWND={hwnd} Title='{title}' -> Path='{folder_path}'")
                     
-                    # 2. CHECK PRE-FETCH MAP
-                    if not folder_path:
-                        folder_path = explorer_paths_map.get(hwnd)
-
-                    # 3. PEEK & EXTRACT (Only if missing)
-                    if not folder_path:
-                        # FORCE PEEK for Explorer: UI Automation fails on minimized windows, causing freeze.
-                        if is_minimized:
+
+
+        # --- RE-MINIMIZE if we peaked (Restore State) ---
+        if was_peaked:
+            self._reminimize(hwnd, title)
+
+        # Update Cache
+        if detailed_scan and folder_path is not None:
+            with self._cache_lock:
+                self._cache.setdefault(hwnd, {})["folder_path"] = folder_path
+
+        window = {
+            "hwnd": hwnd, 
+            "title": title,
+            "target_key": "File Explorer" if is_explorer else title,
+            "rect": rect,
+            "show_cmd": show_cmd,
+            "exe_name": exe_name,
+            "cmdline": cmdline,
+            "cwd": cwd,
+            "url": None, # URL / incognito are filled in by the extraction stage (_complete_details)
+            "tabs": None, # Every tab's URL, in order, when the browser's session file lists them
+            "active_tab": 0,
+            "folder_path": folder_path,
+            "is_incognito": False,
+            "is_minimized": self.backend.is_iconic(hwnd), # Still report initial state? OR current?
+            # If we peaked, it is PHYSICALLY visible now, but logically was minimized.
+            # Matcher logic uses is_minimized to be lenient. 
+            # But since we KNOW Incognito status now, we don't need leniency.
+            # So report as Visible (is_minimized=False) to enforce strict matching?
+            # YES.
+            "is_minimized": self.backend.is_iconic(hwnd), 
+            "was_peaked": was_peaked,
+            "details_unknown": False # True when URL / incognito extraction missed its deadline
+        }
+        if detailed_scan and pending is not None:
+            pending.append(window)
+        return window
+
+    def _job_abandoned(self):
+        """ extraction.job_abandoned(); an injected pool without it never abandons a running job. """
+        job_abandoned = getattr(self.extraction, "job_abandoned", None)
+        return bool(job_abandoned and job_abandoned())
+
+    def _extract_details(self, hwnd, title, cmdline, allow_peeking, use_precise):
+        """
+        URL and incognito status of one window (may run on an extraction worker). Returns (url, is_incognito, was_peaked).
+        Once the pool abandons the job, it no longer peeks at the window nor caches its results.
+        """
+        cached_data = self._cache.get(hwnd)
+        was_peaked = False
+        url = None
+
+        if use_precise:
+            # Only Browser windows need URL analysis
+            if self._is_browser_title(title):
+                if self.backend.is_iconic(hwnd):
+                    # Optimized "Peek" for Minimized Browsers
+                    # We MUST show it to get the URL, otherwise we are blind.
+                    # Check cache first to avoid repeating this visual glitch.
+                    # Respect 'allow_peeking' flag (False during Save).
+                    # An abandoned job (past its deadline, reported unknown) leaves the window alone.
+                    if allow_peeking and not (cached_data and "url" in cached_data) and not self._job_abandoned():
                             try:
-                                Logger.info(f"SCAN: Force un-minimizing '{title}'...")
-                                win32gui.ShowWindow(hwnd, win32con.SW_SHOWNOACTIVATE)
+                                # Logger.debug(f"Peeking at minimized browser: {title[:30]}...")
+                                self.backend.show_window(hwnd, winconst.SW_SHOWNOACTIVATE)
                                 time.sleep(0.05)
                                 was_peaked = True
                             except: pass
+                
+                # 1. CHECK CACHE
+                if cached_data and "url" in cached_data:
+                    url = cached_data["url"]
+                else:
+                     # 2. COMPUTE
+                     # CRITICAL FIX: Only attempt extraction if window is physically visible (not minimized),
+                     # OR if we intentionally peaked at it.
+                     # If we are in Save Mode (allow_peeking=False) and it is minimized, we MUST SKIP extraction
+                     # to avoid implicit un-minimization by UIAutomation.
+                     if not self.backend.is_iconic(hwnd) or was_peaked:
+                         t0 = time.time()
+                         with tracer.span("url", "extraction", window=title):
+                             url = self.extractor.extract_url(hwnd)
+                         dt = time.time() - t0
+                         
+                         if dt > 0.1:
+                                 Logger.info(f"Analyse URL ({dt:.2f}s) : {title[:50]}...")
 
-                        # Extract
-                        folder_path = automation.extract_path_from_explorer(hwnd)
-                        
-                        if folder_path:
-                             Logger.debug(f"SCAN: Explorer HWND={hwnd} Title='{title}' -> Path='{folder_path}'")
-                        
-
-
-                # Check precise_urls using overrides if present
-                use_precise = overrides.get("precise_urls", True) if overrides and "precise_urls" in overrides else self.settings.get("precise_urls", True)
-                if use_precise:
-                    # Only Browser windows need URL analysis
-                    if "Chrome" in title or "Firefox" in title or "Edge" in title:
-                        if win32gui.IsIconic(hwnd):
-                            # Optimized "Peek" for Minimized Browsers
-                            # We MUST show it to get the URL, otherwise we are blind.
-                            # Check cache first to avoid repeating this visual glitch.
-                            # Respect 'allow_peeking' flag (False during Save).
-                            if allow_peeking and not (cached_data and "url" in cached_data):
-                                    try:
-                                        # Logger.debug(f"Peeking at minimized browser: {title[:30]}...")
-                                        win32gui.ShowWindow(hwnd, win32con.SW_SHOWNOACTIVATE)
-                                        time.sleep(0.05)
-                                        was_peaked = True
-                                    except: pass
-                        
-                        # 1. CHECK CACHE
-                        if cached_data and "url" in cached_data:
-                            url = cached_data["url"]
-                        else:
-                             # 2. COMPUTE
-                             # CRITICAL FIX: Only attempt extraction if window is physically visible (not minimized),
-                             # OR if we intentionally peaked at it.
-                             # If we are in Save Mode (allow_peeking=False) and it is minimized, we MUST SKIP extraction
-                             # to avoid implicit un-minimization by UIAutomation.
-                             if not win32gui.IsIconic(hwnd) or was_peaked:
-                                 t0 = time.time()
-                                 url = automation.extract_url_from_window(hwnd)
-                                 dt = time.time() - t0
-                                 
-                                 if dt > 0.1:
-                                         Logger.info(f"Analyse URL ({dt:.2f}s) : {title[:50]}...")
-
-            is_incognito = False
-            if detailed_scan:
-                 # Check Cache for Incognito
-                 if cached_data and "is_incognito" in cached_data:
-                     is_incognito = cached_data["is_incognito"]
+        # Check Cache for Incognito
+        if cached_data and "is_incognito" in cached_data:
+            is_incognito = cached_data["is_incognito"]
+        else:
+            # 1. Check UI/Title First (Most Accurate for specific windows)
+            t0_inc = time.time()
+            with tracer.span("incognito", "extraction", window=title):
+                is_incognito = self.extractor.is_incognito(hwnd, title)
+            dt_inc = time.time() - t0_inc
+            if dt_inc > 0.1:
+                 Logger.info(f"Analyse Incognito ({dt_inc:.2f}s) : {title[:50]}...")
+            
+            # 2. Check Command Line (Fallback)
+            # Only use this if UI check failed AND it's not a known browser that usually shares status
+            if not is_incognito and cmdline:
+                 browser = registry.profile_for_exe(cmdline[0])
+                 
+                 # CRITIQUE: Browsers share processes. If one window is private, the process might have the flag.
+                 # This corrupts the status of Normal windows sharing that process.
+                 # FIX: Do NOT trust cmdline for Browsers. Trust the Title/UI only.
+                 
+                 if browser is None: 
+                     if registry.has_private_flag(cmdline): is_incognito = True
                  else:
-                     # 1. Check UI/Title First (Most Accurate for specific windows)
-                     t0_inc = time.time()
-                     is_incognito = automation.is_incognito(hwnd, title)
-                     dt_inc = time.time() - t0_inc
-                     if dt_inc > 0.1:
-                          Logger.info(f"Analyse Incognito ({dt_inc:.2f}s) : {title[:50]}...")
+                     # BROWSER SPECIFIC FIX
+                     # Visible Windows: Trust Main Logic (UI/Title). 
+                     # Minimized Windows: UI Check fails (pixels not drawn). Must use CmdLine.
+                     # Chrome/Edge: CmdLine is reliable (Processes usually separated).
+                     # Firefox: CmdLine is UNRELIABLE (Shared Process). Trust Title even if minimized.
                      
-                     # 2. Check Command Line (Fallback)
-                     # Only use this if UI check failed AND it's not a known browser that usually shares status
-                     if not is_incognito and cmdline:
-                          cmd_str = " ".join(cmdline).lower()
-                          is_browser_process = any(b in cmd_str for b in ["chrome.exe", "firefox.exe", "msedge.exe"])
+                     if self.backend.is_iconic(hwnd):
+                          is_chrome_edge = not browser.private_from_title_only # Chrome, Edge & co: separate processes
                           
-                          # CRITIQUE: Browsers share processes. If one window is private, the process might have the flag.
-                          # This corrupts the status of Normal windows sharing that process.
-                          # FIX: Do NOT trust cmdline for Browsers. Trust the Title/UI only.
+                          # PASSIVE CHECK (CmdLine)
+                          if is_chrome_edge:
+                               if registry.has_private_flag(cmdline):
+                                    is_incognito = True
                           
-                          if not is_browser_process: 
-                              if "--incognito" in cmd_str: is_incognito = True
-                              elif "-private" in cmd_str: is_incognito = True
-                              elif "-inprivate" in cmd_str: is_incognito = True
-                          else:
-                              # BROWSER SPECIFIC FIX
-                              # Visible Windows: Trust Main Logic (UI/Title). 
-                              # Minimized Windows: UI Check fails (pixels not drawn). Must use CmdLine.
-                              # Chrome/Edge: CmdLine is reliable (Processes usually separated).
-                              # Firefox: CmdLine is UNRELIABLE (Shared Process). Trust Title even if minimized.
-                              
-                              if win32gui.IsIconic(hwnd):
-                                   is_chrome_edge = "chrome.exe" in cmd_str or "msedge.exe" in cmd_str
+                          # ACTIVE PEEK (Ultimate Truth)
+                          # If passive check failed to find flag, but we suspect it might be private (or just simply unknown)
+                          # and we are in detailed_scan mode, we MUST know.
+                          if is_chrome_edge and not is_incognito and not self._job_abandoned():
+                               try:
+                                   # 1. Un-minimize without activating
+                                   self.backend.show_window(hwnd, winconst.SW_SHOWNOACTIVATE)
+                                   time.sleep(0.05) # Tiny delay for UI tree to update
                                    
-                                   # PASSIVE CHECK (CmdLine)
-                                   if is_chrome_edge:
-                                        if "--incognito" in cmd_str or "-inprivate" in cmd_str:
-                                             is_incognito = True
+                                   # 2. Check UI
+                                   is_incognito = self.extractor.is_incognito(hwnd, title)
                                    
-                                   # ACTIVE PEEK (Ultimate Truth)
-                                   # If passive check failed to find flag, but we suspect it might be private (or just simply unknown)
-                                   # and we are in detailed_scan mode, we MUST know.
-                                   # Capturing "User said no excuse".
-                                   if is_chrome_edge and not is_incognito:
-                                        try:
-                                            # Logger.debug(f"PEEK: Force un-minimize to check Incognito: {title}")
-                                            # 1. Un-minimize without activating
-                                            win32gui.ShowWindow(hwnd, win32con.SW_SHOWNOACTIVATE)
-                                            time.sleep(0.05) # Tiny delay for UI tree to update
-                                            
-                                            # 2. Check UI
-                                            is_incognito = automation.is_incognito(hwnd, title)
-                                            
-                                            # 3. DO NOT Re-minimize (Optimization requested by User)
-                                            # Leave it open. Restorer will deciding what to do.
-                                            # win32gui.ShowWindow(hwnd, win32con.SW_SHOWMINNOACTIVE)
-                                            
-                                            # Mark as touched so we can cleanup later if unused
-                                            was_peaked = True
-                                            pass
-                                        except:
-                                            pass
-                                    
+                                   # Mark as touched so it is re-minimized below
+                                   was_peaked = True
+                               except:
+                                   pass
 
-            
-            # --- RE-MINIMIZE if we peaked (Restore State) ---
-            # Central location to ensure ANY peaked window is restored
-            if was_peaked:
-                 try:
-                     # Logger.debug(f"Reminimizing peaked window: {title}")
-                     win32gui.ShowWindow(hwnd, win32con.SW_MINIMIZE)
-                     # For Firefox Private, sometimes a second kick is needed?
-                     if "firefox" in title.lower():
-                          time.sleep(0.05)
-                          if not win32gui.IsIconic(hwnd):
-                               win32gui.ShowWindow(hwnd, win32con.SW_MINIMIZE)
-                 except: pass
-
-            # Update Cache
-            if detailed_scan:
-                 if hwnd not in self._cache:
-                      self._cache[hwnd] = {}
-                 
-                 # Only update if we actually computed something
-                 if url is not None: self._cache[hwnd]["url"] = url
-                 if folder_path is not None: self._cache[hwnd]["folder_path"] = folder_path
-                 self._cache[hwnd]["is_incognito"] = is_incognito
-
-            windows.append({
-                "hwnd": hwnd, 
-                "title": title,
-                "target_key": "File Explorer" if is_explorer else title,
-                "rect": rect,
-                "show_cmd": show_cmd,
-                "exe_name": exe_name,
-                "cmdline": cmdline,
-                "cwd": cwd,
-                "url": url,
-                "folder_path": folder_path,
-                "is_incognito": is_incognito,
-                "is_minimized": win32gui.IsIconic(hwnd), # Still report initial state? OR current?
-                # If we peaked, it is PHYSICALLY visible now, but logically was minimized.
-                # Matcher logic uses is_minimized to be lenient. 
-                # But since we KNOW Incognito status now, we don't need leniency.
-                # So report as Visible (is_minimized=False) to enforce strict matching?
-                # YES.
-                "is_minimized": win32gui.IsIconic(hwnd), 
-                "was_peaked": was_peaked
-            })
-            return
-
-        win32gui.EnumWindows(enum_handler, None)
-        return windows
+        # --- RE-MINIMIZE if we peaked (Restore State) ---
+        if was_peaked:
+            self._reminimize(hwnd, title)
+
+        if is_incognito: tracer.mark_private(title) # Redacted from exported traces
+
+        # Update Cache (only with what we actually computed), unless the scan already reported this window unknown
+        if self._job_abandoned():
+            return url, is_incognito, was_peaked
+        with self._cache_lock:
+            entry = self._cache.setdefault(hwnd, {})
+            if url is not None: entry["url"] = url
+            entry["is_incognito"] = is_incognito
+
+        return url, is_incognito, was_peaked
+
+    def _reminimize(self, hwnd, title):
+        """ Puts a peeked window back in the minimized state. """
+        try:
+            self.backend.show_window(hwnd, winconst.SW_MINIMIZE)
+            # For Firefox Private, sometimes a second kick is needed?
+            browser = registry.profile_for_title(title)
+            if browser is not None and browser.stubborn_minimize:
+                 time.sleep(0.05)
+                 if not self.backend.is_iconic(hwnd):
+                      self.backend.show_window(hwnd, winconst.SW_MINIMIZE)
+        except: pass
 
     def should_ignore_saved(self, saved, overrides=None):
         """ Checks if a SAVED item should be ignored based on CURRENT or OVERRIDEN settings. """
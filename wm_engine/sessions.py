@@ -0,0 +1,296 @@
+import glob
+import json
+import os
+import struct
+import threading
+from collections import namedtuple
+
+from . import lz4block
+from .titles import title_features
+
+SessionTab = namedtuple("SessionTab", ["url", "title"])
+
+class SessionWindow:
+    """ One browser window as its session file describes it: ordered tabs and the active one. """
+    __slots__ = ("tabs", "active", "private")
+
+    def __init__(self, tabs, active=0, private=False):
+        self.tabs = list(tabs)
+        self.active = min(max(active, 0), len(self.tabs) - 1) if self.tabs else 0
+        self.private = private
+
+    @property
+    def active_tab(self):
+        return self.tabs[self.active] if self.tabs else None
+
+    def __repr__(self):
+        tab = self.active_tab
+        return f"SessionWindow({len(self.tabs)} tabs, active={tab.title if tab else None!r})"
+
+# --- Firefox: sessionstore-backups/recovery.jsonlz4 ---
+
+MOZLZ4_MAGIC = b"mozLz40\0"
+
+def read_mozlz4(data):
+    """ Payload of a mozLz4 file (magic, little-endian decompressed size, LZ4 block). """
+    if data[:8] != MOZLZ4_MAGIC:
+        raise ValueError("Not a mozLz4 file")
+    size = struct.unpack_from("<I", data, 8)[0]
+    return lz4block.decompress(data[12:], size)
+
+def parse_firefox_session(session):
+    """ SessionWindows of a Firefox session (the decoded JSON). Hidden tabs are left out. """
+    windows = []
+    for win in session.get("windows", []):
+        tabs = []
+        active = 0
+        selected = win.get("selected", 1) - 1 # 1-based in the file
+        for i, tab in enumerate(win.get("tabs", [])):
+            entries = tab.get("entries") or []
+            if not entries or tab.get("hidden"): continue
+            index = tab.get("index", len(entries)) - 1 # Current history entry, 1-based
+            entry = entries[min(max(index, 0), len(entries) - 1)]
+            if i == selected: active = len(tabs)
+            tabs.append(SessionTab(entry.get("url", ""), entry.get("title", "")))
+        if tabs:
+            windows.append(SessionWindow(tabs, active, bool(win.get("isPrivate", False))))
+    return windows
+
+def read_firefox_session(path):
+    with open(path, "rb") as f:
+        return parse_firefox_session(json.loads(read_mozlz4(f.read())))
+
+# --- Chromium: Sessions/Session_* (or "Current Session"), SNSS command log ---
+
+SNSS_MAGIC = b"SNSS"
+SNSS_VERSIONS = (1, 3) # 2 and 4 are encrypted
+
+# Command ids (components/sessions session_service_commands.cc)
+CMD_SET_TAB_WINDOW = 0
+CMD_SET_TAB_INDEX_IN_WINDOW = 2
+CMD_NAVIGATION_PRUNED_FROM_BACK = 5
+CMD_UPDATE_TAB_NAVIGATION = 6
+CMD_SET_SELECTED_NAVIGATION_INDEX = 7
+CMD_SET_SELECTED_TAB_IN_INDEX = 8
+CMD_SET_WINDOW_TYPE = 9
+CMD_NAVIGATION_PRUNED_FROM_FRONT = 11
+CMD_TAB_CLOSED = 16
+CMD_WINDOW_CLOSED = 17
+CMD_NAVIGATION_PATH_PRUNED = 24
+WINDOW_TYPE_NORMAL = 0
+
+class _Pickle:
+    """ Reader for base::Pickle payloads: 4-byte header, 4-byte aligned fields. """
+
+    def __init__(self, data):
+        self.data = data
+        self.pos = 4
+
+    def int32(self):
+        value = struct.unpack_from("<i", self.data, self.pos)[0]
+        self.pos += 4
+        return value
+
+    def _bytes(self, length):
+        value = self.data[self.pos:self.pos + length]
+        if len(value) != length: raise ValueError("Truncated pickle")
+        self.pos += (length + 3) & ~3
+        return value
+
+    def string(self):
+        return self._bytes(self.int32()).decode("utf-8", "replace")
+
+    def string16(self):
+        return self._bytes(self.int32() * 2).decode("utf-16-le", "replace")
+
+class _Tab:
+    __slots__ = ("window", "index", "navigations", "selected")
+
+    def __init__(self):
+        self.window = None
+        self.index = 0 # Position in its window
+        self.navigations = {} # navigation index -> SessionTab
+        self.selected = None
+
+    def current(self):
+        if not self.navigations: return None
+        if self.selected in self.navigations: return self.navigations[self.selected]
+        return self.navigations[max(self.navigations)]
+
+def _prune(tab, start, count):
+    """ Drops navigations [start, start + count) and shifts the later ones down. """
+    kept = {}
+    for index, nav in tab.navigations.items():
+        if index < start: kept[index] = nav
+        elif index >= start + count: kept[index - count] = nav
+    tab.navigations = kept
+    if tab.selected is not None and tab.selected >= start + count:
+        tab.selected -= count
+
+def parse_snss(data):
+    """ SessionWindows of a Chromium session file, by replaying its command log. """
+    if data[:4] != SNSS_MAGIC:
+        raise ValueError("Not an SNSS file")
+    version = struct.unpack_from("<i", data, 4)[0]
+    if version not in SNSS_VERSIONS:
+        raise ValueError(f"Unsupported SNSS version {version}")
+
+    tabs = {}
+    selected_tab = {} # window id -> index of the active tab
+    window_types = {}
+    closed_windows = set()
+    pos = 8
+    while pos + 2 <= len(data):
+        size = struct.unpack_from("<H", data, pos)[0]
+        pos += 2
+        if size == 0 or pos + size > len(data): break # Truncated tail (file being written)
+        command = data[pos]
+        payload = data[pos + 1:pos + size]
+        pos += size
+        try:
+            if command == CMD_UPDATE_TAB_NAVIGATION:
+                pickle = _Pickle(payload)
+                tab_id, index = pickle.int32(), pickle.int32()
+                url = pickle.string()
+                title = pickle.string16()
+                tabs.setdefault(tab_id, _Tab()).navigations[index] = SessionTab(url, title)
+            elif command == CMD_SET_TAB_WINDOW:
+                window_id, tab_id = struct.unpack_from("<ii", payload)
+                tabs.setdefault(tab_id, _Tab()).window = window_id
+            elif command == CMD_SET_TAB_INDEX_IN_WINDOW:
+                tab_id, index = struct.unpack_from("<ii", payload)
+                tabs.setdefault(tab_id, _Tab()).index = index
+            elif command == CMD_SET_SELECTED_NAVIGATION_INDEX:
+                tab_id, index = struct.unpack_from("<ii", payload)
+                tabs.setdefault(tab_id, _Tab()).selected = index
+            elif command == CMD_SET_SELECTED_TAB_IN_INDEX:
+                window_id, index = struct.unpack_from("<ii", payload)
+                selected_tab[window_id] = index
+            elif command == CMD_SET_WINDOW_TYPE:
+                window_id, window_type = struct.unpack_from("<ii", payload)
+                window_types[window_id] = window_type
+            elif command == CMD_NAVIGATION_PRUNED_FROM_BACK:
+                tab_id, count = struct.unpack_from("<ii", payload)
+                tab = tabs.setdefault(tab_id, _Tab())
+                tab.navigations = {i: nav for i, nav in tab.navigations.items() if i < count}
+            elif command == CMD_NAVIGATION_PRUNED_FROM_FRONT:
+                tab_id, count = struct.unpack_from("<ii", payload)
+                _prune(tabs.setdefault(tab_id, _Tab()), 0, count)
+            elif command == CMD_NAVIGATION_PATH_PRUNED:
+                tab_id, index, count = struct.unpack_from("<iii", payload)
+                _prune(tabs.setdefault(tab_id, _Tab()), index, count)
+            elif command == CMD_TAB_CLOSED:
+                tabs.pop(struct.unpack_from("<i", payload)[0], None)
+            elif command == CMD_WINDOW_CLOSED:
+                closed_windows.add(struct.unpack_from("<i", payload)[0])
+        except (struct.error, ValueError):
+            continue # Malformed command: skip it, keep the rest of the log
+
+    by_window = {}
+    for tab_id, tab in tabs.items():
+        if tab.window is None or tab.window in closed_windows: continue
+        if window_types.get(tab.window, WINDOW_TYPE_NORMAL) != WINDOW_TYPE_NORMAL: continue # Popups, apps
+        current = tab.current()
+        if current is not None:
+            by_window.setdefault(tab.window, []).append((tab.index, tab_id, current))
+
+    windows = []
+    for window_id, entries in by_window.items():
+        entries.sort(key=lambda e: (e[0], e[1]))
+        selected = selected_tab.get(window_id, 0)
+        active = next((i for i, e in enumerate(entries) if e[0] == selected), selected) # Indices may have gaps
+        windows.append(SessionWindow([nav for _, _, nav in entries], active))
+    return windows
+
+def read_snss(path):
+    with open(path, "rb") as f:
+        return parse_snss(f.read())
+
+READERS = {"mozlz4": read_firefox_session, "snss": read_snss}
+
+# --- Locating and caching ---
+
+def session_files(profile):
+    """ Current session file of every user profile of this browser (newest match per profile folder). """
+    newest = {}
+    for pattern in profile.session_files:
+        for path in glob.glob(os.path.expandvars(pattern)):
+            try:
+                mtime = os.path.getmtime(path)
+            except OSError:
+                continue
+            folder = os.path.dirname(path)
+            if os.path.basename(folder) == "Sessions":
+                folder = os.path.dirname(folder) # Chromium profile: Sessions\Session_* supersedes an old "Current Session"
+            if folder not in newest or mtime > newest[folder][0]:
+                newest[folder] = (mtime, path)
+    return [path for _, path in newest.values()]
+
+class SessionFileCache:
+    """ Parsed session files, re-read only when their size or modification time changes. """
+
+    def __init__(self):
+        self._entries = {} # path -> ((size, mtime), [SessionWindow])
+        self._lock = threading.Lock()
+        self.parsed = 0
+
+    def read(self, path, reader):
+        try:
+            st = os.stat(path)
+        except OSError:
+            return []
+        stamp = (st.st_size, st.st_mtime)
+        with self._lock:
+            entry = self._entries.get(path)
+            if entry and entry[0] == stamp: return entry[1]
+        try:
+            windows = reader(path)
+        except Exception as e:
+            print(f"Error reading browser session {path}: {e}")
+            windows = []
+        with self._lock:
+            self._entries[path] = (stamp, windows)
+            self.parsed += 1
+        return windows
+
+    def windows(self, profile):
+        """ SessionWindows of every session file of 'profile', or None if the browser has no readable format. """
+        reader = READERS.get(profile.session_format)
+        if reader is None: return None
+        windows = []
+        for path in session_files(profile):
+            windows.extend(self.read(path, reader))
+        return windows
+
+# --- Correlation with live windows ---
+
+def _title_score(window_title, tab_title):
+    """ How well a window title (browser suffix already stripped) matches the active tab's title. """
+    if not window_title or not tab_title: return 0.0
+    a, b = window_title.lower(), tab_title.lower()
+    if a == b: return 1.0
+    if len(b) >= 4 and a.startswith(b): return 0.9 # e.g. Edge: "<title> and 3 more pages - Profile"
+    return title_features(a).similarity(title_features(b), 0.8)
+
+def correlate(session_windows, windows, min_score=0.8):
+    """
+    Maps live windows to session windows by title: 'windows' is [(hwnd, clean title)].
+    A pair is kept only when each side is the other's single best match, so
+    windows with identical titles (e.g. several "New Tab") stay unmatched.
+    Returns {hwnd: SessionWindow}.
+    """
+    if not session_windows or not windows: return {}
+    tab_titles = [s.active_tab.title for s in session_windows]
+    scores = [[_title_score(title, tab_title) for tab_title in tab_titles] for _, title in windows]
+
+    def unique_best(values):
+        best = max(range(len(values)), key=values.__getitem__)
+        runner_up = max((v for i, v in enumerate(values) if i != best), default=0.0)
+        return best if values[best] >= min_score and values[best] > runner_up else None
+
+    result = {}
+    for r, (hwnd, _) in enumerate(windows):
+        c = unique_best(scores[r])
+        if c is not None and unique_best([row[c] for row in scores]) == r:
+            result[hwnd] = session_windows[c]
+    return result
@@ -1,10 +1,41 @@
+import atexit
 import json
 import os
+import threading
+
+from .utils import atomic_write_json
 
 class SettingsManager:
-    def __init__(self, settings_file):
+    """
+    Settings persisted in settings.json.
+
+    save_settings() writes immediately. Incremental changes (slot settings, UI slot
+    names) are write-behind: they mark the settings dirty and a single atomic write
+    happens 'save_delay' seconds after the first one, so a burst of UI changes
+    costs one I/O. Call flush() before exiting (also registered with atexit).
+    """
+    SAVE_DELAY = 0.5
+
+    def __init__(self, settings_file, write_behind=True, save_delay=SAVE_DELAY):
         self.settings_file = settings_file
+        self.write_behind = write_behind
+        self.save_delay = save_delay
+        self.dirty = False
+        self.version = 0 # Bumped on every change, so callers can cache derived data
+        self.write_count = 0
+        self._lock = threading.RLock()
+        self._timer = None
         self.settings = self.load_settings()
+        atexit.register(self.flush)
+
+    @property
+    def settings(self):
+        return self._settings
+
+    @settings.setter
+    def settings(self, value):
+        self._settings = value
+        self.version += 1
 
     def load_settings(self):
         default_settings = {
@@ -14,6 +45,14 @@ class SettingsManager:
             "ignore_chrome": False,
             "ignore_firefox": False,
             "ignore_others": False,
+            "launch_concurrency": 4,
+            "detail_cache": True,
+            "detail_cache_ttl_hours": 12,
+            "compact_layouts": False,
+            "history_max_versions": 50,
+            "trace_export": False,
+            "uia_path_cache": True,
+            "session_files": True,
             "exclude_titles": [
                 "Program Manager", "Microsoft Text Input Application", "Settings", "Paramètres",
                 "Window Manager", "Calculatrice", "Nvidia Share", "Windows Input Experience",
@@ -39,18 +78,48 @@ class SettingsManager:
         return default_settings
 
     def save_settings(self, new_settings):
-        self.settings = new_settings
-        try:
-            with open(self.settings_file, "w") as f:
-                json.dump(self.settings, f, indent=4)
+        with self._lock:
+            self.settings = new_settings # Bumps version
+            self.dirty = True
+        if self.flush():
             # Logger check? circular import risk if Logger uses Engine...
             # Logger is standalone? Yes.
             from .logger import Logger
             Logger.info("Settings saved successfully.")
-        except Exception as e:
-            print(f"Error saving settings: {e}")
-            from .logger import Logger
-            Logger.error(f"Error saving settings: {e}")
+
+    def mark_dirty(self):
+        """
+        Records an in-place change; the write happens after 'save_delay' (or now without write-behind).
+        Make the change and call this while holding self._lock, so flush() never serializes a half-updated dict.
+        """
+        with self._lock:
+            self.version += 1
+            self.dirty = True
+            if self.write_behind:
+                if self._timer is None: # Otherwise coalesced into the pending write
+                    self._timer = threading.Timer(self.save_delay, self.flush)
+                    self._timer.daemon = True
+                    self._timer.start()
+                return
+        self.flush()
+
+    def flush(self):
+        """ Writes pending changes now (atomically). Returns False if the write failed. """
+        with self._lock:
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+            if not self.dirty: return True
+            try:
+                atomic_write_json(self.settings_file, self.settings, indent=4)
+                self.dirty = False
+                self.write_count += 1
+                return True
+            except Exception as e:
+                print(f"Error saving settings: {e}")
+                from .logger import Logger
+                Logger.error(f"Error saving settings: {e}")
+                return False
 
     def get(self, key, default=None):
         return self.settings.get(key, default)
@@ -60,11 +129,14 @@ class SettingsManager:
         return slots.get(str(index), {}) # Return empty dict if not set (fallback to globals)
 
     def set_slot_settings(self, index, slot_data):
-        if "slots" not in self.settings:
-            self.settings["slots"] = {}
-        
-        self.settings["slots"][str(index)] = slot_data
-        self.save_settings(self.settings)
+        # In-place changes hold the lock: the write-behind timer thread serializes this dict in flush()
+        with self._lock:
+            if "slots" not in self.settings:
+                self.settings["slots"] = {}
+            
+            self.settings["slots"][str(index)] = slot_data
+            self.mark_dirty()
+
     def get_ui_slots(self, count=5):
         # Default initialization if missing
         if "ui_slots" not in self.settings:
@@ -75,14 +147,15 @@ class SettingsManager:
         return slots
 
     def set_ui_slot(self, index, name):
-        if "ui_slots" not in self.settings:
-            self.settings["ui_slots"] = [""] * 5 # Init with empty strings
-        
-        current_slots = self.settings["ui_slots"]
-        # Expand if needed
-        while len(current_slots) <= index:
-            current_slots.append("")
-        
-        current_slots[index] = name
-        self.settings["ui_slots"] = current_slots
-        self.save_settings(self.settings)
+        with self._lock: # See set_slot_settings
+            if "ui_slots" not in self.settings:
+                self.settings["ui_slots"] = [""] * 5 # Init with empty strings
+            
+            current_slots = self.settings["ui_slots"]
+            # Expand if needed
+            while len(current_slots) <= index:
+                current_slots.append("")
+            
+            current_slots[index] = name
+            self.settings["ui_slots"] = current_slots
+            self.mark_dirty()
@@ -0,0 +1,73 @@
+import json
+
+class SnapshotDiff:
+    """ What changed between two scans: window dicts for added/changed, HWNDs for removed. """
+
+    def __init__(self, added=None, removed=None, changed=None):
+        self.added = added or []
+        self.removed = removed or []
+        self.changed = changed or []
+
+    def __bool__(self):
+        return bool(self.added or self.removed or self.changed)
+
+    def __repr__(self):
+        return f"SnapshotDiff(added={len(self.added)}, removed={len(self.removed)}, changed={len(self.changed)})"
+
+class ScanSnapshot:
+    """
+    Result of one scan, keyed by HWND (scan order = Z-order is preserved).
+    Snapshots compare by content and round-trip through JSON, so recorded
+    window lists can be diffed offline.
+    """
+    # Transient flags that say nothing about the window itself
+    VOLATILE_KEYS = ("was_peaked",)
+
+    def __init__(self, windows=()):
+        self.windows = {w["hwnd"]: w for w in windows}
+
+    def __len__(self):
+        return len(self.windows)
+
+    def __iter__(self):
+        return iter(self.windows.values())
+
+    def __contains__(self, hwnd):
+        return hwnd in self.windows
+
+    def __eq__(self, other):
+        if not isinstance(other, ScanSnapshot): return NotImplemented
+        return list(self.windows) == list(other.windows) and \
+               all(self._stable(w) == self._stable(other.windows[h]) for h, w in self.windows.items())
+
+    def get(self, hwnd):
+        return self.windows.get(hwnd)
+
+    def is_unchanged(self, hwnd, title, rect, show_cmd):
+        """ True if 'hwnd' was seen with the same title and placement (and fully analysed). """
+        prior = self.windows.get(hwnd)
+        if not prior or prior.get("details_unknown"): return False
+        return prior["title"] == title and list(prior["rect"]) == list(rect) and prior["show_cmd"] == show_cmd
+
+    def diff(self, newer):
+        """ Changes from this snapshot to 'newer'. """
+        result = SnapshotDiff()
+        for hwnd, window in newer.windows.items():
+            prior = self.windows.get(hwnd)
+            if prior is None:
+                result.added.append(window)
+            elif self._stable(prior) != self._stable(window):
+                result.changed.append(window)
+        result.removed = [hwnd for hwnd in self.windows if hwnd not in newer.windows]
+        return result
+
+    @classmethod
+    def _stable(cls, window):
+        return {k: v for k, v in window.items() if k not in cls.VOLATILE_KEYS}
+
+    def to_json(self):
+        return json.dumps({"windows": list(self.windows.values())})
+
+    @classmethod
+    def from_json(cls, text):
+        return cls(json.loads(text).get("windows", []))
@@ -1,36 +1,249 @@
+import hashlib
 import json
 import os
+import re
+from collections.abc import MutableMapping
+
+from . import compact
+from .history import LayoutHistory
+from .utils import atomic_write_bytes, atomic_write_json
+
+class LazyLayouts(MutableMapping):
+    """ Scenario name -> data; each scenario file is decoded on first access only. """
+
+    def __init__(self, storage, names):
+        self._storage = storage
+        self._names = dict.fromkeys(names) # Ordered set
+        self._data = {}
+
+    def __getitem__(self, name):
+        if name not in self._names: raise KeyError(name)
+        if name not in self._data:
+            data = self._storage._read_scenario(name)
+            if data is None: raise KeyError(name)
+            self._data[name] = data
+        return self._data[name]
+
+    def __setitem__(self, name, data):
+        self._names[name] = None
+        self._data[name] = data
+
+    def __delitem__(self, name):
+        del self._names[name]
+        self._data.pop(name, None)
+
+    def __contains__(self, name):
+        return name in self._names
+
+    def __iter__(self):
+        return iter(list(self._names))
+
+    def __len__(self):
+        return len(self._names)
+
+    def __repr__(self):
+        return f"LazyLayouts({list(self._names)!r}, decoded={len(self._data)})"
+
+    def forget(self, name):
+        """ Drops the decoded copy; the next access re-reads the file. """
+        self._data.pop(name, None)
+
+    def is_decoded(self, name):
+        return name in self._data
 
 class LayoutStorage:
-    def __init__(self, layout_file):
+    """
+    One file per scenario in '<layouts>.d/', plus an index (name -> file).
+    Saving a scenario atomically rewrites that file only (and the index when the
+    set of names changes), so a crash can no longer take every scenario with it.
+    Reads come from memory: 'layouts' only decodes a scenario when it is first
+    accessed, and a file is parsed again only when its stat signature
+    (mtime_ns, size, inode) changed, e.g. edited by another instance, or after
+    invalidate(). A legacy layouts.json is migrated on first load and kept as
+    layouts.json.bak.
+
+    With use_compact=True scenarios are (re)written in the binary .wml format
+    (see compact.py); both formats are always readable.
+
+    Every write is also recorded in the scenario's history (see history.py), so a
+    bad save can be rolled back with restore_version().
+    """
+    INDEX_VERSION = 1
+
+    def __init__(self, layout_file, use_compact=False, max_versions=50):
         self.layout_file = layout_file
+        self.use_compact = use_compact
+        self.layout_dir = os.path.splitext(layout_file)[0] + ".d"
+        self.history = LayoutHistory(os.path.join(self.layout_dir, "history"), max_versions)
+        self.index_file = os.path.join(self.layout_dir, "index.json")
+        self._index = {} # scenario name -> file name (in layout_dir), in display order
+        self._signatures = {} # path -> stat signature of the version we hold in memory
+        self.parse_count = 0 # Files parsed, for benchmarks
         self.layouts = self.load_layouts()
 
+    # --- Files ---
+    def _stat(self, path):
+        try:
+            st = os.stat(path)
+        except OSError:
+            return None
+        return (st.st_mtime_ns, st.st_size, st.st_ino)
+
+    def _read_json(self, path):
+        """ Reads a JSON or compact file (detected by its header). """
+        try:
+            with open(path, "rb") as f:
+                raw = f.read()
+            self.parse_count += 1
+            data = compact.loads(raw) if compact.is_compact(raw) else json.loads(raw.decode("utf-8"))
+        except Exception as e:
+            print(f"Error loading layouts: {e}")
+            return None
+        self._signatures[path] = self._stat(path)
+        return data
+
+    def _write_json(self, path, data):
+        atomic_write_json(path, data, indent=4)
+        self._signatures[path] = self._stat(path)
+
+    def _write_scenario_file(self, filename, data):
+        path = self._path(filename)
+        if filename.endswith(".wml"):
+            atomic_write_bytes(path, compact.dumps(data))
+            self._signatures[path] = self._stat(path)
+        else:
+            self._write_json(path, data)
+
+    def _scenario_file(self, name):
+        """ File to write 'name' to: its current one, unless it is in the other format. """
+        current = self._index.get(name)
+        if current and current.endswith(".wml") == self.use_compact:
+            return current
+        return self._file_for(name)
+
+    def _read_scenario(self, name):
+        filename = self._index.get(name)
+        if filename is None: return None
+        return self._read_json(self._path(filename))
+
+    def _stem_for(self, name):
+        """ Stable, filesystem-safe name for a scenario's files (hash suffix avoids collisions). """
+        slug = re.sub(r"[^\w\-]+", "_", name).strip("_")[:40] or "scenario"
+        digest = hashlib.sha1(name.encode("utf-8")).hexdigest()[:8]
+        return f"{slug}-{digest}"
+
+    def _file_for(self, name):
+        return self._stem_for(name) + (".wml" if self.use_compact else ".json")
+
+    def _path(self, filename):
+        return os.path.join(self.layout_dir, filename)
+
+    def _write_index(self):
+        os.makedirs(self.layout_dir, exist_ok=True)
+        self._write_json(self.index_file, {"version": self.INDEX_VERSION, "scenarios": self._index})
+
+    def _write_scenario(self, name, data):
+        """ Writes one scenario; updates the index if it is new (or changed format). """
+        os.makedirs(self.layout_dir, exist_ok=True)
+        previous = self._index.get(name)
+        if previous and not self.history.versions(self._stem_for(name)):
+            # First write since history exists: keep what is on disk as version 1
+            self._record_version(name, self._read_scenario(name))
+        filename = self._scenario_file(name)
+        self._write_scenario_file(filename, data)
+        self._record_version(name, data)
+        if filename != previous:
+            self._index[name] = filename
+            self._write_index()
+            if previous:
+                try: os.remove(self._path(previous))
+                except OSError: pass
+
+    def _record_version(self, name, data):
+        if data is None: return
+        try:
+            self.history.record(self._stem_for(name), data)
+        except Exception as e:
+            print(f"Error saving layout history: {e}")
+
+    def _migrate(self):
+        """ layouts.json (all scenarios in one file) -> per-scenario files. """
+        try:
+            with open(self.layout_file, "r") as f:
+                legacy = json.load(f)
+        except Exception as e:
+            print(f"Error loading layouts: {e}")
+            return
+        try:
+            os.makedirs(self.layout_dir, exist_ok=True)
+            self._index = {}
+            for name, data in legacy.items():
+                filename = self._file_for(name)
+                self._write_scenario_file(filename, data)
+                self._index[name] = filename
+            self._write_index() # Last: the migration only counts once the index exists
+            os.replace(self.layout_file, self.layout_file + ".bak")
+            print(f"Migrated {len(legacy)} layouts to {self.layout_dir}")
+        except Exception as e:
+            print(f"Error migrating layouts: {e}")
+
+    def _refresh(self, name=None):
+        """ Picks up changes made on disk by someone else: the index, and scenario 'name' if given. """
+        if self._stat(self.index_file) != self._signatures.get(self.index_file):
+            self.layouts = self.load_layouts()
+            return
+        filename = self._index.get(name)
+        if filename is None or not isinstance(self.layouts, LazyLayouts): return
+        path = self._path(filename)
+        if self.layouts.is_decoded(name) and self._stat(path) != self._signatures.get(path):
+            self.layouts.forget(name)
+
+    def invalidate(self, name=None):
+        """ Forces a re-read on next access: of scenario 'name', or of everything. """
+        if name is None:
+            self._signatures = {}
+            self.layouts = self.load_layouts()
+        elif name in self._index:
+            self._signatures.pop(self._path(self._index[name]), None)
+            if isinstance(self.layouts, LazyLayouts): self.layouts.forget(name)
+
+    # --- Public API ---
     def load_layouts(self):
-        if os.path.exists(self.layout_file):
-            try:
-                with open(self.layout_file, "r") as f:
-                    return json.load(f)
-            except Exception as e:
-                print(f"Error loading layouts: {e}")
-                return {}
-        return {}
+        if not os.path.exists(self.index_file) and os.path.exists(self.layout_file):
+            self._migrate()
+
+        self._index = {}
+        if os.path.exists(self.index_file):
+            index = self._read_json(self.index_file) or {}
+            self._index = dict(index.get("scenarios", {}))
+
+        return LazyLayouts(self, self._index)
 
     def save_layouts(self, layouts):
+        """ Writes every scenario of 'layouts' and forgets the ones it no longer contains. """
         self.layouts = layouts
         try:
-            with open(self.layout_file, "w") as f:
-                json.dump(self.layouts, f, indent=4)
+            os.makedirs(self.layout_dir, exist_ok=True)
+            index = {}
+            for name, data in layouts.items():
+                index[name] = self._scenario_file(name)
+                self._write_scenario_file(index[name], data)
+            removed = [f for f in self._index.values() if f not in index.values()]
+            self._index = index
+            self._write_index()
+            for filename in removed:
+                try: os.remove(self._path(filename))
+                except OSError: pass
             return True
         except Exception as e:
             print(f"Error saving layouts: {e}")
             return False
 
     def get_layout(self, name):
-        # Hot reload to ensure latest disk state
-        self.layouts = self.load_layouts()
+        # Hot reload: only a file changed on disk is re-read
+        self._refresh(name)
         data = self.layouts.get(name)
-        
+
         # Backward Compatibility: Convert List to V2 Dict
         if isinstance(data, list):
             return {"windows": data, "settings": {}}
@@ -45,9 +258,14 @@ class LayoutStorage:
              existing = self.get_layout(name)
              settings = existing.get("settings", {}) if existing else {}
              data = {"windows": data, "settings": settings}
-             
+
         self.layouts[name] = data
-        return self.save_layouts(self.layouts)
+        try:
+            self._write_scenario(name, data)
+            return True
+        except Exception as e:
+            print(f"Error saving layouts: {e}")
+            return False
 
     def get_layout_settings(self, name):
          data = self.get_layout(name)
@@ -61,14 +279,59 @@ class LayoutStorage:
               data = {"windows": [], "settings": settings}
          else:
               data["settings"] = settings
-         
+
          self.layouts[name] = data
-         return self.save_layouts(self.layouts)
+         try:
+             self._write_scenario(name, data)
+             return True
+         except Exception as e:
+             print(f"Error saving layouts: {e}")
+             return False
 
     def rename_layout(self, old_name, new_name):
         # Refresh first
-        self.layouts = self.load_layouts()
-        if old_name in self.layouts:
-            self.layouts[new_name] = self.layouts.pop(old_name)
-            return self.save_layouts(self.layouts)
-        return False
+        self._refresh()
+        if old_name not in self.layouts:
+            return False
+        try:
+            data = self.layouts.pop(old_name)
+            old_file = self._index.pop(old_name)
+            new_file = self._file_for(new_name)
+            self._write_scenario_file(new_file, data)
+            self._index[new_name] = new_file
+            self.layouts[new_name] = data
+            self._write_index()
+            self.history.rename(self._stem_for(old_name), self._stem_for(new_name))
+            if old_file != new_file:
+                try: os.remove(self._path(old_file))
+                except OSError: pass
+            return True
+        except Exception as e:
+            print(f"Error saving layouts: {e}")
+            self.layouts = self.load_layouts()
+            return False
+
+    # --- History ---
+    def list_versions(self, name):
+        """ Saved versions of a scenario: [{"version", "time", "count"}], oldest first. """
+        return self.history.versions(self._stem_for(name))
+
+    def get_version(self, name, version):
+        return self.history.get(self._stem_for(name), version)
+
+    def diff_versions(self, name, old_version, new_version):
+        return self.history.diff(self._stem_for(name), old_version, new_version)
+
+    def restore_version(self, name, version):
+        """ Makes 'version' the current content of the scenario (recorded as a new version). """
+        try:
+            data = self.get_version(name, version)
+        except KeyError:
+            return False
+        self.layouts[name] = data
+        try:
+            self._write_scenario(name, data)
+            return True
+        except Exception as e:
+            print(f"Error saving layouts: {e}")
+            return False
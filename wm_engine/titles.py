@@ -0,0 +1,43 @@
+from collections import Counter
+from difflib import SequenceMatcher
+from functools import lru_cache
+from .browsers import registry
+from .utils import clean_title
+
+class TitleFeatures:
+    """ Everything the matcher derives from a window title, computed once per title. """
+    __slots__ = ("raw", "lower", "clean", "clean_lower", "chars")
+
+    def __init__(self, title):
+        self.raw = title or ""
+        self.lower = self.raw.lower()
+        self.clean = clean_title(self.raw)
+        self.clean_lower = self.clean.lower()
+        self.chars = Counter(self.lower) # Character multiset, for the quick_ratio bound
+
+    def similarity(self, other, threshold):
+        """
+        SequenceMatcher ratio of both lowercased titles, or 0.0 as soon as a cheap
+        upper bound proves it cannot exceed 'threshold' (the exact ratio is quadratic).
+        """
+        a, b = self.lower, other.lower
+        total = len(a) + len(b)
+        if not total:
+            return 1.0
+
+        # Same bound as SequenceMatcher.real_quick_ratio(): lengths only.
+        if 2.0 * min(len(a), len(b)) / total <= threshold:
+            return 0.0
+        # Same bound as SequenceMatcher.quick_ratio(), using the precomputed counters.
+        if 2.0 * sum((self.chars & other.chars).values()) / total <= threshold:
+            return 0.0
+        return SequenceMatcher(None, a, b).ratio()
+
+@lru_cache(maxsize=2048)
+def title_features(title):
+    """ Memoized per raw title, so features survive across scans (e.g. restore polling). """
+    return TitleFeatures(title)
+
+def is_private_title(title):
+    """ Title-only incognito / private browsing check (no UI Automation), see browsers.py. """
+    return registry.is_private_title(title)
@@ -0,0 +1,195 @@
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+from .browsers import registry
+
+# Stands for a private window's title in exported traces
+PRIVATE_TITLE = "[PRIVÉ]"
+# Root attributes that are bookkeeping, not operation arguments
+_ROOT_ONLY = ("counters", "private_windows")
+
+class Span:
+    """
+    One timed step. Spans about a specific window carry its title in attrs["window"]
+    (and attrs["private"] when it is known to be a private window).
+    """
+    __slots__ = ("name", "category", "attrs", "start", "end", "thread_id", "children")
+
+    def __init__(self, name, category, attrs, start, thread_id):
+        self.name = name
+        self.category = category
+        self.attrs = attrs
+        self.start = start
+        self.end = None
+        self.thread_id = thread_id
+        self.children = []
+
+    @property
+    def duration(self):
+        return (self.end if self.end is not None else time.perf_counter()) - self.start
+
+    def walk(self, parent=None):
+        """ Yields (span, parent) for this span and all its descendants. """
+        yield self, parent
+        for child in list(self.children):
+            yield from child.walk(self)
+
+class Tracer:
+    """
+    Collects nested spans for one operation (save / restore) at a time.
+    Spans opened while no operation is running are not recorded, so
+    instrumented code costs almost nothing outside save / restore.
+    The span stack is per thread; worker threads attach to a parent with adopt().
+    """
+
+    def __init__(self, clock=time.perf_counter):
+        self.clock = clock
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self.operation_span = None # Root of the running operation
+        self.last_operation = None # Root of the last finished one
+        self.counters = {}
+        self.private_windows = set() # Titles of the private windows seen by the running operation
+
+    def _stack(self):
+        stack = getattr(self._local, "stack", None)
+        if stack is None:
+            stack = self._local.stack = []
+        return stack
+
+    def current(self):
+        stack = self._stack()
+        return stack[-1] if stack else self.operation_span
+
+    @contextmanager
+    def operation(self, name, **attrs):
+        root = Span(name, "operation", attrs, self.clock(), threading.get_ident())
+        self.operation_span = root
+        self.counters = {}
+        self.private_windows = set()
+        stack = self._stack()
+        stack.append(root)
+        try:
+            yield root
+        finally:
+            root.end = self.clock()
+            root.attrs["counters"] = dict(self.counters)
+            root.attrs["private_windows"] = sorted(self.private_windows)
+            stack.pop()
+            self.operation_span = None
+            self.last_operation = root
+
+    @contextmanager
+    def span(self, name, category, **attrs):
+        parent = self.current()
+        if parent is None:
+            yield None
+            return
+        span = Span(name, category, attrs, self.clock(), threading.get_ident())
+        with self._lock:
+            parent.children.append(span)
+        stack = self._stack()
+        stack.append(span)
+        try:
+            yield span
+        finally:
+            span.end = self.clock()
+            stack.pop()
+
+    @contextmanager
+    def adopt(self, span):
+        """ Spans opened on this thread (e.g. an extraction worker) become children of 'span'. """
+        if span is None:
+            yield
+            return
+        stack = self._stack()
+        stack.append(span)
+        try:
+            yield
+        finally:
+            stack.pop()
+
+    def run_in(self, span, fn):
+        with self.adopt(span):
+            return fn()
+
+    def mark_private(self, title):
+        """ 'title' is a private window's: every span about it is redacted on export. """
+        if self.operation_span is None or not title: return
+        with self._lock:
+            self.private_windows.add(title)
+
+    def count(self, name, n=1):
+        if self.operation_span is None: return
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + n
+
+def private_titles(root):
+    """ Titles of the private windows of an operation: marked, flagged on a span, or private by their title. """
+    titles = set(root.attrs.get("private_windows", ()))
+    for span, _ in root.walk():
+        title = span.attrs.get("window")
+        if title and (span.attrs.get("private") or registry.is_private_title(title)):
+            titles.add(title)
+    return titles
+
+def report(root, top_n=5):
+    """
+    Summary of an operation: total time, self time per category (time not spent
+    in a child span; cumulative, so parallel work can exceed the total), the
+    slowest windows and the counters.
+    """
+    categories = {}
+    windows = {}
+    private = private_titles(root)
+    for span, parent in root.walk():
+        if span is root: continue
+        own = max(0.0, span.duration - sum(c.duration for c in span.children))
+        categories[span.category] = categories.get(span.category, 0.0) + own
+        title = span.attrs.get("window")
+        # Outermost span per window only (nested spans are already part of it)
+        if title and not (parent is not None and parent.attrs.get("window") == title):
+            windows[title] = windows.get(title, 0.0) + span.duration
+    return {
+        "operation": root.name,
+        "attrs": {k: v for k, v in root.attrs.items() if k not in _ROOT_ONLY},
+        "total": root.duration,
+        "categories": sorted(categories.items(), key=lambda kv: kv[1], reverse=True),
+        # [(title, seconds, private)]
+        "slowest_windows": [(t, d, t in private) for t, d in sorted(windows.items(), key=lambda kv: kv[1], reverse=True)[:top_n]],
+        "counters": root.attrs.get("counters", {}),
+    }
+
+def to_chrome_trace(root):
+    """
+    Chrome trace-event JSON (chrome://tracing, Perfetto): one complete ("X") event per span.
+    Private windows' titles are replaced by PRIVATE_TITLE, as are the names of
+    private log steps (a step span is named after its message).
+    """
+    private = private_titles(root)
+    events = []
+    for span, _ in root.walk():
+        args = {k: v for k, v in span.attrs.items() if k not in _ROOT_ONLY}
+        name = span.name
+        if args.get("window") in private:
+            args["window"] = PRIVATE_TITLE
+        if args.get("private") and span.category == "step":
+            name = PRIVATE_TITLE
+        events.append({
+            "name": name, "cat": span.category, "ph": "X", "pid": 1, "tid": span.thread_id,
+            "ts": round((span.start - root.start) * 1e6, 1), "dur": round(span.duration * 1e6, 1), "args": args,
+        })
+    for name, value in root.attrs.get("counters", {}).items():
+        events.append({"name": name, "ph": "C", "pid": 1, "ts": round(root.duration * 1e6, 1), "args": {name: value}})
+    return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+def save_chrome_trace(root, path):
+    folder = os.path.dirname(path)
+    if folder: os.makedirs(folder, exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(to_chrome_trace(root), f)
+
+tracer = Tracer() # Shared by the engine modules
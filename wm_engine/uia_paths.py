@@ -0,0 +1,89 @@
+import json
+import os
+import threading
+
+from .utils import atomic_write_json
+
+# 2: indices among the filtered children a uia_scan traversal sees (1 counted every child)
+FORMAT_VERSION = 2
+
+def exe_version_key(exe_path, version_of=None):
+    """
+    Cache key for one browser build: lowercased executable path + file version.
+    'version_of(path)' returns the file version string; without one (or if it
+    fails) the file size and modification time stand in for it.
+    """
+    if not exe_path: return None
+    version = None
+    if version_of is not None:
+        try:
+            version = version_of(exe_path)
+        except Exception:
+            version = None
+    if not version:
+        try:
+            st = os.stat(exe_path)
+            version = f"{st.st_size}-{int(st.st_mtime)}"
+        except OSError:
+            return None
+    return f"{exe_path.lower()}|{version}"
+
+class AddressBarPathCache:
+    """
+    Where the address bar sits in the UI Automation tree of each browser build:
+    {exe_version_key: [child index, ...]} from the top-level window (as in
+    uia_scan.BrowserScan.path), persisted to 'path'. Learned after the first full
+    search in a window of that build; every later window jumps straight to it. An entry that stops validating (UI change
+    without a version change) is dropped and learned again. Entries change rarely,
+    so every change is written immediately.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._paths = None
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def _load(self):
+        self._paths = {}
+        if not self.path or not os.path.exists(self.path): return
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            if data.get("version") == FORMAT_VERSION: # Older paths point elsewhere: learn them again
+                self._paths = data.get("paths", {})
+        except Exception as e:
+            print(f"Error loading UIA path cache: {e}")
+
+    def get(self, key):
+        with self._lock:
+            if self._paths is None: self._load()
+            path = self._paths.get(key) if key else None
+            if path is None: self.misses += 1
+            else: self.hits += 1
+            return path
+
+    def put(self, key, path):
+        if not key or path is None: return
+        with self._lock:
+            if self._paths is None: self._load()
+            if self._paths.get(key) == path: return
+            self._paths[key] = list(path)
+            self._save()
+
+    def forget(self, key):
+        with self._lock:
+            if self._paths is None: self._load()
+            if self._paths.pop(key, None) is not None:
+                self._save()
+
+    def _save(self):
+        if not self.path: return
+        try:
+            atomic_write_json(self.path, {"version": FORMAT_VERSION, "paths": self._paths})
+        except Exception as e:
+            print(f"Error saving UIA path cache: {e}")
+
+    def stats(self):
+        return {"hits": self.hits, "misses": self.misses, "entries": len(self._paths or {})}
@@ -0,0 +1,108 @@
+import re
+from collections import deque, namedtuple
+
+from .browsers import registry
+
+# One UI Automation element with its prefetched (cached) properties.
+# 'element' is opaque here: whatever find_children() needs to expand it.
+UiaNode = namedtuple("UiaNode", ["element", "name", "control_type", "value"])
+
+ADDRESS_BAR_NAMES = registry.address_bar_names # Preferred in this order
+INCOGNITO_KEYWORDS = registry.ui_private_markers
+INCOGNITO_DEPTH = 4 # Markers only count near the top (toolbar / avatar button), not in page content
+URL_HINTS = ("http", "www.", "localhost")
+
+# What find_children() should return (a UIA condition): containers on the way to the
+# address bar / private-mode markers, and those targets. Links, images, list items...
+# are filtered out on the provider side.
+SCAN_CONTROL_TYPES = (
+    "WindowControl", "PaneControl", "GroupControl", "CustomControl", "ToolBarControl", "TabControl",
+    "ComboBoxControl", "EditControl", "ButtonControl", "SplitButtonControl", "TextControl",
+)
+
+# Never expanded: page content can hold thousands of elements and holds neither the address bar nor the markers
+PRUNED_TYPES = ("DocumentControl",)
+
+_INCOGNITO_RE = re.compile("|".join(re.escape(k.lower()) for k in INCOGNITO_KEYWORDS))
+_NAME_RANK = {name: i for i, name in enumerate(ADDRESS_BAR_NAMES)}
+
+class BrowserScan:
+    """ Result of one traversal: address bar (value and child-index path), incognito marker, cost. """
+    __slots__ = ("url", "path", "incognito_marker", "visited", "expanded")
+
+    def __init__(self):
+        self.url = None
+        self.path = None # Indices into find_children() results, root -> address bar
+        self.incognito_marker = None # Name of the first element that looks like a private-mode marker
+        self.visited = 0
+        self.expanded = 0 # find_children() calls (one cross-process round trip each)
+
+def _looks_like_url(value):
+    return bool(value) and ("." in value or "http" in value or "localhost" in value)
+
+def address_bar_rank(node):
+    """ Lower is better; None if 'node' cannot be the address bar. Same preferences as the sequential searches it replaces. """
+    if node.control_type != "EditControl": return None
+    if node.name in _NAME_RANK:
+        return (0, _NAME_RANK[node.name]) if node.value else None
+    name = node.name or ""
+    if any(h in name for h in URL_HINTS) and node.value is not None:
+        return (1, 0)
+    if _looks_like_url(node.value):
+        return (2, 0)
+    return None
+
+def has_incognito_marker(name):
+    return bool(name) and _INCOGNITO_RE.search(name.lower()) is not None
+
+def scan_browser_window(root, find_children, want_url=True, want_incognito=True, max_depth=15, max_nodes=600):
+    """
+    One breadth-first traversal of a browser window collecting, together:
+    - the address bar (best-ranked edit field, see address_bar_rank) and its path,
+    - the first incognito marker within INCOGNITO_DEPTH levels.
+    find_children(element) returns the UiaNode children of 'element', properties
+    included (one round trip). Stops as soon as both answers are final.
+    """
+    result = BrowserScan()
+    best = None
+    queue = deque([(root, 0, ())])
+    while queue and result.visited < max_nodes:
+        element, depth, path = queue.popleft()
+        # Breadth-first: once an element deeper than INCOGNITO_DEPTH comes up, every possible marker has been seen
+        incognito_done = not want_incognito or result.incognito_marker is not None or depth >= INCOGNITO_DEPTH
+        url_done = not want_url or (best is not None and best[0][0] == 0) # A named address bar ends the search
+        if url_done and incognito_done: break
+        if depth >= max_depth: continue
+
+        result.expanded += 1
+        try:
+            children = find_children(element)
+        except Exception:
+            continue # Element went away mid-traversal
+        for index, node in enumerate(children):
+            result.visited += 1
+            child_path = path + (index,)
+            if want_incognito and result.incognito_marker is None and depth < INCOGNITO_DEPTH and has_incognito_marker(node.name):
+                result.incognito_marker = node.name
+            if want_url:
+                rank = address_bar_rank(node)
+                if rank is not None and (best is None or rank < best[0]):
+                    best = (rank, node.value, child_path)
+            if node.control_type not in PRUNED_TYPES:
+                queue.append((node.element, depth + 1, child_path))
+
+    if best is not None:
+        result.url = best[1] or None
+        result.path = list(best[2])
+    return result
+
+def follow_path(root, path, find_children):
+    """ The UiaNode at 'path' (as recorded in BrowserScan.path), or None if the tree no longer has that shape. """
+    node = None
+    element = root
+    for index in path:
+        children = find_children(element)
+        if index >= len(children): return None
+        node = children[index]
+        element = node.element
+    return node
@@ -1,25 +1,16 @@
-import win32api
+import json
+import os
 from difflib import SequenceMatcher
+from .browsers import registry
 
 def calculate_similarity(s1, s2):
     """ Returns a similarity score between 0.0 and 1.0 """
     return SequenceMatcher(None, s1, s2).ratio()
 
 def clean_title(title):
+    """ Title without its browser suffix (" - Google Chrome"...), see browsers.py. """
     if not title: return ""
-    t = title.lower()
-    # Strip common browser suffixes
-    suffixes = [
-        " - google chrome", 
-        " — mozilla firefox", 
-        " - mozilla firefox", 
-        " - microsoft edge", 
-        " — navigation privée de mozilla firefox"
-    ]
-    for s in suffixes:
-        if t.endswith(s):
-            return title[:-len(s)].strip()
-    return title
+    return registry.clean_title(title)
 
 def normalize_url(url):
     if not url: return None
@@ -29,13 +20,23 @@ def normalize_url(url):
         return "https://" + url
     return url
 
-def ensure_rect_on_screen(rect):
+def layout_tabs(window):
+    """ Ordered tab URLs of a saved or scanned browser window: its 'tabs', or just its 'url' (older layouts). """
+    tabs = [url for url in window.get("tabs") or () if url]
+    if tabs: return tabs
+    url = window.get("url")
+    return [url] if url else []
+
+def ensure_rect_on_screen(rect, monitors=None):
     """
     Ensures the given window rect is visible on at least one monitor.
     If not, moves it to the primary monitor.
-    rect = [x, y, x2, y2]
+    rect = [x, y, x2, y2]; monitors = [[left, top, right, bottom], ...] (queried from Windows if None)
     """
     try:
+        if monitors is None:
+            import win32api
+            monitors = [monitor[2] for monitor in win32api.EnumDisplayMonitors()]
         x, y, r, b = rect
         w = r - x
         h = b - y
@@ -44,10 +45,8 @@ def ensure_rect_on_screen(rect):
         cx = x + (w // 2)
         cy = y + (h // 2)
         
-        monitors = win32api.EnumDisplayMonitors()
         for monitor in monitors:
-            # monitor[2] is the rect (left, top, right, bottom)
-            mx, my, mr, mb = monitor[2]
+            mx, my, mr, mb = monitor
             if mx <= cx <= mr and my <= cy <= mb:
                 return rect # Center is inside a monitor, executed as is.
 
@@ -59,3 +58,20 @@ def ensure_rect_on_screen(rect):
     except Exception as e:
         print(f"Error checking screen bounds: {e}")
         return rect
+
+def atomic_write_bytes(path, data):
+    """ Writes to a temp file then renames it over 'path': readers never see a partial file. """
+    tmp = f"{path}.{os.getpid()}.tmp"
+    try:
+        with open(tmp, "wb") as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, path)
+    except BaseException:
+        try: os.remove(tmp)
+        except OSError: pass
+        raise
+
+def atomic_write_json(path, data, **dump_kwargs):
+    atomic_write_bytes(path, json.dumps(data, **dump_kwargs).encode("utf-8"))
@@ -0,0 +1,109 @@
+import os
+import subprocess
+from ctypes import windll, byref, c_int, sizeof
+
+import win32api
+import win32gui
+import win32process
+
+from .backend import DesktopBackend
+
+DWMWA_CLOAKED = 14
+
+class Win32Backend(DesktopBackend):
+    """ The real desktop: pywin32, psutil and UI Automation. Only imported through backend.get_backend(). """
+
+    def __init__(self):
+        self.path_cache = None # AddressBarPathCache, once a data folder is known
+        self.session_cache = None # SessionFileCache, on first use
+
+    def set_data_dir(self, folder, uia_path_cache=True):
+        from .uia_paths import AddressBarPathCache
+        self.path_cache = AddressBarPathCache(os.path.join(folder, "uia_paths.json")) if uia_path_cache else None
+
+    # --- Windows ---
+    def enum_windows(self):
+        hwnds = []
+        win32gui.EnumWindows(lambda hwnd, ctx: hwnds.append(hwnd), None)
+        return hwnds
+
+    def is_window(self, hwnd): return win32gui.IsWindow(hwnd)
+    def is_window_visible(self, hwnd): return win32gui.IsWindowVisible(hwnd)
+    def get_window_text(self, hwnd): return win32gui.GetWindowText(hwnd)
+    def get_class_name(self, hwnd): return win32gui.GetClassName(hwnd)
+    def get_window_long(self, hwnd, index): return win32gui.GetWindowLong(hwnd, index)
+    def get_window(self, hwnd, cmd): return win32gui.GetWindow(hwnd, cmd)
+
+    def is_cloaked(self, hwnd):
+        """ Hidden by DWM (e.g. suspended UWP apps, other virtual desktops). """
+        try:
+            cloaked = c_int(0)
+            windll.dwmapi.DwmGetWindowAttribute(hwnd, DWMWA_CLOAKED, byref(cloaked), sizeof(cloaked))
+            return cloaked.value != 0
+        except Exception:
+            return False
+
+    def is_iconic(self, hwnd): return win32gui.IsIconic(hwnd)
+    def get_window_placement(self, hwnd): return win32gui.GetWindowPlacement(hwnd)
+    def get_window_rect(self, hwnd): return win32gui.GetWindowRect(hwnd)
+    def set_window_placement(self, hwnd, placement): win32gui.SetWindowPlacement(hwnd, placement)
+    def set_window_pos(self, hwnd, x, y, width, height, flags): win32gui.SetWindowPos(hwnd, 0, x, y, width, height, flags)
+    def show_window(self, hwnd, cmd): win32gui.ShowWindow(hwnd, cmd)
+    def update_window(self, hwnd): win32gui.UpdateWindow(hwnd)
+    def redraw_window(self, hwnd, flags): win32gui.RedrawWindow(hwnd, None, None, flags)
+
+    def get_window_pid(self, hwnd):
+        _, pid = win32process.GetWindowThreadProcessId(hwnd)
+        return pid
+
+    def monitors(self):
+        # monitor[2] is the rect (left, top, right, bottom)
+        return [list(monitor[2]) for monitor in win32api.EnumDisplayMonitors()]
+
+    # --- Processes ---
+    def process_provider(self):
+        from .processes import PsutilProcessProvider
+        return PsutilProcessProvider()
+
+    # --- UI Automation ---
+    def extractor(self):
+        from .extraction import AutomationExtractor
+        return AutomationExtractor(self.path_cache)
+
+    def explorer_prefetch(self, timeout):
+        from .automation import ExplorerPathPrefetch
+        return ExplorerPathPrefetch(timeout)
+
+    def explorer_path(self, hwnd):
+        from .automation import extract_path_from_explorer
+        return extract_path_from_explorer(hwnd)
+
+    def explorer_path_uia(self, hwnd):
+        from .automation import extract_path_from_explorer_uia
+        return extract_path_from_explorer_uia(hwnd)
+
+    def init_thread(self):
+        from .extraction import init_com_thread
+        init_com_thread()
+
+    def uninit_thread(self):
+        from .extraction import uninit_com_thread
+        uninit_com_thread()
+
+    # --- Browser sessions ---
+    def browser_sessions(self, profile):
+        if self.session_cache is None:
+            from .sessions import SessionFileCache
+            self.session_cache = SessionFileCache()
+        return self.session_cache.windows(profile)
+
+    # --- Launching ---
+    def launch(self, args, cwd=None):
+        subprocess.Popen(args, cwd=cwd)
+
+    def open_folder(self, path):
+        os.startfile(path)
+
+    def create_event_source(self):
+        from .events import create_event_source
+        return create_event_source()